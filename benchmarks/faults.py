@@ -0,0 +1,181 @@
+"""Inject faults during a crawl and measure how quickly Spider recovers.
+
+Example:
+    python -m benchmarks.faults --faults kill_browser drop_connection --browsers 2 --pages 2 --urls 300
+"""
+from distbot.spider import Spider
+from distbot.utils import logger
+from benchmarks.site import SyntheticSite
+
+from typing import Dict, List, Any, Optional
+from time import perf_counter
+import argparse
+import asyncio
+import random
+import json
+
+FAULTS = ('kill_browser', 'hang_renderer', 'drop_connection', 'stall_server')
+
+
+class FaultInjector:
+    """Deliberately break browsers, pages, DevTools connections and the synthetic site."""
+
+    def __init__(self, spider: Spider, site: SyntheticSite = None):
+        self.spider = spider
+        self.site = site
+
+    def random_browser(self):
+        return random.choice(list(self.spider.browsers.keys()))
+
+    async def kill_browser(self, browser=None) -> None:
+        """Kill a local Chromium process."""
+        browser = browser or self.random_browser()
+        if browser.process is None:
+            raise ValueError("Only local browsers can be killed.")
+        logger.warning(f"[fault] Killing browser process {browser.process.pid}")
+        browser.process.kill()
+
+    async def hang_renderer(self, browser=None) -> None:
+        """Run an infinite loop in every page of a browser, so all page functions hang."""
+        browser = browser or self.random_browser()
+        logger.warning(f"[fault] Hanging renderers of browser {browser}")
+        for page in await browser.pages():
+            # the response will never arrive, so don't wait for it.
+            fut = page._client.send(
+                'Runtime.evaluate', {'expression': 'while (true) {}'})
+            fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    async def drop_connection(self, browser=None) -> None:
+        """Close the DevTools websocket connection to a browser."""
+        browser = browser or self.random_browser()
+        logger.warning(f"[fault] Dropping DevTools connection to {browser}")
+        await browser._connection.connection.close()
+
+    async def stall_server(self, duration: float = 5) -> None:
+        """Make the synthetic site stop responding for {duration} seconds."""
+        logger.warning(f"[fault] Stalling server for {duration}s")
+        self.site.stall()
+        await asyncio.sleep(duration)
+        self.site.stall(False)
+
+
+def throughput(times: List[float], start: float, end: float) -> float:
+    """Completions per second in the window [start, end)."""
+    if end <= start:
+        return 0.0
+    return len([t for t in times if start <= t < end]) / (end - start)
+
+
+class RecoveryRecorder:
+    """Record navigation completions so recovery statistics can be computed after a fault."""
+
+    def __init__(self):
+        # (completion time, browser id)
+        self.completions: List[tuple] = []
+        self.lost_urls: List[str] = []
+        self.fault_start: Optional[float] = None
+        self.fault_end: Optional[float] = None
+        self.browsers_at_fault = set()
+
+    def record(self, browser_id: str) -> None:
+        self.completions.append((perf_counter(), browser_id))
+
+    def start_fault(self, spider: Spider) -> None:
+        self.fault_start = perf_counter()
+        self.browsers_at_fault = {d['id'] for d in spider.browsers.values()}
+
+    def end_fault(self) -> None:
+        self.fault_end = perf_counter()
+
+    def time_to_recover(self, new_browser: bool) -> Optional[float]:
+        """Seconds from fault until navigation resumed.
+           If {new_browser}, navigation must be done by a browser launched after the fault."""
+        for t, browser_id in self.completions:
+            if t < self.fault_end:
+                continue
+            if new_browser and browser_id in self.browsers_at_fault:
+                continue
+            return t - self.fault_start
+
+    def summary(self, new_browser: bool = True, window: float = 5) -> Dict[str, Any]:
+        times = [t for t, _ in self.completions]
+        first = min(times, default=self.fault_start)
+        baseline = throughput(times, first, self.fault_start)
+        recover = self.time_to_recover(new_browser)
+        dip_end = self.fault_start + (recover if recover is not None else window)
+        during = throughput(times, self.fault_start, dip_end)
+        return {
+            'time_to_recover_s': recover,
+            'lost_urls': len(self.lost_urls),
+            'baseline_pages_per_s': baseline,
+            'fault_pages_per_s': during,
+            'throughput_dip_pct': 100 * (1 - during / baseline) if baseline else None
+        }
+
+
+async def run_fault_benchmark(urls: List[str], fault: str, site: SyntheticSite = None,
+                              fault_after: float = 3, browsers: int = 1, pages: int = 1,
+                              launch_options: Dict[str, Any] = {}, **get_kwargs) -> Dict[str, Any]:
+    """Fetch all urls, inject {fault} after {fault_after} seconds and return recovery statistics."""
+    spider = Spider()
+    for _ in range(browsers):
+        await spider.add_browser(pages=pages, launch_options=dict(launch_options))
+    injector = FaultInjector(spider, site)
+    recorder = RecoveryRecorder()
+
+    async def fetch(url: str) -> None:
+        result = await spider.get(url, **get_kwargs)
+        if result is None:
+            recorder.lost_urls.append(url)
+            return
+        page = result[1]
+        recorder.record(spider.browsers[page.browser]['id']
+                        if page.browser in spider.browsers else None)
+        await spider.set_idle(page)
+
+    async def inject() -> None:
+        await asyncio.sleep(fault_after)
+        recorder.start_fault(spider)
+        await getattr(injector, fault)()
+        recorder.end_fault()
+
+    fetch_tasks = asyncio.gather(*[fetch(url) for url in urls])
+    await asyncio.gather(inject(), fetch_tasks)
+    await spider.shutdown()
+    # a stalled server doesn't break browsers, so any completed navigation means recovery.
+    return {'fault': fault, 'browsers': browsers, 'pages': pages,
+            **recorder.summary(new_browser=fault != 'stall_server')}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--faults', nargs='+', default=list(FAULTS), choices=FAULTS,
+                        help='Faults to inject (one benchmark run per fault).')
+    parser.add_argument('--browsers', type=int, default=2,
+                        help='Number of browsers.')
+    parser.add_argument('--pages', type=int, default=2,
+                        help='Pages per browser.')
+    parser.add_argument('--urls', type=int, default=200,
+                        help='Number of URLs to fetch per run.')
+    parser.add_argument('--fault-after', type=float, default=3,
+                        help='Seconds to crawl before injecting the fault.')
+    parser.add_argument('--nav-timeout', type=int, default=5_000,
+                        help='defaultNavigationTimeout (ms) for each browser.')
+    return parser.parse_args()
+
+
+async def main(args) -> List[Dict[str, Any]]:
+    launch_options = {'headless': True, 'args': ['--no-sandbox'],
+                      'defaultNavigationTimeout': args.nav_timeout}
+    results = []
+    with SyntheticSite() as site:
+        # slow pages keep the crawl running long enough to observe the fault.
+        urls = site.urls(['slow'], args.urls, {'slow': {'delay': 0.2}})
+        for fault in args.faults:
+            results.append(await run_fault_benchmark(
+                urls, fault, site, args.fault_after, args.browsers, args.pages, launch_options))
+    return results
+
+
+if __name__ == '__main__':
+    print(json.dumps(asyncio.run(main(parse_args())), indent=2))
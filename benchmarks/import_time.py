@@ -0,0 +1,67 @@
+"""Measure how long importing distbot modules takes in a fresh interpreter.
+
+Example:
+    python -m benchmarks.import_time --modules distbot.spider distbot.shard --max-ms 150
+"""
+from typing import Dict, List, Tuple
+import subprocess
+import statistics
+import argparse
+import sys
+
+MODULES = ('distbot.spider', 'distbot.crawl',
+           'distbot.shard', 'distbot.utils')
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """Total import time (ms) of module in a new interpreter, and cumulative import time (ms) of each module it imported."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            # top level import. modules imported before it (e.g. by interpreter startup) aren't counted.
+            if name.strip() == module:
+                return int(cumulative) / 1000, times
+            times = {}
+            continue
+        times[name.strip()] = int(cumulative) / 1000
+    raise ValueError(f"{module} import time not found.")
+
+
+def run_benchmark(modules: List[str], repeat: int = 5, top: int = 5) -> List[Dict]:
+    results = []
+    for module in modules:
+        runs = [import_times(module) for _ in range(repeat)]
+        totals = [total for total, _ in runs]
+        # slowest imports in the median run.
+        _, times = sorted(runs, key=lambda r: r[0])[len(runs) // 2]
+        slowest = sorted(((t, m) for m, t in times.items()), reverse=True)[:top]
+        results.append({'module': module, 'median_ms': statistics.median(totals),
+                        'min_ms': min(totals), 'slowest': slowest})
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modules', nargs='+', default=list(MODULES),
+                        help='Modules to import.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of fresh interpreters to import each module in.')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='Exit with an error if any module takes longer (median) to import.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run_benchmark(args.modules, args.repeat)
+    for r in results:
+        print(f"{r['module']}: median {r['median_ms']:.1f} ms, min {r['min_ms']:.1f} ms")
+        for t, m in r['slowest']:
+            print(f"\t{t:.1f} ms\t{m}")
+    if args.max_ms is not None and any(r['median_ms'] > args.max_ms for r in results):
+        sys.exit(f"Import time exceeded {args.max_ms} ms.")
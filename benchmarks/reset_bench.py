@@ -0,0 +1,94 @@
+"""Measure the cost and memory savings of resetting pages when they are set idle.
+
+Example:
+    python -m benchmarks.reset_bench --urls 200 --pages 8 --kinds heavy scroll
+"""
+from distbot.spider import Spider
+from distbot.utils import process_tree_rss
+from benchmarks.site import SyntheticSite, PAGE_KINDS
+from benchmarks.spider_bench import percentile
+
+from typing import Any, Dict, List
+from time import perf_counter
+import argparse
+import asyncio
+import json
+
+# name -> reset launch options.
+CONFIGS = {
+    'none': {},
+    'blank': {'resetPageOnIdle': True},
+    'blank+gc': {'resetPageOnIdle': True, 'resetPageGC': True},
+    'blank+gc+storage': {'resetPageOnIdle': True, 'resetPageGC': True, 'resetPageStorage': True},
+}
+
+
+async def measure(urls: List[str], pages: int, launch_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Fetch urls with one browser of {pages} pages. Return navigation latency, reset time and idle page memory."""
+    spider = Spider()
+    browser = await spider.add_browser(pages=pages, launch_options=launch_options)
+    latencies = []
+
+    async def fetch(url: str) -> None:
+        t_start = perf_counter()
+        result = await spider.get(url)
+        if result is not None:
+            latencies.append(perf_counter() - t_start)
+            await spider.set_idle(result[1])
+
+    await asyncio.gather(*[fetch(url) for url in urls])
+    # memory held by the idle pages.
+    metrics = [await page.metrics() for page in list(spider.pages)]
+    try:
+        rss = process_tree_rss(browser.process.pid) / 1e6
+    except ImportError:
+        rss = float('nan')
+    resets = spider.stats['resets']
+    await spider.shutdown()
+    return {
+        'navigations': len(latencies),
+        'latency_p50_ms': 1000 * percentile(latencies, 50),
+        'latency_p90_ms': 1000 * percentile(latencies, 90),
+        'reset_ms': 1000 * spider.stats['reset_time'] / resets if resets else 0.0,
+        'idle_heap_mb': sum(m['JSHeapUsedSize'] for m in metrics) / 1e6,
+        'idle_nodes': sum(m['Nodes'] for m in metrics),
+        'idle_listeners': sum(m['JSEventListeners'] for m in metrics),
+        'browser_rss_mb': rss,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--urls', type=int, default=100,
+                        help='Number of navigations per configuration.')
+    parser.add_argument('--pages', type=int, default=4,
+                        help='Number of pages in the browser.')
+    parser.add_argument('--kinds', nargs='+', default=['heavy', 'scroll'], choices=PAGE_KINDS,
+                        help='Synthetic page kinds to fetch.')
+    parser.add_argument('--configs', nargs='+', default=list(CONFIGS), choices=list(CONFIGS),
+                        help='Reset configurations to measure.')
+    parser.add_argument('--json', action='store_true',
+                        help='Print full results as JSON.')
+    return parser.parse_args()
+
+
+async def main(args) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    with SyntheticSite() as site:
+        urls = site.urls(args.kinds, args.urls)
+        for name in args.configs:
+            results[name] = await measure(urls, args.pages, {
+                'headless': True, 'args': ['--no-sandbox'], **CONFIGS[name]})
+    return results
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        cols = list(next(iter(results.values())))
+        print('\t'.join(['config'] + cols))
+        for name, r in results.items():
+            print('\t'.join([name] + [f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c]) for c in cols]))
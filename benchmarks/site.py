@@ -0,0 +1,149 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from threading import Thread, Event
+from typing import Dict, List
+import random
+import time
+
+# page kinds served by SyntheticSite.
+PAGE_KINDS = ('fast', 'slow', 'heavy', 'scroll', 'captcha', 'jslinks', 'hang')
+
+# enough visible text that security_check doesn't flag a page for being too short.
+_FILLER = ' '.join(
+    ['Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.'] * 30)
+
+_PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><h1>{title}</h1><p>{text}</p>{body}</body></html>"""
+
+_SCROLL_JS = """<script>
+let batches = 0;
+window.addEventListener('scroll', () => {
+    if (batches >= %(batches)d || window.innerHeight + window.scrollY < document.body.scrollHeight - 10) return;
+    batches += 1;
+    setTimeout(() => {
+        const div = document.createElement('div');
+        div.style.height = '2000px';
+        div.textContent = 'batch ' + batches;
+        document.body.appendChild(div);
+    }, %(delay)d);
+});
+</script>"""
+
+# a link that navigates, a link that changes the DOM and a link that does nothing.
+_JS_LINKS = """<a href="#" onclick="location.href = '/fast/1'; return false;">navigate</a>
+<a href="javascript:void(0)" onclick="document.getElementById('out').textContent = 'clicked'">change</a>
+<span onclick="">nothing</span>
+<div id="out"></div>"""
+
+_CAPTCHA_TEXT = "Please verify you are a human. Click the box below to confirm you are not a robot."
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve synthetic pages. Path format: /{kind}/{page number}?{options}"""
+
+    def do_GET(self):
+        site: SyntheticSite = self.server.site
+        site.requests += 1
+        url = urlparse(self.path)
+        opts = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split('/') if p]
+        kind = parts[0] if parts else 'fast'
+        # block while the site is stalled (used for fault injection).
+        while site.stalled.is_set() and not site.closed.is_set():
+            time.sleep(0.05)
+        if kind == 'asset':
+            return self._send(b'x' * int(opts.get('size', 2_000)), 'image/png',
+                              delay=float(opts.get('delay', 0)))
+        if kind == 'hang':
+            # never respond. wait until the server is closed.
+            site.closed.wait()
+            return
+        title = f"{kind} page {parts[1] if len(parts) > 1 else 0}"
+        body, text, delay = '', _FILLER, 0
+        if kind == 'slow':
+            delay = float(opts.get('delay', 2))
+        elif kind == 'heavy':
+            for i in range(int(opts.get('assets', 40))):
+                body += f'<img src="/asset/{i}.png?size={opts.get("size", 20_000)}&delay={opts.get("asset_delay", 0)}&r={random.random()}">'
+        elif kind == 'scroll':
+            body = '<div style="height: 3000px"></div>' + _SCROLL_JS % {
+                'batches': int(opts.get('batches', 5)), 'delay': int(float(opts.get('delay', 0.2)) * 1000)}
+        elif kind == 'captcha':
+            text = _CAPTCHA_TEXT
+        elif kind == 'jslinks':
+            body = _JS_LINKS
+        html = _PAGE.format(title=title, text=text, body=body)
+        self._send(html.encode(), 'text/html; charset=utf-8', delay=delay)
+
+    def _send(self, content: bytes, content_type: str, delay: float = 0):
+        if delay:
+            time.sleep(delay)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(content)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(content)
+        except (BrokenPipeError, ConnectionResetError):
+            # browser gave up on the request.
+            pass
+
+    def log_message(self, format, *args):
+        # don't write every request to stderr.
+        pass
+
+
+class SyntheticSite:
+    """Local HTTP server serving synthetic pages, so Spider can be benchmarked without network access."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.site = self
+        self.stalled = Event()
+        self.closed = Event()
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, kind: str, number: int = 0, **options) -> str:
+        """URL of a synthetic page. See _Handler.do_GET for available options."""
+        if kind not in PAGE_KINDS:
+            raise ValueError(
+                f"Unknown page kind '{kind}'. Valid kinds: {PAGE_KINDS}")
+        query = '&'.join(f'{k}={v}' for k, v in options.items())
+        return f"{self.address}/{kind}/{number}" + (f"?{query}" if query else '')
+
+    def urls(self, kinds: List[str], count: int, options: Dict[str, Dict] = {}) -> List[str]:
+        """{count} URLs cycling through {kinds}."""
+        return [self.url(kinds[i % len(kinds)], i, **options.get(kinds[i % len(kinds)], {}))
+                for i in range(count)]
+
+    def stall(self, stalled: bool = True) -> None:
+        """Stop (or resume) responding to requests."""
+        if stalled:
+            self.stalled.set()
+        else:
+            self.stalled.clear()
+
+    def start(self) -> 'SyntheticSite':
+        self._thread = Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.closed.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'SyntheticSite':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
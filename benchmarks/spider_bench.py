@@ -0,0 +1,186 @@
+"""Measure Spider throughput against a local synthetic site.
+
+Example:
+    python -m benchmarks.spider_bench --browsers 1 2 --pages 1 4 --kinds fast slow heavy --urls 200
+"""
+from distbot.spider import Spider
+from benchmarks.site import SyntheticSite, PAGE_KINDS
+
+from typing import Dict, List, Any
+from time import perf_counter
+import itertools
+import argparse
+import asyncio
+import json
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[idx]
+
+
+def process_tree(pid: int) -> List['psutil.Process']:
+    """Process with id {pid} and all of its children."""
+    try:
+        proc = psutil.Process(pid)
+        return [proc] + proc.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+
+
+class ResourceMonitor:
+    """Periodically sample CPU and RSS of each local Chromium process tree."""
+
+    def __init__(self, spider: Spider, interval: float = 0.5):
+        self.spider = spider
+        self.interval = interval
+        # browser id -> list of (cpu percent, rss bytes) samples.
+        self.samples: Dict[str, List] = {}
+        self._procs: Dict[int, 'psutil.Process'] = {}
+        self._task = None
+
+    def start(self) -> None:
+        if psutil is None:
+            print("psutil is not installed. CPU and RSS will not be measured.")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def sample(self) -> None:
+        for browser, data in list(self.spider.browsers.items()):
+            if browser.process is None:
+                # remote browsers can't be measured from here.
+                continue
+            cpu, rss = 0, 0
+            for proc in process_tree(browser.process.pid):
+                # reuse Process objects so cpu_percent measures since last sample.
+                proc = self._procs.setdefault(proc.pid, proc)
+                try:
+                    cpu += proc.cpu_percent()
+                    rss += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            self.samples.setdefault(data['id'], []).append((cpu, rss))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for browser_id, samples in self.samples.items():
+            # first cpu_percent call for a process always returns 0.
+            cpus = [c for c, _ in samples[1:]] or [0]
+            summary[browser_id] = {
+                'cpu_mean_pct': sum(cpus) / len(cpus),
+                'rss_peak_mb': max(r for _, r in samples) / 1e6,
+                'rss_last_mb': samples[-1][1] / 1e6
+            }
+        return summary
+
+
+async def run_benchmark(urls: List[str], browsers: int = 1, pages: int = 1,
+                        launch_options: Dict[str, Any] = {}, **get_kwargs) -> Dict[str, Any]:
+    """Fetch all urls with a Spider of {browsers} x {pages} and return throughput statistics."""
+    spider = Spider()
+    for _ in range(browsers):
+        await spider.add_browser(pages=pages, launch_options=dict(launch_options))
+    monitor = ResourceMonitor(spider)
+    monitor.start()
+    latencies, failed = [], []
+
+    async def fetch(url: str) -> None:
+        t_start = perf_counter()
+        result = await spider.get(url, **get_kwargs)
+        if result is None:
+            failed.append(url)
+            return
+        latencies.append(perf_counter() - t_start)
+        await spider.set_idle(result[1])
+
+    t_start = perf_counter()
+    await asyncio.gather(*[fetch(url) for url in urls])
+    elapsed = perf_counter() - t_start
+    await monitor.stop()
+    await spider.shutdown()
+    return {
+        'browsers': browsers,
+        'pages': pages,
+        'urls': len(urls),
+        'failed': len(failed),
+        'elapsed_s': elapsed,
+        'pages_per_s': len(latencies) / elapsed,
+        'latency_p50_s': percentile(latencies, 50),
+        'latency_p90_s': percentile(latencies, 90),
+        'latency_p99_s': percentile(latencies, 99),
+        'chromium': monitor.summary()
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    cols = ('browsers', 'pages', 'urls', 'failed', 'pages_per_s',
+            'latency_p50_s', 'latency_p90_s', 'latency_p99_s')
+    print('\t'.join(cols + ('cpu_mean_pct', 'rss_peak_mb')))
+    for r in results:
+        chromium = r['chromium'].values()
+        cpu = sum(c['cpu_mean_pct'] for c in chromium) / max(len(chromium), 1)
+        rss = max([c['rss_peak_mb'] for c in chromium], default=float('nan'))
+        print('\t'.join([f"{r[c]:.3f}" if isinstance(r[c], float) else str(r[c]) for c in cols]
+                        + [f"{cpu:.1f}", f"{rss:.1f}"]))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--browsers', type=int, nargs='+', default=[1],
+                        help='Browser counts to benchmark.')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1],
+                        help='Pages per browser counts to benchmark.')
+    parser.add_argument('--kinds', nargs='+', default=['fast'], choices=PAGE_KINDS,
+                        help='Synthetic page kinds to fetch.')
+    parser.add_argument('--urls', type=int, default=100,
+                        help='Number of URLs to fetch per benchmark run.')
+    parser.add_argument('--nav-timeout', type=int, default=10_000,
+                        help='defaultNavigationTimeout (ms) for each browser.')
+    parser.add_argument('--wait-until', default='load',
+                        help='Pyppeteer waitUntil option for navigation.')
+    parser.add_argument('--launch-options', type=json.loads, default={},
+                        help='Extra browser launch options (JSON).')
+    parser.add_argument('--json', action='store_true',
+                        help='Print full results as JSON.')
+    return parser.parse_args()
+
+
+async def main(args) -> List[Dict[str, Any]]:
+    launch_options = {'headless': True, 'args': ['--no-sandbox'],
+                      'defaultNavigationTimeout': args.nav_timeout,
+                      **args.launch_options}
+    results = []
+    with SyntheticSite() as site:
+        urls = site.urls(args.kinds, args.urls)
+        for browsers, pages in itertools.product(args.browsers, args.pages):
+            results.append(await run_benchmark(urls, browsers, pages, launch_options,
+                                               waitUntil=args.wait_until))
+    return results
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
@@ -0,0 +1,94 @@
+"""Measure the per-navigation cost of stealth evasions against a local synthetic site.
+
+Example:
+    python -m benchmarks.stealth_bench --urls 100 --each
+"""
+from distbot.spider import Spider
+from distbot.stealth import EVASIONS, script_size
+from benchmarks.site import SyntheticSite, PAGE_KINDS
+from benchmarks.spider_bench import percentile
+
+from typing import Any, Dict, List, Sequence
+from time import perf_counter
+import argparse
+import asyncio
+import json
+
+
+async def measure(urls: List[str], evasions: Sequence[str], launch_options: Dict[str, Any] = {}) -> Dict[str, Any]:
+    """Navigate one page to each url in turn with {evasions} injected. Return navigation and script time per page."""
+    spider = Spider()
+    await spider.add_browser(launch_options={**launch_options, 'stealth': list(evasions) or False})
+    nav_times, script_times = [], []
+    last_script_time = None
+    for url in urls:
+        t_start = perf_counter()
+        result = await spider.get(url)
+        if result is None:
+            continue
+        nav_times.append(perf_counter() - t_start)
+        page = result[1]
+        # Chromium's total JavaScript execution time for the page.
+        script_time = (await page.metrics())['ScriptDuration']
+        if last_script_time is not None:
+            script_times.append(script_time - last_script_time)
+        last_script_time = script_time
+        await spider.set_idle(page)
+    await spider.shutdown()
+    return {
+        'evasions': ','.join(evasions) if len(evasions) < len(EVASIONS) else 'all',
+        'script_kb': script_size(evasions) / 1000,
+        'navigations': len(nav_times),
+        'nav_mean_ms': 1000 * sum(nav_times) / max(len(nav_times), 1),
+        'nav_p90_ms': 1000 * percentile(nav_times, 90),
+        'script_ms_per_nav': 1000 * sum(script_times) / max(len(script_times), 1),
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    baseline = next((r for r in results if r['evasions'] == ''), None)
+    cols = ('script_kb', 'navigations', 'nav_mean_ms',
+            'nav_p90_ms', 'script_ms_per_nav')
+    print('\t'.join(cols + ('overhead_ms', 'evasions')))
+    for r in results:
+        overhead = r['nav_mean_ms'] - \
+            baseline['nav_mean_ms'] if baseline else float('nan')
+        print('\t'.join([f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c]) for c in cols]
+                        + [f"{overhead:.2f}", r['evasions'] or 'none']))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--urls', type=int, default=50,
+                        help='Number of navigations per configuration.')
+    parser.add_argument('--kinds', nargs='+', default=['fast'], choices=PAGE_KINDS,
+                        help='Synthetic page kinds to fetch.')
+    parser.add_argument('--each', action='store_true',
+                        help='Also measure each evasion on its own.')
+    parser.add_argument('--launch-options', type=json.loads, default={},
+                        help='Extra browser launch options (JSON).')
+    parser.add_argument('--json', action='store_true',
+                        help='Print full results as JSON.')
+    return parser.parse_args()
+
+
+async def main(args) -> List[Dict[str, Any]]:
+    launch_options = {'headless': True,
+                      'args': ['--no-sandbox'], **args.launch_options}
+    configs = [(), EVASIONS] + \
+        ([(e,) for e in EVASIONS] if args.each else [])
+    results = []
+    with SyntheticSite() as site:
+        urls = site.urls(args.kinds, args.urls)
+        for evasions in configs:
+            results.append(await measure(urls, evasions, launch_options))
+    return results
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
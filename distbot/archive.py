@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from distbot.utils import logger
+from distbot.cdp import respond
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterator, Optional, Union
+from pathlib import Path
+import hashlib
+import sqlite3
+import asyncio
+import json
+import time
+import zlib
+
+if TYPE_CHECKING:
+    from pyppeteer.network_manager import Request, Response
+    from pyppeteer.page import Page
+
+# response headers that don't apply to a replayed (decoded, complete) body.
+_DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+class Archive:
+    """Indexed archive of network exchanges, recorded from pages and replayed to pages through request interception.
+
+    Exchanges are stored in an SQLite database indexed by (method, url, post data). Response bodies are compressed and
+    stored once per unique content, so resources shared by many pages (scripts, stylesheets, images) take no extra space.
+    """
+
+    def __init__(self, path: Union[str, Path], commit_every: int = 100):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS exchanges (
+                id INTEGER PRIMARY KEY,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                post_data TEXT NOT NULL DEFAULT '',
+                resource_type TEXT,
+                request_headers TEXT,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body_hash TEXT,
+                recorded REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS exchanges_key ON exchanges (method, url, post_data);
+            CREATE TABLE IF NOT EXISTS bodies (
+                hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        # replay statistics.
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, method: str, url: str, status: int, headers: Dict[str, str], body: Optional[bytes] = None,
+            post_data: str = None, resource_type: str = None, request_headers: Dict[str, str] = None) -> None:
+        """Store a network exchange. A later exchange with the same request replaces the earlier one on replay."""
+        body_hash = None
+        if body is not None:
+            body_hash = hashlib.sha1(body).hexdigest()
+            self.db.execute('INSERT OR IGNORE INTO bodies VALUES (?, ?, ?)',
+                            (body_hash, len(body), zlib.compress(body)))
+        self.db.execute("""INSERT INTO exchanges (method, url, post_data, resource_type, request_headers, status,
+                           headers, body_hash, recorded) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (method, url, post_data or '', resource_type, json.dumps(request_headers or {}), status,
+                         json.dumps(headers), body_hash, time.time()))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def find(self, method: str, url: str, post_data: str = None) -> Optional[Dict[str, Any]]:
+        """Most recently recorded response for request, or None."""
+        row = self.db.execute("""SELECT e.status, e.headers, b.data FROM exchanges e
+                                 LEFT JOIN bodies b ON b.hash = e.body_hash
+                                 WHERE e.method = ? AND e.url = ? AND e.post_data = ?
+                                 ORDER BY e.id DESC LIMIT 1""", (method, url, post_data or '')).fetchone()
+        if row is None:
+            return None
+        status, headers, data = row
+        return {'status': status,
+                'headers': json.loads(headers),
+                'body': zlib.decompress(data) if data is not None else b''}
+
+    def exchanges(self) -> Iterator[Dict[str, Any]]:
+        """Metadata of all recorded exchanges, in recording order."""
+        for method, url, resource_type, status, size, recorded in self.db.execute(
+                """SELECT e.method, e.url, e.resource_type, e.status, b.size, e.recorded FROM exchanges e
+                   LEFT JOIN bodies b ON b.hash = e.body_hash ORDER BY e.id"""):
+            yield {'method': method, 'url': url, 'resource_type': resource_type,
+                   'status': status, 'size': size, 'recorded': recorded}
+
+    def __len__(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM exchanges').fetchone()[0]
+
+    async def record_response(self, response: Response) -> None:
+        """Store a response received by a page."""
+        request = response.request
+        if not response.url.startswith(('http:', 'https:')):
+            return
+        body = None
+        # redirect responses have no body.
+        if not 300 <= response.status < 400:
+            try:
+                body = await response.buffer()
+            except Exception as e:
+                logger.debug(f"Could not get response body {response.url}: {e}")
+        self.add(request.method, response.url, response.status, response.headers, body,
+                 post_data=request.postData, resource_type=request.resourceType, request_headers=request.headers)
+
+    def replay_response(self, request: Request) -> Optional[Dict[str, Any]]:
+        """Response to fulfill request with (see Request.respond), or None if request wasn't recorded."""
+        recorded = self.find(request.method, request.url, request.postData)
+        if recorded is None:
+            self.misses += 1
+            logger.debug(f"Not in archive: {request.method} {request.url}")
+            return None
+        self.hits += 1
+        return {'status': recorded['status'],
+                'headers': _replay_headers(recorded['headers']),
+                'body': recorded['body']}
+
+    async def replay_request(self, request: Request, passthrough: bool = False) -> None:
+        """Fulfill request from the archive. Abort it (or continue it if {passthrough}) if it wasn't recorded."""
+        response = self.replay_response(request)
+        if response is not None:
+            await respond(request, response)
+        elif passthrough:
+            await request.continue_()
+        else:
+            await request.abort('internetdisconnected')
+
+    def record(self, page: Page, create_task: Callable[[Awaitable], asyncio.Task] = asyncio.create_task) -> None:
+        """Store all responses page receives. Responses are stored in tasks started with {create_task}."""
+        page.on('response', lambda response: create_task(
+            self.record_response(response)))
+
+    def commit(self) -> None:
+        self.db.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.db.close()
+
+
+def _replay_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    # pyppeteer joins repeated headers with newlines. most can be combined into one comma separated value, but
+    # Set-Cookie values contain commas (in expiry dates), so they stay newline separated and are sent as separate
+    # header lines (see distbot.cdp.raw_response).
+    return {k: v if k.lower() == 'set-cookie' else ', '.join(v.split('\n'))
+            for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
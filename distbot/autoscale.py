@@ -0,0 +1,155 @@
+from distbot.utils import logger
+
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+
+def host_usage() -> Optional[Tuple[float, float]]:
+    """CPU and memory utilization (percent) of this machine since the last call, or None if psutil isn't installed."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.cpu_percent(), psutil.virtual_memory().percent
+
+
+class Autoscaler:
+    """Adjust a Spider's pages per browser and number of browsers to maximize throughput.
+
+    Every {interval} seconds, throughput (navigations/s), mean navigation latency, error rate and host CPU and memory
+    usage are measured over the interval. Capacity is changed one step at a time in the current direction while
+    throughput improves, and the direction is reversed when throughput drops, or latency rises without a throughput
+    gain (hill climbing). Capacity is reduced while the error rate or host usage is over its limit, and is held while
+    no requests are waiting for pages, since throughput is then limited by demand.
+    Steps add a page to each browser until {max_pages} per browser, then add browsers until {max_browsers}.
+    Steps down remove browsers until {min_browsers}, then pages until {min_pages}.
+    New browsers are launched on {server} with {launch_options}. Shared (leased) browsers are not scaled.
+    """
+
+    def __init__(self, spider, min_pages: int = 1, max_pages: int = 8, min_browsers: int = 1, max_browsers: int = 4,
+                 interval: float = 30, server: str = None, launch_options: Dict[str, Any] = None,
+                 max_error_rate: float = 0.2, max_cpu: float = 90, max_memory: float = 90,
+                 tolerance: float = 0.05):
+        self.spider = spider
+        self.min_pages = min_pages
+        self.max_pages = max_pages
+        self.min_browsers = min_browsers
+        self.max_browsers = max_browsers
+        self.interval = interval
+        self.server = server
+        self.launch_options = launch_options or {}
+        self.max_error_rate = max_error_rate
+        self.max_cpu = max_cpu
+        self.max_memory = max_memory
+        # relative throughput change that is treated as noise.
+        self.tolerance = tolerance
+        self.direction = 1
+        # samples of every interval, oldest first.
+        self.history: List[Dict[str, float]] = []
+        # sample that the last step is compared against.
+        self._baseline: Optional[Dict[str, float]] = None
+        self._last_stats: Dict[str, float] = None
+        self._last_time: float = None
+        self.task: asyncio.Task = None
+
+    def browsers(self) -> List[Any]:
+        """Browsers that can be scaled."""
+        return [b for b, data in self.spider.browsers.items() if not data.get('shared') and not data['draining']]
+
+    @property
+    def pages_per_browser(self) -> int:
+        return max((self.spider.browsers[b]['page_count'] for b in self.browsers()), default=self.min_pages)
+
+    def sample(self) -> Dict[str, float]:
+        """Measurements since the last sample."""
+        now = time.monotonic()
+        stats = dict(self.spider.stats)
+        last = self._last_stats or stats
+        elapsed = now - self._last_time if self._last_time is not None else 0
+        self._last_stats, self._last_time = stats, now
+        navigations = stats.get('navigations', 0) - last.get('navigations', 0)
+        errors = stats.get('errors', 0) - last.get('errors', 0)
+        usage = host_usage()
+        return {
+            'throughput': navigations / elapsed if elapsed else 0.0,
+            'latency': (stats.get('latency', 0) - last.get('latency', 0)) / navigations if navigations else 0.0,
+            'error_rate': errors / (navigations + errors) if navigations + errors else 0.0,
+            'cpu': usage[0] if usage else 0.0,
+            'memory': usage[1] if usage else 0.0,
+            'waiting': self.spider.scheduler.qsize(),
+            'browsers': len(self.browsers()),
+            'pages_per_browser': self.pages_per_browser,
+        }
+
+    def decide(self, sample: Dict[str, float]) -> int:
+        """Step to take given the latest sample: 1 (add capacity), -1 (remove capacity) or 0."""
+        if sample['error_rate'] > self.max_error_rate or sample['cpu'] > self.max_cpu \
+                or sample['memory'] > self.max_memory:
+            self.direction = -1
+            self._baseline = None
+            return -1
+        if not sample['waiting']:
+            # requests don't wait for pages, so more pages can't help.
+            self._baseline = None
+            return 0
+        baseline, self._baseline = self._baseline, sample
+        if baseline is None:
+            return self.direction
+        gain = sample['throughput'] - baseline['throughput']
+        if gain < -self.tolerance * baseline['throughput'] or (
+                gain <= self.tolerance * baseline['throughput']
+                and sample['latency'] > (1 + 2 * self.tolerance) * baseline['latency'] > 0):
+            # the last step made things worse. go back.
+            self.direction = -self.direction
+            return self.direction
+        if gain > self.tolerance * baseline['throughput']:
+            return self.direction
+        return 0
+
+    async def scale(self, step: int) -> bool:
+        """Add (step > 0) or remove (step < 0) one step of capacity. Return False if a bound was reached."""
+        browsers = self.browsers()
+        pages = self.pages_per_browser
+        if step > 0:
+            if browsers and pages < self.max_pages:
+                await asyncio.gather(*[self.spider.add_page(b) for b in browsers
+                                       if self.spider.browsers[b]['page_count'] <= pages])
+            elif len(browsers) < self.max_browsers:
+                await self.spider.add_browser(pages=pages, server=self.server, launch_options=self.launch_options)
+            else:
+                return False
+        else:
+            if len(browsers) > self.min_browsers:
+                # close the newest browser once its pages are done.
+                self.spider._create_task(self.spider.remove_browser(browsers[-1]))
+            elif pages > self.min_pages:
+                await asyncio.gather(*[self.spider.remove_page(b) for b in browsers
+                                       if self.spider.browsers[b]['page_count'] >= pages])
+            else:
+                return False
+        return True
+
+    async def run(self) -> None:
+        self.sample()
+        while True:
+            await asyncio.sleep(self.interval)
+            sample = self.sample()
+            self.history.append(sample)
+            step = self.decide(sample)
+            if step and not await self.scale(step):
+                # at a bound. hold until throughput drops.
+                step = 0
+            logger.info("Autoscale: %.2f pages/s, %.2fs latency, %.0f%% errors, %s browsers x %s pages, step %s",
+                        sample['throughput'], sample['latency'], 100 * sample['error_rate'], sample['browsers'],
+                        sample['pages_per_browser'], step,
+                        extra={'event': 'autoscale', 'latency': sample['latency']})
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
@@ -0,0 +1,172 @@
+from distbot.utils import logger
+from distbot.crawl import normalize_url
+
+from typing import Any, Dict, Optional, Union
+from pathlib import Path
+import sqlite3
+import asyncio
+import json
+import time
+import re
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*(?:s-)?max-age\s*=\s*"?(\d+)', re.I)
+
+
+def freshness_lifetime(headers: Dict[str, str], ttl: float) -> Optional[float]:
+    """Seconds a response with {headers} can be served without revalidation (at most {ttl}).
+       None if the response must not be stored."""
+    cache_control = {k.lower(): v for k, v in headers.items()}.get('cache-control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0
+    max_age = _MAX_AGE.search(cache_control)
+    if max_age:
+        return min(int(max_age.group(1)), ttl)
+    return ttl
+
+
+class ResponseCache:
+    """On-disk cache of navigation results, keyed by normalized URL and an optional key naming the kind of output
+    (e.g. the extractor), so one URL can have several cached outputs.
+
+    Entries hold the status, final URL, headers, validators (ETag/Last-Modified) and extracted output of a navigation.
+    Fresh entries are served as is. Stale entries with a validator are revalidated with a conditional HTTP request,
+    which is far cheaper than a browser navigation. Least recently used entries are evicted when the cache exceeds
+    {max_bytes} or {max_entries}.
+    """
+
+    def __init__(self, path: Union[str, Path] = ':memory:', ttl: float = 3600,
+                 max_bytes: int = None, max_entries: int = None, commit_every: int = 20):
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                final_url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                output TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+        """)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        self._count, self._size = self.db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        # lookup statistics.
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def get(self, url: str, key: str = None) -> Optional[Dict[str, Any]]:
+        """Cached entry for url and {key} (fresh or stale), or None."""
+        key = self._key(url, key)
+        row = self.db.execute("""SELECT url, final_url, status, headers, etag, last_modified, output, expires
+                                 FROM responses WHERE key = ?""", (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (time.time(), key))
+        url, final_url, status, headers, etag, last_modified, output, expires = row
+        return {'key': key, 'url': url, 'final_url': final_url, 'status': status,
+                'headers': json.loads(headers), 'etag': etag, 'last_modified': last_modified,
+                'output': json.loads(output), 'expires': expires}
+
+    def put(self, url: str, status: int, headers: Dict[str, str], output: Any, final_url: str = None,
+            key: str = None) -> bool:
+        """Store the result of navigating to url under {key}. {output} must be JSON serializable.
+           Return False if the response's Cache-Control forbids storing it."""
+        lifetime = freshness_lifetime(headers, self.ttl)
+        if lifetime is None:
+            return False
+        key = self._key(url, key)
+        lower = {k.lower(): v for k, v in headers.items()}
+        headers_json, output_json = json.dumps(headers), json.dumps(output)
+        size = len(headers_json) + len(output_json)
+        old = self.db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        if old:
+            self._count -= 1
+            self._size -= old[0]
+        now = time.time()
+        self.db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (key, url, final_url or url, status, headers_json, lower.get('etag'),
+                         lower.get('last-modified'), output_json, size, now + lifetime, now))
+        self._count += 1
+        self._size += size
+        self._evict()
+        self._changed()
+        return True
+
+    @staticmethod
+    def _key(url: str, key: str = None) -> str:
+        url_key = normalize_url(url) or url
+        return url_key if key is None else f"{url_key}\t{key}"
+
+    def fresh(self, entry: Dict[str, Any]) -> bool:
+        return entry['expires'] > time.time()
+
+    def refresh(self, entry: Dict[str, Any], headers: Dict[str, str] = {}) -> None:
+        """Mark entry fresh again after the server confirmed it's unchanged. {headers} are the 304 response's headers."""
+        lifetime = freshness_lifetime({**entry['headers'], **headers}, self.ttl) or 0
+        entry['expires'] = time.time() + lifetime
+        self.db.execute('UPDATE responses SET expires = ? WHERE key = ?', (entry['expires'], entry['key']))
+        self._changed()
+
+    async def revalidate(self, entry: Dict[str, Any], headers: Dict[str, str] = None, timeout: float = 10) -> bool:
+        """Ask the server whether entry is still current with a conditional request.
+           Return True (and refresh the entry) if it is unchanged."""
+        import requests
+        conditions = {}
+        if entry['etag']:
+            conditions['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            conditions['If-Modified-Since'] = entry['last_modified']
+        if not conditions:
+            return False
+        try:
+            resp = await asyncio.get_running_loop().run_in_executor(None, lambda: requests.get(
+                entry['final_url'], headers={**(headers or {}), **conditions}, timeout=timeout, stream=True))
+            # the body of a changed page isn't needed, the browser will load it.
+            resp.close()
+        except Exception as e:
+            logger.warning("Could not revalidate %s: %s", entry['url'], e,
+                           extra={'event': 'revalidate_error', 'url': entry['url']})
+            return False
+        if resp.status_code != 304:
+            return False
+        self.refresh(entry, dict(resp.headers))
+        return True
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is within its limits."""
+        while self._count and ((self.max_entries is not None and self._count > self.max_entries)
+                               or (self.max_bytes is not None and self._size > self.max_bytes)):
+            key, size = self.db.execute(
+                'SELECT key, size FROM responses ORDER BY accessed LIMIT 1').fetchone()
+            self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._count -= 1
+            self._size -= size
+
+    def _changed(self) -> None:
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def commit(self) -> None:
+        self.db.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.db.close()
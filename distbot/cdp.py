@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from distbot.utils import logger
+
+from typing import TYPE_CHECKING, Any, Deque, Dict, Tuple
+from collections import deque
+from functools import partial
+import asyncio
+import base64
+
+if TYPE_CHECKING:
+    from pyppeteer.connection import CDPSession
+    from pyppeteer.network_manager import Request
+
+
+class CDPDispatcher:
+    """Send DevTools protocol commands over one browser connection with at most {max_outstanding} awaiting a response.
+
+    Commands over the limit wait in a FIFO queue and are sent as responses arrive, so a burst of commands (e.g. one
+    per intercepted sub-resource of an asset-heavy page) doesn't flood the browser's websocket. Commands are sent from
+    callbacks, so no task is created per command.
+    """
+
+    def __init__(self, max_outstanding: int = 100):
+        self.max_outstanding = max_outstanding
+        # (session, method, params, result future, time queued)
+        self.queue: Deque[Tuple[CDPSession, str, Dict[str, Any], asyncio.Future, float]] = deque()
+        self.outstanding = 0
+        # metrics.
+        self.sent = 0
+        self.peak_queued = 0
+        self.queue_time = 0.0
+
+    def send(self, session: CDPSession, method: str, params: Dict[str, Any] = None) -> asyncio.Future:
+        """Send command when there is room. Return a future of its result."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.queue.append((session, method, params, fut, loop.time()))
+        self.peak_queued = max(self.peak_queued, len(self.queue))
+        self._flush()
+        return fut
+
+    def send_nowait(self, session: CDPSession, method: str, params: Dict[str, Any] = None) -> None:
+        """Send command whose result isn't needed. Errors are logged."""
+        self.send(session, method, params).add_done_callback(partial(_log_error, method))
+
+    def _flush(self) -> None:
+        now = asyncio.get_running_loop().time()
+        while self.queue and self.outstanding < self.max_outstanding:
+            session, method, params, fut, queued = self.queue.popleft()
+            if fut.done():
+                # caller stopped waiting (e.g. timed out).
+                continue
+            self.queue_time += now - queued
+            self.sent += 1
+            try:
+                result = session.send(method, params)
+            except Exception as e:
+                # session is closed.
+                fut.set_exception(e)
+                continue
+            self.outstanding += 1
+            result.add_done_callback(partial(self._on_result, fut))
+
+    def _on_result(self, fut: asyncio.Future, result: asyncio.Future) -> None:
+        self.outstanding -= 1
+        if not fut.done():
+            if result.cancelled():
+                fut.cancel()
+            elif result.exception() is not None:
+                fut.set_exception(result.exception())
+            else:
+                fut.set_result(result.result())
+        elif not result.cancelled():
+            # retrieve the exception, so it isn't reported as never retrieved.
+            result.exception()
+        self._flush()
+
+    def metrics(self) -> Dict[str, float]:
+        return {'queued': len(self.queue),
+                'outstanding': self.outstanding,
+                'sent': self.sent,
+                'peak_queued': self.peak_queued,
+                'mean_queue_ms': 1000 * self.queue_time / self.sent if self.sent else 0.0}
+
+
+def _log_error(method: str, fut: asyncio.Future) -> None:
+    if not fut.cancelled() and fut.exception() is not None:
+        logger.debug(f"{method} failed: {fut.exception()}")
+
+
+def _handle(request: Request) -> bool:
+    """Mark intercepted request as handled. Return False if it was already handled."""
+    if request._interceptionHandled:
+        return False
+    request._interceptionHandled = True
+    return True
+
+
+def continue_request(dispatcher: CDPDispatcher, request: Request, overrides: Dict[str, Any] = None) -> None:
+    """Request.continue_ without a coroutine, for handling interception events inline."""
+    if _handle(request):
+        dispatcher.send_nowait(request._client, 'Network.continueInterceptedRequest',
+                               {'interceptionId': request._interceptionId, **(overrides or {})})
+
+
+def abort_request(dispatcher: CDPDispatcher, request: Request, error_code: str = 'failed') -> None:
+    """Request.abort without a coroutine, for handling interception events inline."""
+    from pyppeteer.network_manager import errorReasons
+    if _handle(request):
+        dispatcher.send_nowait(request._client, 'Network.continueInterceptedRequest',
+                               {'interceptionId': request._interceptionId, 'errorReason': errorReasons[error_code]})
+
+
+def respond_request(dispatcher: CDPDispatcher, request: Request, response: Dict[str, Any]) -> None:
+    """Request.respond without a coroutine, for handling interception events inline."""
+    if request.url.startswith('data:') or not _handle(request):
+        return
+    dispatcher.send_nowait(request._client, 'Network.continueInterceptedRequest', {
+        'interceptionId': request._interceptionId, 'rawResponse': raw_response(response)})
+
+
+async def respond(request: Request, response: Dict[str, Any]) -> None:
+    """Request.respond that keeps newline-separated header values (e.g. Set-Cookie) as separate header lines."""
+    if request.url.startswith('data:') or not _handle(request):
+        return
+    try:
+        await request._client.send('Network.continueInterceptedRequest', {
+            'interceptionId': request._interceptionId, 'rawResponse': raw_response(response)})
+    except Exception as e:
+        logger.debug(f"Could not respond to {request.url}: {e}")
+
+
+def raw_response(response: Dict[str, Any]) -> str:
+    """Base64 encoded HTTP response for Network.continueInterceptedRequest.
+       A header value with newlines is sent as one header line per value, so repeated headers like Set-Cookie
+       aren't merged."""
+    from pyppeteer.network_manager import statusTexts
+    body = response.get('body') or b''
+    if isinstance(body, str):
+        body = body.encode()
+    headers = {k.lower(): v for k, v in response.get('headers', {}).items()}
+    if body and 'content-length' not in headers:
+        headers['content-length'] = len(body)
+    status = response.get('status', 200)
+    head = f"HTTP/1.1 {status} {statusTexts.get(str(status), '')}\r\n" + \
+        ''.join(f"{k}: {v}\r\n" for k, values in headers.items() for v in str(values).split('\n')) + '\r\n'
+    return base64.b64encode(head.encode() + body).decode('ascii')
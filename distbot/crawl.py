@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from distbot.utils import logger
+from distbot.dedupe import DuplicateIndex, page_fingerprint
+
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from pathlib import Path
+import posixpath
+import tempfile
+import shutil
+import hashlib
+import sqlite3
+import asyncio
+import heapq
+import math
+import re
+
+if TYPE_CHECKING:
+    from pyppeteer.page import Page
+
+# query parameters that only track where a visitor came from.
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|_ga)$')
+
+_extract_links_js = """() => Array.from(document.querySelectorAll('a[href], area[href]'), a => a.href)"""
+
+
+async def extract_links(page: Page) -> List[str]:
+    """Absolute URLs of all links on page (one page.evaluate)."""
+    return await page.evaluate(_extract_links_js)
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Normalize url so that equivalent URLs compare equal. Return None for non-HTTP URLs."""
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and not (scheme, port) in (('http', 80), ('https', 443)):
+        netloc += f':{port}'
+    path = parts.path or '/'
+    if '.' in path:
+        # resolve '.' and '..' segments.
+        path = posixpath.normpath(path) + ('/' if path.endswith('/') and path != '/' else '')
+        path = '/' + path.lstrip('/')
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not TRACKING_PARAMS.match(k)))
+    # fragments never change what the server returns.
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class CrawlScope:
+    """Rules for which discovered URLs should be crawled."""
+
+    def __init__(self, domains: Iterable[str] = None, max_depth: int = None,
+                 allow: Iterable[str] = None, deny: Iterable[str] = None):
+        # allowed domains (subdomains are included). None means all domains.
+        self.domains = [d.lower().lstrip('.') for d in domains] if domains else None
+        self.max_depth = max_depth
+        # URL must match at least one allow pattern and no deny patterns.
+        self.allow = [re.compile(p) for p in allow] if allow else None
+        self.deny = [re.compile(p) for p in deny] if deny else []
+
+    def in_scope(self, url: str, depth: int = 0) -> bool:
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if self.domains is not None:
+            host = urlsplit(url).hostname or ''
+            if not any(host == d or host.endswith('.' + d) for d in self.domains):
+                return False
+        if self.allow is not None and not any(p.search(url) for p in self.allow):
+            return False
+        return not any(p.search(url) for p in self.deny)
+
+
+class BloomFilter:
+    """Probabilistic set with no false negatives and a {error_rate} false positive rate at {capacity} items."""
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        # double hashing: k positions from 2 hashes.
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> bool:
+        """Add item. Return True if item was (probably) already present."""
+        present = True
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+
+class SeenSet:
+    """Set of seen URLs for crawls with tens of millions of URLs.
+       A Bloom filter answers most lookups from memory and an SQLite store on disk resolves Bloom filter hits exactly."""
+
+    def __init__(self, path: Union[str, Path] = None, capacity: int = 10_000_000,
+                 error_rate: float = 0.001, commit_every: int = 10_000):
+        # temporary directory holding the database if no path is given. it is removed on close.
+        self._temp_dir = None
+        if path is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='distbot_')
+            path = Path(self._temp_dir).joinpath('seen.db')
+        self.path = Path(path)
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY) WITHOUT ROWID')
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        # load URLs seen in previous runs.
+        for (url,) in self.db.execute('SELECT url FROM seen'):
+            self.bloom.add(url)
+
+    def add(self, url: str) -> bool:
+        """Add url. Return True if url had not been seen."""
+        if url in self.bloom and self._stored(url):
+            return False
+        self.bloom.add(url)
+        self.db.execute('INSERT OR IGNORE INTO seen VALUES (?)', (url,))
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+        return True
+
+    def _stored(self, url: str) -> bool:
+        return self.db.execute('SELECT 1 FROM seen WHERE url = ?', (url,)).fetchone() is not None
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.bloom and self._stored(url)
+
+    def __len__(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def commit(self) -> None:
+        self.db.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.db.close()
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+
+class Crawler:
+    """Recursively crawl links with a Spider."""
+
+    def __init__(self, spider, scope: CrawlScope = None, seen: SeenSet = None,
+                 handler: Callable = None, concurrency: int = None, dedupe: DuplicateIndex = None,
+                 skip_duplicates: bool = True, duplicate_penalty: float = 10, **get_kwargs):
+        self.spider = spider
+        self.scope = scope or CrawlScope()
+        # a SeenSet created here is temporary and closed at the end of the crawl.
+        self._own_seen = seen is None
+        self.seen = seen if seen is not None else SeenSet()
+        # async function called with (url, response, page, depth) for each crawled page.
+        self.handler = handler
+        self.concurrency = concurrency
+        self.get_kwargs = get_kwargs
+        # near-duplicate detection. URLs with patterns that often produce duplicates are crawled later.
+        self.dedupe = dedupe
+        self.skip_duplicates = skip_duplicates
+        self.duplicate_penalty = duplicate_penalty
+        # heap of (priority, sequence number, url, depth). lower priority is crawled first.
+        self.frontier = []
+        self._seq = 0
+        self._in_flight = 0
+        self._changed = asyncio.Condition()
+        self.crawled = 0
+
+    def add(self, url: str, depth: int = 0, priority: float = None) -> bool:
+        """Add url to the frontier if it is in scope and has not been seen. Return True if added."""
+        url = normalize_url(url)
+        if url is None or not self.scope.in_scope(url, depth) or not self.seen.add(url):
+            return False
+        if priority is None:
+            # breadth-first by default.
+            priority = depth
+            if self.dedupe is not None:
+                priority += self.duplicate_penalty * self.dedupe.penalty(url)
+        heapq.heappush(self.frontier, (priority, self._seq, url, depth))
+        self._seq += 1
+        return True
+
+    async def run(self, seeds: Iterable[str]) -> int:
+        """Crawl from seeds until there are no more in-scope links. Return number of pages crawled."""
+        for url in seeds:
+            self.add(url)
+        concurrency = self.concurrency or max(len(self.spider.pages), 1)
+        try:
+            await asyncio.gather(*[self._worker() for _ in range(concurrency)])
+        finally:
+            if self._own_seen:
+                self.seen.close()
+            else:
+                self.seen.commit()
+        logger.info(f"Crawl finished. Crawled {self.crawled} pages.")
+        return self.crawled
+
+    async def _next(self):
+        """Next frontier item, or None if crawl is finished."""
+        async with self._changed:
+            # more links may be discovered while pages are in flight.
+            while not self.frontier and self._in_flight:
+                await self._changed.wait()
+            if not self.frontier:
+                return None
+            self._in_flight += 1
+            return heapq.heappop(self.frontier)
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._next()
+            if item is None:
+                return
+            _, _, url, depth = item
+            try:
+                await self._crawl(url, depth)
+            except Exception as e:
+                logger.exception(f"Error crawling {url}: {e}")
+            finally:
+                async with self._changed:
+                    self._in_flight -= 1
+                    self._changed.notify_all()
+
+    async def _crawl(self, url: str, depth: int) -> None:
+        result = await self.spider.get(url, **self.get_kwargs)
+        if result is None:
+            return
+        resp, page = result
+        try:
+            self.crawled += 1
+            if self.dedupe is not None:
+                duplicate_of = self.dedupe.check(url, await page_fingerprint(page))
+                if duplicate_of is not None:
+                    logger.info(f"{url} is a near-duplicate of {duplicate_of}")
+                    if self.skip_duplicates:
+                        return
+            links = await extract_links(page)
+            if self.handler is not None:
+                await self.handler(url, resp, page, depth)
+        finally:
+            await self.spider.set_idle(page)
+        for link in links:
+            self.add(link, depth + 1)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from collections import defaultdict
+from urllib.parse import urlsplit, parse_qsl
+import hashlib
+import re
+
+if TYPE_CHECKING:
+    from pyppeteer.page import Page
+
+_WORD = re.compile(r'\w+')
+# path segments that are probably IDs.
+_ID_SEGMENT = re.compile(r'^([0-9a-f]{8,}|[0-9a-f-]{32,36}|\d+)$', re.I)
+_DIGITS = re.compile(r'\d+')
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash of text's word shingles. Similar texts have fingerprints with a small hamming distance."""
+    words = _WORD.findall(text.lower())
+    shingles = [' '.join(words[i:i+shingle_size])
+                for i in range(max(len(words) - shingle_size + 1, 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        h = _hash64(shingle)
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def url_pattern(url: str) -> str:
+    """URL with IDs and query values removed, so URL variants of the same template compare equal."""
+    parts = urlsplit(url)
+    segments = ['{id}' if _ID_SEGMENT.match(s) else _DIGITS.sub('{n}', s)
+                for s in parts.path.split('/')]
+    keys = sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    return f"{parts.hostname}{'/'.join(segments)}" + (f"?{'&'.join(keys)}" if keys else '')
+
+
+async def page_fingerprint(page: Page) -> int:
+    """SimHash of the page's visible text."""
+    return simhash(await page.evaluate("() => document.body ? document.body.innerText : ''"))
+
+
+class DuplicateIndex:
+    """Index of page fingerprints that finds near-duplicates within {max_distance} bits.
+
+    Fingerprints are split into {max_distance}+1 bands. By the pigeonhole principle, two fingerprints within
+    {max_distance} bits share at least one identical band, so only fingerprints in matching band buckets are compared.
+    """
+
+    def __init__(self, max_distance: int = 3, min_pattern_samples: int = 10):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        # (band number, band value) -> fingerprints.
+        self.buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        # fingerprint -> first URL seen with that fingerprint.
+        self.urls: Dict[int, str] = {}
+        # URL pattern -> [duplicate count, total count]
+        self.pattern_stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        self.min_pattern_samples = min_pattern_samples
+        self.duplicates = 0
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [(i, fingerprint >> (i * self.band_bits) & mask) for i in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """URL of a near-duplicate of fingerprint, or None."""
+        if fingerprint in self.urls:
+            return self.urls[fingerprint]
+        for key in self._band_keys(fingerprint):
+            for other in self.buckets.get(key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return self.urls[other]
+
+    def check(self, url: str, fingerprint: int) -> Optional[str]:
+        """Record page at url. Return URL of the page it duplicates, or None if it's new."""
+        duplicate_of = self.find(fingerprint)
+        stats = self.pattern_stats[url_pattern(url)]
+        stats[1] += 1
+        if duplicate_of is not None:
+            stats[0] += 1
+            self.duplicates += 1
+            return duplicate_of
+        self.urls[fingerprint] = url
+        for key in self._band_keys(fingerprint):
+            self.buckets[key].append(fingerprint)
+
+    def penalty(self, url: str) -> float:
+        """Fraction of pages with url's pattern that were duplicates (0 if pattern has too few samples)."""
+        stats = self.pattern_stats.get(url_pattern(url))
+        if stats is None or stats[1] < self.min_pattern_samples:
+            return 0.0
+        return stats[0] / stats[1]
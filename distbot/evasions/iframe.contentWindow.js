@@ -0,0 +1,2 @@
+// iframe.contentWindow evasion from extract-stealth-evasions (puppeteer-extra-plugin-stealth).
+(()=>{try{const n=n=>{const e={get(e,t){return"self"===t?this:"frameElement"===t?n:Reflect.get(e,t)}};if(!n.contentWindow){const t=new Proxy(window,e);Object.defineProperty(n,"contentWindow",{get:()=>t,set:n=>n,enumerable:!0,configurable:!1})}},e=(e,t,r)=>{const o=e.apply(t,r),i=o,a=i.srcdoc;return Object.defineProperty(o,"srcdoc",{configurable:!0,get:function(){return i.srcdoc},set:function(e){n(this),Object.defineProperty(o,"srcdoc",{configurable:!1,writable:!1,value:a}),i.srcdoc=e}}),o};(()=>{const n={get:(n,e)=>Reflect.get(n,e),apply:function(n,t,r){return r&&r.length&&"iframe"===(""+r[0]).toLowerCase()?e(n,t,r):n.apply(t,r)}};document.createElement=new Proxy(document.createElement,n)})()}catch(n){}})();
@@ -0,0 +1,3 @@
+// navigator.languages evasion from extract-stealth-evasions (puppeteer-extra-plugin-stealth).
+const opts = {};
+Object.defineProperty(Object.getPrototypeOf(navigator),"languages",{get:()=>opts.languages||["en-US","en"]});
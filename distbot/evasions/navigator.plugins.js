@@ -0,0 +1,40 @@
+// navigator.plugins evasion from extract-stealth-evasions (puppeteer-extra-plugin-stealth).
+((utils, { fns, data }) => {
+        fns = utils.materializeFns(fns)
+
+        // That means we're running headful
+        const hasPlugins = 'plugins' in navigator && navigator.plugins.length
+        if (hasPlugins) {
+          return // nothing to do here
+        }
+
+        const mimeTypes = fns.generateMimeTypeArray(utils, fns)(data.mimeTypes)
+        const plugins = fns.generatePluginArray(utils, fns)(data.plugins)
+
+        // Plugin and MimeType cross-reference each other, let's do that now
+        // Note: We're looping through `data.plugins` here, not the generated `plugins`
+        for (const pluginData of data.plugins) {
+          pluginData.__mimeTypes.forEach((type, index) => {
+            plugins[pluginData.name][index] = mimeTypes[type]
+            plugins[type] = mimeTypes[type]
+            Object.defineProperty(mimeTypes[type], 'enabledPlugins', {
+              value: JSON.parse(JSON.stringify(plugins[pluginData.name])),
+              writable: false,
+              enumerable: false, // Important: `JSON.stringify(navigator.plugins)`
+              configurable: false
+            })
+          })
+        }
+
+        const patchNavigator = (name, value) =>
+          utils.replaceProperty(Object.getPrototypeOf(navigator), name, {
+            get() {
+              return value
+            }
+          })
+
+        patchNavigator('mimeTypes', mimeTypes)
+        patchNavigator('plugins', plugins)
+
+        // All done
+      })(utils, {"fns":{"generateMimeTypeArray":"(utils, fns) => mimeTypesData => {\n  return fns.generateMagicArray(utils, fns)(\n    mimeTypesData,\n    MimeTypeArray.prototype,\n    MimeType.prototype,\n    'type'\n  )\n}","generatePluginArray":"(utils, fns) => pluginsData => {\n  return fns.generateMagicArray(utils, fns)(\n    pluginsData,\n    PluginArray.prototype,\n    Plugin.prototype,\n    'name'\n  )\n}","generateMagicArray":"(utils, fns) =>\n  function(\n    dataArray = [],\n    proto = MimeTypeArray.prototype,\n    itemProto = MimeType.prototype,\n    itemMainProp = 'type'\n  ) {\n    // Quick helper to set props with the same descriptors vanilla is using\n    const defineProp = (obj, prop, value) =>\n      Object.defineProperty(obj, prop, {\n        value,\n        writable: false,\n        enumerable: false, // Important for mimeTypes & plugins: `JSON.stringify(navigator.mimeTypes)`\n        configurable: false\n      })\n\n    // Loop over our fake data and construct items\n    const makeItem = data => {\n      const item = {}\n      for (const prop of Object.keys(data)) {\n        if (prop.startsWith('__')) {\n          continue\n        }\n        defineProp(item, prop, data[prop])\n      }\n      // We need to spoof a specific `MimeType` or `Plugin` object\n      return Object.create(itemProto, Object.getOwnPropertyDescriptors(item))\n    }\n\n    const magicArray = []\n\n    // Loop through our fake data and use that to create convincing entities\n    dataArray.forEach(data => {\n      magicArray.push(makeItem(data))\n    })\n\n    // Add direct property access  based on types (e.g. `obj['application/pdf']`) afterwards\n    magicArray.forEach(entry => {\n      defineProp(magicArray, entry[itemMainProp], entry)\n    })\n\n    // This is the best way to fake the type to make sure this is false: `Array.isArray(navigator.mimeTypes)`\n    const magicArrayObj = Object.create(proto, {\n      ...Object.getOwnPropertyDescriptors(magicArray),\n\n      // There's one ugly quirk we unfortunately need to take care of:\n      // The `MimeTypeArray` prototype has an enumerable `length` property,\n      // but headful Chrome will still skip it when running `Object.getOwnPropertyNames(navigator.mimeTypes)`.\n      // To strip it we need to make it first `configurable` and can then overlay a Proxy with an `ownKeys` trap.\n      length: {\n        value: magicArray.length,\n        writable: false,\n        enumerable: false,\n        configurable: true // Important to be able to use the ownKeys trap in a Proxy to strip `length`\n      }\n    })\n\n    // Generate our functional function mocks :-)\n    const functionMocks = fns.generateFunctionMocks(utils)(\n      proto,\n      itemMainProp,\n      magicArray\n    )\n\n    // We need to overlay our custom object with a JS Proxy\n    const magicArrayObjProxy = new Proxy(magicArrayObj, {\n      get(target, key = '') {\n        // Redirect function calls to our custom proxied versions mocking the vanilla behavior\n        if (key === 'item') {\n          return functionMocks.item\n        }\n        if (key === 'namedItem') {\n          return functionMocks.namedItem\n        }\n        if (proto === PluginArray.prototype && key === 'refresh') {\n          return functionMocks.refresh\n        }\n        // Everything else can pass through as normal\n        return utils.cache.Reflect.get(...arguments)\n      },\n      ownKeys(target) {\n        // There are a couple of quirks where the original property demonstrates \"magical\" behavior that makes no sense\n        // This can be witnessed when calling `Object.getOwnPropertyNames(navigator.mimeTypes)` and the absense of `length`\n        // My guess is that it has to do with the recent change of not allowing data enumeration and this being implemented weirdly\n        // For that reason we just completely fake the available property names based on our data to match what regular Chrome is doing\n        // Specific issues when not patching this: `length` property is available, direct `types` props (e.g. `obj['application/pdf']`) are missing\n        const keys = []\n        const typeProps = magicArray.map(mt => mt[itemMainProp])\n        typeProps.forEach((_, i) => keys.push(`${i}`))\n        typeProps.forEach(propName => keys.push(propName))\n        return keys\n      }\n    })\n\n    return magicArrayObjProxy\n  }","generateFunctionMocks":"utils => (\n  proto,\n  itemMainProp,\n  dataArray\n) => ({\n  /** Returns the MimeType object with the specified index. */\n  item: utils.createProxy(proto.item, {\n    apply(target, ctx, args) {\n      if (!args.length) {\n        throw new TypeError(\n          `Failed to execute 'item' on '${\n            proto[Symbol.toStringTag]\n          }': 1 argument required, but only 0 present.`\n        )\n      }\n      // Special behavior alert:\n      // - Vanilla tries to cast strings to Numbers (only integers!) and use them as property index lookup\n      // - If anything else than an integer (including as string) is provided it will return the first entry\n      const isInteger = args[0] && Number.isInteger(Number(args[0])) // Cast potential string to number first, then check for integer\n      // Note: Vanilla never returns `undefined`\n      return (isInteger ? dataArray[Number(args[0])] : dataArray[0]) || null\n    }\n  }),\n  /** Returns the MimeType object with the specified name. */\n  namedItem: utils.createProxy(proto.namedItem, {\n    apply(target, ctx, args) {\n      if (!args.length) {\n        throw new TypeError(\n          `Failed to execute 'namedItem' on '${\n            proto[Symbol.toStringTag]\n          }': 1 argument required, but only 0 present.`\n        )\n      }\n      return dataArray.find(mt => mt[itemMainProp] === args[0]) || null // Not `undefined`!\n    }\n  }),\n  /** Does nothing and shall return nothing */\n  refresh: proto.refresh\n    ? utils.createProxy(proto.refresh, {\n        apply(target, ctx, args) {\n          return undefined\n        }\n      })\n    : undefined\n})"},"data":{"mimeTypes":[{"type":"application/pdf","suffixes":"pdf","description":"","__pluginName":"Chrome PDF Viewer"},{"type":"application/x-google-chrome-pdf","suffixes":"pdf","description":"Portable Document Format","__pluginName":"Chrome PDF Plugin"},{"type":"application/x-nacl","suffixes":"","description":"Native Client Executable","__pluginName":"Native Client"},{"type":"application/x-pnacl","suffixes":"","description":"Portable Native Client Executable","__pluginName":"Native Client"}],"plugins":[{"name":"Chrome PDF Plugin","filename":"internal-pdf-viewer","description":"Portable Document Format","__mimeTypes":["application/x-google-chrome-pdf"]},{"name":"Chrome PDF Viewer","filename":"mhjfbmdgcfjbbpaeojofohoefgiehjai","description":"","__mimeTypes":["application/pdf"]},{"name":"Native Client","filename":"internal-nacl-plugin","description":"","__mimeTypes":["application/x-nacl","application/x-pnacl"]}]}});
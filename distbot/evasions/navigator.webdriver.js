@@ -0,0 +1,2 @@
+// navigator.webdriver evasion from extract-stealth-evasions (puppeteer-extra-plugin-stealth).
+delete Object.getPrototypeOf(navigator).webdriver;
@@ -0,0 +1,2 @@
+// window.outerdimensions evasion from extract-stealth-evasions (puppeteer-extra-plugin-stealth).
+(()=>{try{if(window.outerWidth&&window.outerHeight)return;const n=85;window.outerWidth=window.innerWidth,window.outerHeight=window.innerHeight+n}catch(n){}})();
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from itertools import product
+import logging
+import asyncio
+
+if TYPE_CHECKING:
+    from pyppeteer.page import Page
+
+# wait until there have been no DOM mutations for {idle} ms (or {maxWait} ms have passed).
+_wait_quiet_js = """const waitQuiet = (idle, maxWait) => new Promise(resolve => {
+    const start = performance.now();
+    let lastChange = start;
+    const observer = new MutationObserver(() => { lastChange = performance.now(); });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    const check = () => {
+        const now = performance.now();
+        if (now - lastChange >= idle || now - start >= maxWait) {
+            observer.disconnect();
+            resolve();
+        } else {
+            setTimeout(check, Math.min(50, idle));
+        }
+    };
+    setTimeout(check, Math.min(50, idle));
+});
+// cheap 32-bit FNV-1a hash of the current DOM, used to skip DOM states that have already been seen.
+const fingerprint = () => {
+    const html = document.documentElement.outerHTML;
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < html.length; i++) {
+        hash ^= html.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return (hash >>> 0).toString(16) + ':' + html.length;
+};"""
+
+_hover_js = """async (xpath, idle, maxWait) => {
+    %s
+    const fire = (ele, types) => {
+        const rect = ele.getBoundingClientRect();
+        const init = {bubbles: true, cancelable: true, view: window,
+                      clientX: rect.left + rect.width / 2, clientY: rect.top + rect.height / 2};
+        for (const type of types) {
+            const Event = type.startsWith('pointer') ? PointerEvent : MouseEvent;
+            ele.dispatchEvent(new Event(type, init));
+        }
+    };
+    const hidden = e => {
+        const style = getComputedStyle(e);
+        return style.display === 'none' || style.visibility === 'hidden';
+    };
+    // synthetic events don't apply CSS :hover, so menus shown by it stay hidden.
+    const mayNeedInput = ele => Array.from(ele.querySelectorAll('*')).some(hidden) ||
+        (ele.nextElementSibling !== null && hidden(ele.nextElementSibling));
+    let mutations = 0;
+    const observer = new MutationObserver(records => { mutations += records.length; });
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    const hovered = new Set();
+    const needInput = new Set();
+    let last = null;
+    while (true) {
+        const snapshot = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        let added = 0;
+        for (let i = 0; i < snapshot.snapshotLength; i++) {
+            const ele = snapshot.snapshotItem(i);
+            if (hovered.has(ele)) continue;
+            hovered.add(ele);
+            added += 1;
+            if (last) fire(last, ['pointerout', 'pointerleave', 'mouseout', 'mouseleave']);
+            ele.scrollIntoView({block: 'center'});
+            mutations = 0;
+            fire(ele, ['pointerover', 'pointerenter', 'mouseover', 'mouseenter', 'pointermove', 'mousemove']);
+            last = ele;
+            await waitQuiet(idle, maxWait);
+            if (!mutations && mayNeedInput(ele)) needInput.add(ele);
+        }
+        // hovering may have loaded more elements. stop when no new elements appear.
+        if (!added) {
+            observer.disconnect();
+            // positions (in the final snapshot) of elements to hover with real mouse input.
+            const positions = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) {
+                if (needInput.has(snapshot.snapshotItem(i))) positions.push(i);
+            }
+            return [hovered.size, positions];
+        }
+    }
+}""" % _wait_quiet_js
+
+_wait_quiet_call_js = """async (idle, maxWait) => {
+    %s
+    await waitQuiet(idle, maxWait);
+}""" % _wait_quiet_js
+
+_select_options_js = """() => Array.from(document.querySelectorAll('select')).map(
+    select => Array.from(select.querySelectorAll('option[value]')).map(option => option.value))"""
+
+_apply_select_states_js = """async (states, known, idle, maxWait) => {
+    %s
+    const selects = document.querySelectorAll('select');
+    const seen = new Set(known);
+    const results = [];
+    for (const state of states) {
+        for (const [idx, value] of state) {
+            const select = selects[idx];
+            if (!select || select.value === value) continue;
+            select.value = value;
+            select.dispatchEvent(new Event('input', {bubbles: true}));
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+        await waitQuiet(idle, maxWait);
+        const fp = fingerprint();
+        // only serialize DOM states that haven't been seen.
+        results.push(seen.has(fp) ? [fp, null] : [fp, document.documentElement.outerHTML]);
+        seen.add(fp);
+    }
+    return results;
+}""" % _wait_quiet_js
+
+# a select state is a list of (select index, option value) pairs.
+SelectState = List[Tuple[int, str]]
+
+
+async def hover_all(page: Page, ele_xpath: str, idle_time: float = 0.3, max_wait: float = 3) -> int:
+    """Hover over all elements at ele_xpath (including elements loaded by hovering) in one page.evaluate.
+       After each hover, wait for DOM mutations to stop for {idle_time} seconds. Return number of elements hovered.
+       Elements that still have hidden content after the in-page hover (e.g. CSS :hover menus) are hovered again
+       with real mouse input."""
+    count, positions = await page.evaluate(_hover_js, ele_xpath, idle_time * 1000, max_wait * 1000)
+    if positions:
+        elements = await page.xpath(ele_xpath)
+        for i in positions:
+            if i >= len(elements):
+                continue
+            try:
+                await elements[i].hover()
+            except Exception as e:
+                logging.debug(f"Could not hover element {i} at {ele_xpath}: {e}")
+                continue
+            await page.evaluate(_wait_quiet_call_js, idle_time * 1000, max_wait * 1000)
+        logging.info(f"Hovered {len(positions)} elements at {ele_xpath} with mouse input ({page.url})")
+    logging.info(f"Hovered {count} elements at {ele_xpath} ({page.url})")
+    return count
+
+
+async def select_states(page: Page, combinations: bool = False) -> List[SelectState]:
+    """All select states to explore. If not {combinations}, each option of each select is chosen one at a time."""
+    options = await page.evaluate(_select_options_js)
+    if combinations:
+        return [list(comb) for comb in product(
+            *[[(i, v) for v in values] for i, values in enumerate(options) if values])]
+    return [[(i, v)] for i, values in enumerate(options) for v in values]
+
+
+async def apply_select_states(page: Page, states: List[SelectState], known: Dict[str, str] = None,
+                              idle_time: float = 0.3, max_wait: float = 3, batch_size: int = 50) -> Dict[str, str]:
+    """Choose each select state in page and return map of DOM fingerprint to HTML for every new DOM state.
+       Fingerprints in {known} are not serialized again."""
+    known = {} if known is None else known
+    htmls = {}
+    for i in range(0, len(states), batch_size):
+        results = await page.evaluate(_apply_select_states_js, states[i:i+batch_size],
+                                      list(known) + list(htmls), idle_time * 1000, max_wait * 1000)
+        htmls.update({fp: html for fp, html in results if html is not None})
+    return htmls
+
+
+async def explore_selects(page: Page, combinations: bool = False, **kwargs) -> List[str]:
+    """Return HTML of each distinct DOM state produced by choosing select options."""
+    states = await select_states(page, combinations)
+    logging.info(f"Exploring {len(states)} select states ({page.url})")
+    return list((await apply_select_states(page, states, **kwargs)).values())
+
+
+async def explore_selects_parallel(spider, url: str, combinations: bool = True, workers: int = 4,
+                                   get_kwargs: Dict = {}, **kwargs) -> List[str]:
+    """Fan select states for page at {url} out over up to {workers} Spider pages.
+       Return HTML of each distinct DOM state."""
+    result = await spider.get(url, **get_kwargs)
+    if result is None:
+        logging.warning(f"Could not load {url}. No select states explored.")
+        return []
+    resp, page = result
+    try:
+        states = await select_states(page, combinations)
+    except Exception:
+        await spider.set_idle(page)
+        raise
+    chunks = [states[i::workers] for i in range(workers) if states[i::workers]]
+    if not chunks:
+        await spider.set_idle(page)
+        return []
+
+    async def explore(chunk: List[SelectState], page: Page = None) -> Dict[str, str]:
+        if page is None:
+            result = await spider.get(url, **get_kwargs)
+            if result is None:
+                logging.warning(f"Could not load {url}. Skipped {len(chunk)} select states.")
+                return {}
+            resp, page = result
+        try:
+            return await apply_select_states(page, chunk, **kwargs)
+        finally:
+            await spider.set_idle(page)
+
+    # the first page explores its share of states without re-navigating.
+    results = await asyncio.gather(explore(chunks[0], page), *[explore(c) for c in chunks[1:]])
+    htmls = {}
+    for result in results:
+        # different pages may have found the same state.
+        htmls.update(result)
+    logging.info(f"Found {len(htmls)} distinct DOM states from {len(states)} select states ({url})")
+    return list(htmls.values())
+
+
+# elements that run JavaScript instead of linking to a URL.
+JS_LINK_SELECTOR = 'a[href="#"], a[href^="javascript:"], [onclick]'
+
+_count_js = "(selector) => document.querySelectorAll(selector).length"
+
+_click_js = """(selector, idx) => {
+    const ele = document.querySelectorAll(selector)[idx];
+    if (!ele) return false;
+    ele.scrollIntoView({block: 'center'});
+    ele.click();
+    return true;
+}"""
+
+_quiet_fingerprint_js = """async (idle, maxWait) => {
+    %s
+    await waitQuiet(idle, maxWait);
+    return fingerprint();
+}""" % _wait_quiet_js
+
+
+async def click_js_link(page: Page, idx: int, selector: str = JS_LINK_SELECTOR, nav_timeout: float = 10,
+                        idle_time: float = 0.3, max_wait: float = 3) -> Tuple[bool, str]:
+    """Click the {idx}th element matching {selector}. Return whether page navigated and the resulting DOM fingerprint."""
+    import pyppeteer.errors
+    nav_task = asyncio.create_task(
+        page.waitForNavigation(timeout=nav_timeout * 1000))
+    try:
+        try:
+            if not await page.evaluate(_click_js, selector, idx):
+                return False, None
+            # clicks that don't navigate will only change the current DOM.
+            done, _ = await asyncio.wait([nav_task], timeout=max_wait)
+        except pyppeteer.errors.NetworkError:
+            # execution context was destroyed by navigation.
+            done = {nav_task}
+        if nav_task in done:
+            try:
+                await nav_task
+            except pyppeteer.errors.TimeoutError:
+                logging.warning(f"Timeout navigating to {page.url}")
+            return True, None
+        nav_task.cancel()
+        return False, await page.evaluate(_quiet_fingerprint_js, idle_time * 1000, max_wait * 1000)
+    finally:
+        # don't leave the navigation wait running (or its error unretrieved) on any exit path.
+        if not nav_task.done():
+            nav_task.cancel()
+        elif not nav_task.cancelled():
+            nav_task.exception()
+
+
+async def expand_js_links(spider, url: str, selector: str = JS_LINK_SELECTOR, workers: int = 4,
+                          get_kwargs: Dict = {}, page: Page = None, **kwargs) -> Dict[str, List[str]]:
+    """Click every JavaScript link on page at {url}, distributing clicks over up to {workers} Spider pages.
+       If {page} (already at {url}) is given, it takes the first share of clicks and is navigated back to {url}
+       afterwards. It stays held by the caller, so at most one worker per other Spider page is used.
+       Return map of each destination URL to the distinct HTML states found there."""
+    caller_page = page
+    if page is None:
+        result = await spider.get(url, **get_kwargs)
+        if result is None:
+            logging.warning(f"Could not load {url}. No JavaScript links clicked.")
+            return {}
+        resp, page = result
+    try:
+        count = await page.evaluate(_count_js, selector)
+        start_fp = await page.evaluate(_quiet_fingerprint_js, 0, 0)
+    except Exception:
+        if caller_page is None:
+            await spider.set_idle(page)
+        raise
+    logging.info(f"Found {count} JavaScript links on {url}")
+    # destination URL -> DOM fingerprint -> HTML
+    found = {}
+
+    async def explore(targets: List[int], page: Page = None) -> None:
+        if page is None:
+            result = await spider.get(url, **get_kwargs)
+            if result is None:
+                logging.warning(f"Could not load {url}. Skipped {len(targets)} JavaScript links.")
+                return
+            resp, page = result
+        try:
+            for i, idx in enumerate(targets):
+                navigated, fp = await click_js_link(page, idx, selector, **kwargs)
+                dest = page.url
+                if navigated and dest not in found:
+                    found[dest] = {None: await page.content()}
+                elif fp is not None and fp != start_fp and fp not in found.setdefault(dest, {}):
+                    found[dest][fp] = await page.content()
+                if (i < len(targets) - 1 or page is caller_page) and (navigated or fp != start_fp):
+                    # restore the start page before the next click.
+                    await page.goto(url, **get_kwargs)
+        finally:
+            if page is not caller_page:
+                await spider.set_idle(page)
+
+    # the first page is already at url, so it is one of the workers. other workers each need another page.
+    workers = max(1, min(workers, count, len(spider.pages)))
+    chunks = [list(range(count))[i::workers] for i in range(workers)]
+    await asyncio.gather(explore(chunks[0], page), *[explore(c) for c in chunks[1:]])
+    return {dest: list(htmls.values()) for dest, htmls in found.items() if htmls}
@@ -0,0 +1,151 @@
+from pyppeteer.browser import Browser
+import pyppeteer.launcher
+
+from typing import Any, Dict, List, Set
+from collections import OrderedDict
+import subprocess
+import logging
+import asyncio
+import json
+import os
+
+# launch options that change how Chromium is started. Other options (e.g. distbot's Spider options) don't.
+CHROMIUM_OPTIONS = ('headless', 'executablePath', 'args', 'ignoreDefaultArgs', 'userDataDir', 'devtools',
+                    'env', 'dumpio', 'ignoreHTTPSErrors', 'defaultViewport', 'slowMo', 'timeout',
+                    'handleSIGINT', 'handleSIGTERM', 'handleSIGHUP', 'autoClose', 'logLevel')
+
+
+def profile_key(launch_options: Dict[str, Any]) -> str:
+    """Key identifying browsers that can be used interchangeably."""
+    return json.dumps({k: v for k, v in (launch_options or {}).items() if k in CHROMIUM_OPTIONS},
+                      sort_keys=True, default=str)
+
+
+def is_alive(browser: Browser) -> bool:
+    """Check that browser process is running and its DevTools connection is open."""
+    if browser.process is not None and browser.process.poll() is not None:
+        return False
+    return browser._connection._connected
+
+
+async def close_browser(browser: Browser, timeout: float = 5) -> None:
+    """Close browser. Kill it if it can't be closed properly. Removes its temporary profile directory."""
+    try:
+        await asyncio.wait_for(browser.close(), timeout=timeout)
+    except Exception as e:
+        logging.warning(f"Could not properly close browser: {e}")
+        if browser.process is not None and browser.process.poll() is None:
+            browser.process.kill()
+
+
+def reap_zombies(processes: Set[subprocess.Popen], orphans: bool = False) -> int:
+    """Reap exited browser {processes} (removing them from the set). With {orphans} (e.g. when running as PID 1),
+       also reap every other exited child, such as orphaned Chromium helpers. Return number reaped."""
+    reaped = 0
+    for process in list(processes):
+        if process.poll() is not None:
+            processes.discard(process)
+            reaped += 1
+    if not orphans or not hasattr(os, 'WNOHANG'):
+        return reaped
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return reaped
+        if pid == 0:
+            return reaped
+        reaped += 1
+
+
+class BrowserPool:
+    """Pre-launched browsers for each launch option profile, so browser requests don't wait for Chromium to start."""
+
+    def __init__(self, size: int = 1, max_profiles: int = 4):
+        # number of ready browsers to keep for each profile.
+        self.size = size
+        self.max_profiles = max_profiles
+        # profile key -> ready browsers. most recently used profile last.
+        self.ready: Dict[str, List[Browser]] = OrderedDict()
+        # profile key -> launch options.
+        self.options: Dict[str, Dict[str, Any]] = {}
+        self._fill_tasks: Dict[str, asyncio.Task] = {}
+        # processes of browsers launched by this pool, until they are reaped.
+        self.processes: Set[subprocess.Popen] = set()
+
+    async def get(self, launch_options: Dict[str, Any]) -> Browser:
+        """Get a ready browser for launch_options, or launch one if none are ready."""
+        key = profile_key(launch_options)
+        browsers = self.ready.get(key, [])
+        browser = None
+        while browsers and browser is None:
+            candidate = browsers.pop(0)
+            if is_alive(candidate):
+                browser = candidate
+            else:
+                await close_browser(candidate)
+        self.warm(launch_options)
+        if browser is None:
+            logging.info("No ready browser for profile. Launching browser.")
+            browser = await self._launch(launch_options)
+        return browser
+
+    async def _launch(self, launch_options: Dict[str, Any]) -> Browser:
+        browser = await pyppeteer.launcher.launch(launch_options)
+        if browser.process is not None:
+            self.processes.add(browser.process)
+        return browser
+
+    def warm(self, launch_options: Dict[str, Any]) -> None:
+        """Start launching browsers for launch_options' profile until {size} are ready."""
+        if self.size <= 0:
+            return
+        key = profile_key(launch_options)
+        self.ready.setdefault(key, [])
+        self.ready.move_to_end(key)
+        self.options[key] = launch_options
+        task = self._fill_tasks.get(key)
+        if task is None or task.done():
+            self._fill_tasks[key] = asyncio.create_task(
+                self._fill(key, launch_options))
+        # stop pooling the least recently used profiles.
+        while len(self.ready) > self.max_profiles:
+            old_key, old_browsers = self.ready.popitem(last=False)
+            del self.options[old_key]
+            if old_key in self._fill_tasks:
+                self._fill_tasks.pop(old_key).cancel()
+            for b in old_browsers:
+                asyncio.create_task(close_browser(b))
+
+    async def _fill(self, key: str, launch_options: Dict[str, Any]) -> None:
+        while key in self.ready and len(self.ready[key]) < self.size:
+            try:
+                browser = await self._launch(launch_options)
+            except Exception as e:
+                logging.error(f"Error pre-launching browser: {e}")
+                return
+            if key in self.ready:
+                self.ready[key].append(browser)
+            else:
+                # profile was evicted while launching.
+                await close_browser(browser)
+
+    async def evict_dead(self) -> int:
+        """Close and remove pooled browsers that have crashed. Return number removed."""
+        removed = 0
+        for key, browsers in list(self.ready.items()):
+            dead = [b for b in browsers if not is_alive(b)]
+            for browser in dead:
+                browsers.remove(browser)
+                await close_browser(browser)
+            if dead and key in self.options:
+                # launch replacements.
+                self.warm(self.options[key])
+            removed += len(dead)
+        return removed
+
+    async def close(self) -> None:
+        for task in self._fill_tasks.values():
+            task.cancel()
+        await asyncio.gather(*[close_browser(b) for browsers in self.ready.values() for b in browsers])
+        self.ready.clear()
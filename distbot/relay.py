@@ -0,0 +1,237 @@
+from distbot.utils import logger
+
+from pyppeteer.browser import Browser
+import pyppeteer.connection
+import websockets
+
+from typing import Any, Callable, Dict, Tuple
+import asyncio
+import struct
+import json
+import zlib
+
+# channel used for opening and closing DevTools connections.
+CONTROL = 0
+
+
+class _Codec:
+    """Frames relay messages as a 4 byte channel number followed by the message compressed with a zlib stream.
+
+    The stream is shared by all messages sent in one direction, so repeated DevTools message structure is compressed
+    across messages (unlike per-message compression).
+    """
+
+    def __init__(self, level: int = 6):
+        self.compressor = zlib.compressobj(level)
+        self.decompressor = zlib.decompressobj()
+        # uncompressed and compressed bytes sent and received.
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+
+    def encode(self, channel: int, message: str) -> bytes:
+        data = message.encode()
+        frame = struct.pack('!I', channel) + self.compressor.compress(data) + \
+            self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.raw_bytes += len(data)
+        self.wire_bytes += len(frame)
+        return frame
+
+    def decode(self, frame: bytes) -> Tuple[int, str]:
+        data = self.decompressor.decompress(frame[4:])
+        self.raw_bytes += len(data)
+        self.wire_bytes += len(frame)
+        return struct.unpack('!I', frame[:4])[0], data.decode()
+
+
+async def serve_relay(ws, allowed: Callable[[str], bool] = lambda endpoint: True) -> None:
+    """Relay DevTools connections multiplexed over client websocket {ws} to local browsers.
+
+    {allowed} checks if a client may connect to a DevTools endpoint.
+    """
+    codec = _Codec()
+    lock = asyncio.Lock()
+    # channel -> websocket connection to browser.
+    channels = {}
+    tasks = set()
+
+    async def send(channel: int, message: str) -> None:
+        # frames must be sent in the order they were compressed.
+        async with lock:
+            await ws.send(codec.encode(channel, message))
+
+    async def open_channel(channel: int, endpoint: str) -> None:
+        if not allowed(endpoint):
+            await send(CONTROL, json.dumps({'closed': channel, 'error': f"Unknown browser: {endpoint}"}))
+            return
+        try:
+            browser_ws = await websockets.connect(endpoint, max_size=None, ping_interval=None, compression=None)
+        except Exception as e:
+            await send(CONTROL, json.dumps({'closed': channel, 'error': str(e)}))
+            return
+        channels[channel] = browser_ws
+        await send(CONTROL, json.dumps({'opened': channel}))
+        try:
+            async for message in browser_ws:
+                await send(channel, message)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            # browser closed the connection (the client didn't).
+            if channels.pop(channel, None) is not None:
+                try:
+                    await send(CONTROL, json.dumps({'closed': channel}))
+                except websockets.ConnectionClosed:
+                    pass
+
+    try:
+        async for frame in ws:
+            channel, message = codec.decode(frame)
+            if channel == CONTROL:
+                msg = json.loads(message)
+                if 'open' in msg:
+                    task = asyncio.create_task(open_channel(msg['open'], msg['endpoint']))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif 'close' in msg and msg['close'] in channels:
+                    await channels.pop(msg['close']).close()
+            elif channel in channels:
+                await channels[channel].send(message)
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        logger.info(
+            f"Relay closed. {codec.wire_bytes} compressed bytes carried {codec.raw_bytes} bytes of messages.")
+        for task in tasks:
+            task.cancel()
+        browser_sockets = list(channels.values())
+        channels.clear()
+        await asyncio.gather(*[browser_ws.close() for browser_ws in browser_sockets])
+
+
+class RelayChannel:
+    """A DevTools connection carried over a RelayClient. Provides the parts of a websockets connection pyppeteer uses."""
+
+    def __init__(self, relay: 'RelayClient', channel: int):
+        self.relay = relay
+        self.channel = channel
+        self.messages = asyncio.Queue()
+        self.opened = asyncio.get_running_loop().create_future()
+        self.open = False
+
+    async def __aenter__(self) -> 'RelayChannel':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def recv(self) -> str:
+        message = await self.messages.get()
+        if message is None:
+            raise websockets.exceptions.ConnectionClosedError(None, None)
+        return message
+
+    async def send(self, message: str) -> None:
+        if not self.open:
+            raise websockets.exceptions.ConnectionClosedError(None, None)
+        await self.relay.send(self.channel, message)
+
+    async def close(self) -> None:
+        if self.open and self.relay.channels.pop(self.channel, None) is not None:
+            try:
+                await self.relay.send(CONTROL, json.dumps({'close': self.channel}))
+            except websockets.ConnectionClosed:
+                pass
+        self._closed()
+
+    def _opened(self) -> None:
+        self.open = True
+        if not self.opened.done():
+            self.opened.set_result(None)
+
+    def _closed(self, error: str = None) -> None:
+        self.open = False
+        self.messages.put_nowait(None)
+        if not self.opened.done():
+            self.opened.set_exception(ConnectionError(error or 'Relay channel closed.'))
+
+
+class RelayConnection(pyppeteer.connection.Connection):
+    """pyppeteer Connection that uses a RelayChannel instead of its own websocket."""
+
+    def __init__(self, channel: RelayChannel, url: str, delay: int = 0):
+        super().__init__(url, asyncio.get_running_loop(), delay)
+        # replace the websocket before the receive loop starts.
+        self._ws = channel
+
+
+class RelayClient:
+    """Compressed websocket to a browser server's relay, carrying DevTools connections to all of its browsers."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ws = None
+        self.codec: _Codec = None
+        # channel number -> RelayChannel
+        self.channels: Dict[int, RelayChannel] = {}
+        self._next_channel = CONTROL + 1
+        self._send_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """Open the relay websocket if it isn't open."""
+        async with self._connect_lock:
+            if self.ws is None or not self.ws.open:
+                self.ws = await websockets.connect(self.url, max_size=None, ping_interval=None, compression=None)
+                self.codec = _Codec()
+                asyncio.create_task(self._recv_loop(self.ws, self.codec))
+
+    async def open_channel(self, endpoint: str) -> RelayChannel:
+        """Open a connection to the browser at DevTools {endpoint} (as seen by the server)."""
+        await self.connect()
+        channel = RelayChannel(self, self._next_channel)
+        self._next_channel += 1
+        self.channels[channel.channel] = channel
+        await self.send(CONTROL, json.dumps({'open': channel.channel, 'endpoint': endpoint}))
+        await channel.opened
+        return channel
+
+    async def connect_browser(self, endpoint: str, url: str = None, **options: Any) -> Browser:
+        """Connect to browser at DevTools {endpoint} through the relay. Same as pyppeteer.launcher.connect otherwise."""
+        channel = await self.open_channel(endpoint)
+        connection = RelayConnection(channel, url or endpoint, options.get('slowMo', 0))
+        browserContextIds = (await connection.send('Target.getBrowserContexts')).get('browserContextIds', [])
+        return await Browser.create(connection, browserContextIds, bool(options.get('ignoreHTTPSErrors', False)),
+                                    options.get('defaultViewport', {'width': 800, 'height': 600}), None,
+                                    lambda: connection.send('Browser.close'))
+
+    async def send(self, channel: int, message: str) -> None:
+        # frames must be sent in the order they were compressed.
+        async with self._send_lock:
+            await self.ws.send(self.codec.encode(channel, message))
+
+    async def _recv_loop(self, ws, codec: _Codec) -> None:
+        try:
+            async for frame in ws:
+                channel_id, message = codec.decode(frame)
+                if channel_id != CONTROL:
+                    if channel_id in self.channels:
+                        self.channels[channel_id].messages.put_nowait(message)
+                    continue
+                msg = json.loads(message)
+                if 'opened' in msg and msg['opened'] in self.channels:
+                    self.channels[msg['opened']]._opened()
+                elif 'closed' in msg:
+                    channel = self.channels.pop(msg['closed'], None)
+                    if channel is not None:
+                        channel._closed(msg.get('error'))
+        except websockets.ConnectionClosed:
+            logger.warning(f"Relay connection closed: {self.url}")
+        finally:
+            if ws is self.ws:
+                for channel in self.channels.values():
+                    channel._closed('Relay connection closed.')
+                self.channels.clear()
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
@@ -0,0 +1,75 @@
+from typing import Dict
+from collections import defaultdict
+import asyncio
+import heapq
+import math
+
+
+class PageScheduler:
+    """Hand pages from the idle queue to waiting requests in priority order.
+
+    Lower priority values are served first. Waiting requests gain {aging} priority per second waited, so
+    low priority requests are not starved. Requests with the same effective priority are served by earliest deadline.
+    {max_outstanding} optionally caps the number of pages held at once by each priority class.
+    """
+
+    def __init__(self, idle_page_q: asyncio.Queue, aging: float = 0.0,
+                 max_outstanding: Dict[float, int] = None):
+        self.idle_page_q = idle_page_q
+        self.aging = aging
+        self.max_outstanding = max_outstanding or {}
+        # heap of (effective priority, deadline, sequence number, priority, future).
+        self.waiters = []
+        self._seq = 0
+        # priority -> number of pages currently acquired.
+        self.outstanding = defaultdict(int)
+
+    async def acquire(self, priority: float = 0, deadline: float = None):
+        """Wait for an idle page. Raise asyncio.TimeoutError if no page is available within {deadline} seconds."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # effective priority at time t is priority - aging * (t - now). ordering by priority + aging * now
+        # is equivalent and doesn't change while requests wait, so the heap stays valid.
+        key = priority + self.aging * now
+        fut = loop.create_future()
+        heapq.heappush(self.waiters, (key, now + deadline if deadline is not None else math.inf,
+                                      self._seq, priority, fut))
+        self._seq += 1
+        self.dispatch()
+        try:
+            return await asyncio.wait_for(fut, timeout=deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            if fut.done() and not fut.cancelled():
+                # a page was handed to this request just as it was cancelled. give the page back.
+                self.release(priority)
+                self.idle_page_q.put_nowait(fut.result())
+                self.dispatch()
+            raise
+
+    def release(self, priority: float) -> None:
+        """Record that a page acquired with {priority} is no longer held."""
+        if self.outstanding[priority] > 0:
+            self.outstanding[priority] -= 1
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        """Hand idle pages to the highest priority waiting requests."""
+        # requests whose priority class is at its outstanding limit.
+        capped = []
+        while self.waiters and not self.idle_page_q.empty():
+            item = heapq.heappop(self.waiters)
+            priority, fut = item[3], item[4]
+            if fut.done():
+                # request was cancelled or timed out.
+                continue
+            if self.outstanding[priority] >= self.max_outstanding.get(priority, math.inf):
+                capped.append(item)
+                continue
+            self.outstanding[priority] += 1
+            fut.set_result(self.idle_page_q.get_nowait())
+        for item in capped:
+            heapq.heappush(self.waiters, item)
+
+    def qsize(self) -> int:
+        """Number of waiting requests."""
+        return len([w for w in self.waiters if not w[4].done()])
@@ -0,0 +1,81 @@
+from distbot.utils import logger
+
+from typing import Union
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import base64
+
+
+class ScreenshotWriter:
+    """Write screenshots to disk from a background task, keeping at most {max_files} files / {max_bytes} bytes."""
+
+    def __init__(self, directory: Union[str, Path], max_files: int = None,
+                 max_bytes: int = None, queue_size: int = 100):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        # screenshots waiting to be written.
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        # (path, size) of saved screenshots, oldest first.
+        self.files = deque()
+        self.total_bytes = 0
+        # tab-separated: time, url, file name.
+        self.index_path = self.directory.joinpath('index.tsv')
+        self._task = None
+
+    def put(self, url: str, page_id: str, data: str, fmt: str = 'jpeg') -> bool:
+        """Queue base64-encoded screenshot {data} to be written. Return False if queue is full."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            self.queue.put_nowait((datetime.now(), url, page_id, data, fmt))
+            return True
+        except asyncio.QueueFull:
+            # never make navigation wait on disk. drop the screenshot instead.
+            logger.warning(f"Screenshot queue is full. Dropping screenshot of {url}")
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            try:
+                await loop.run_in_executor(None, self._write, *item)
+            except OSError as e:
+                logger.error(f"Error saving screenshot of {item[1]}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, time: datetime, url: str, page_id: str, data: str, fmt: str) -> None:
+        content = base64.b64decode(data)
+        path = self.directory.joinpath(
+            f"{time.strftime('%Y-%m-%d_%H-%M-%S-%f')}_{page_id}.{fmt}")
+        path.write_bytes(content)
+        with self.index_path.open(mode='a') as o:
+            o.write(f"{time.isoformat()}\t{url}\t{path.name}\n")
+        self.files.append((path, len(content)))
+        self.total_bytes += len(content)
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        """Remove oldest screenshots until retention limits are met."""
+        while self.files and ((self.max_files is not None and len(self.files) > self.max_files)
+                              or (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            path, size = self.files.popleft()
+            self.total_bytes -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    async def close(self) -> None:
+        """Write all queued screenshots and stop the background task."""
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
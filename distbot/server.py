@@ -1,12 +1,18 @@
+from distbot.utils import process_tree_rss
+from distbot.workqueue import WorkQueue
+from distbot.pool import BrowserPool, is_alive, close_browser, reap_zombies
+from distbot.relay import serve_relay
 from sanic import Sanic, response
-import pyppeteer.launcher
 from pyppeteer.browser import Browser
 
 from typing import Dict
+from urllib.parse import urlparse
 from pathlib import Path
 from pprint import pformat
 import asyncio
 import argparse
+import json
+import os
 import logging
 import re
 
@@ -23,14 +29,83 @@ def parse_args():
                         type=int,
                         default='80',
                         help='Port to run the server on.')
+    parser.add_argument('-q',
+                        '--work-queue',
+                        type=str,
+                        nargs='?',
+                        const=':memory:',
+                        default=None,
+                        help='Host a work queue shared by multiple Spiders. Optional SQLite database path.')
+    parser.add_argument('--pool-size',
+                        type=int,
+                        default=1,
+                        help='Number of pre-launched browsers to keep ready for each launch option profile.')
+    parser.add_argument('--pool-profiles',
+                        type=str,
+                        default='[]',
+                        help='JSON list of launch options to pre-launch browsers for at startup.')
+    parser.add_argument('--supervise-interval',
+                        type=float,
+                        default=10,
+                        help='Seconds between checks for crashed browsers and zombie processes.')
     return parser.parse_args()
 
 
 # map DevTools endpoint to Browser
 active_browsers = {}
 
+# URL queue and shared page pool. Only enabled with --work-queue.
+work_queue: WorkQueue = None
+
+# pre-launched browsers.
+browser_pool: BrowserPool = None
+
+
+app = Sanic("BrowserServer")
+# relay frames can carry large DevTools messages (page content, screenshots).
+app.config.WEBSOCKET_MAX_SIZE = 2**30
+
+
+@ app.listener('before_server_start')
+async def setup_work_queue(app, loop):
+    # server workers may run in separate processes, so the queue path is passed through the environment.
+    global work_queue, browser_pool
+    if os.environ.get('DISTBOT_WORK_QUEUE'):
+        work_queue = WorkQueue(os.environ['DISTBOT_WORK_QUEUE'])
+    browser_pool = BrowserPool(int(os.environ.get('DISTBOT_POOL_SIZE', 1)))
+
 
-app = Sanic("Browser Server")
+@ app.listener('after_server_start')
+async def start_supervisor(app, loop):
+    for launch_options in json.loads(os.environ.get('DISTBOT_POOL_PROFILES', '[]')):
+        browser_pool.warm(launch_options)
+    app.ctx.supervisor = asyncio.create_task(
+        supervise(float(os.environ.get('DISTBOT_SUPERVISE_INTERVAL', 10))))
+
+
+@ app.listener('before_server_stop')
+async def stop_supervisor(app, loop):
+    app.ctx.supervisor.cancel()
+    await browser_pool.close()
+
+
+async def supervise(interval: float) -> None:
+    """Remove crashed browsers, replace crashed pre-launched browsers and reap zombie processes."""
+    while True:
+        await asyncio.sleep(interval)
+        for ws, browser in list(active_browsers.items()):
+            if not is_alive(browser):
+                logging.warning(f"Removing crashed browser: {ws}")
+                del active_browsers[ws]
+                if work_queue is not None:
+                    work_queue.unregister_browser(ws)
+                # removes the browser's temporary profile directory.
+                await close_browser(browser)
+        await browser_pool.evict_dead()
+        # as PID 1 (e.g. in a container), orphaned Chromium helpers are this process' children too.
+        reaped = reap_zombies(browser_pool.processes, orphans=os.getpid() == 1)
+        if reaped:
+            logging.info(f"Reaped {reaped} zombie processes.")
 
 
 @ app.route('/new_browser')
@@ -39,9 +114,13 @@ async def new_browser(request):
     # launch new browser with launch options from request.
     launch_options = request.json
     logging.info(f"Starting browser: {pformat(launch_options)}")
-    browser = await pyppeteer.launcher.launch(launch_options)
+    browser = await browser_pool.get(launch_options)
     # save reference to Browser.
     active_browsers[browser.wsEndpoint] = browser
+    if work_queue is not None and launch_options.get('sharedPages'):
+        # let all clients lease pages of this browser.
+        work_queue.register_browser(
+            browser.wsEndpoint, launch_options['sharedPages'])
     # Return the DevTools WebSocket endpoint so a remote client can connect.
     return response.json({
         'dev_tools': browser.wsEndpoint,
@@ -55,21 +134,96 @@ async def browsers(request):
     return response.json(browsers_ws)
 
 
+@ app.route('/browser_memory')
+async def browser_memory(request):
+    """Resident memory (bytes) of a browser's process tree."""
+    # clients may have rewritten the endpoint's host, so match on the endpoint path.
+    path = urlparse(request.args['browser'][0]).path
+    for ws, browser in active_browsers.items():
+        if urlparse(ws).path == path:
+            return response.json({'rss': process_tree_rss(browser.process.pid)})
+    logging.error(f"Unknown browser endpoint: {path}")
+    return response.json({'error': 'unknown browser'}, status=404)
+
+
 @ app.route('/rm_browser')
 async def rm_browser(request):
     b = request.args['browser'][0]
     if b in active_browsers:
         logging.info(f"Shutting down browser: {b}")
-        try:
-            await asyncio.wait_for(active_browsers[b].close(), timeout=5)
-        except asyncio.TimeoutError:
-            logging.warning("Could not propertly close browser.")
-        del active_browsers[b]
-    else:
-        logging.error(f"Unknown browser endpoint: {b}")
+        await close_browser(active_browsers.pop(b))
+        if work_queue is not None:
+            work_queue.unregister_browser(b)
+        return response.json({'removed': b})
+    logging.error(f"Unknown browser endpoint: {b}")
+    return response.json({'error': 'unknown browser'}, status=404)
+
+
+@ app.websocket('/relay')
+async def relay(request, ws):
+    """Carry all of a client's DevTools connections to this server's browsers over one compressed websocket."""
+    logging.info(f"Opened relay for {request.ip}")
+    await serve_relay(ws, allowed=lambda endpoint: endpoint in active_browsers)
+
+
+def queue_route(uri: str):
+    """Register a POST route that is only available when the work queue is enabled."""
+    def decorator(handler):
+        async def wrapper(request):
+            if work_queue is None:
+                return response.json({'error': 'work queue is not enabled'}, status=404)
+            return response.json(handler(request.json or {}))
+        wrapper.__name__ = handler.__name__
+        return app.route(uri, methods=['POST'])(wrapper)
+    return decorator
+
+
+@ queue_route('/queue/push')
+def queue_push(req):
+    return {'pushed': work_queue.push(req['urls'], req.get('priority', 0))}
+
+
+@ queue_route('/queue/lease')
+def queue_lease(req):
+    return work_queue.lease(req.get('client'), req.get('count', 1), req.get('lease_seconds', 60))
+
+
+@ queue_route('/queue/heartbeat')
+def queue_heartbeat(req):
+    return {'extended': work_queue.heartbeat(req['lease_ids'], req.get('lease_seconds', 60))}
+
+
+@ queue_route('/queue/ack')
+def queue_ack(req):
+    return {'acked': work_queue.ack(req['lease_id'], req.get('result'))}
+
+
+@ queue_route('/queue/nack')
+def queue_nack(req):
+    return {'nacked': work_queue.nack(req['lease_id'])}
+
+
+@ queue_route('/queue/stats')
+def queue_stats(req):
+    return work_queue.stats()
+
+
+@ queue_route('/pages/lease')
+def pages_lease(req):
+    return work_queue.lease_page(req.get('client'), req.get('lease_seconds', 60)) or {}
+
+
+@ queue_route('/pages/release')
+def pages_release(req):
+    return {'released': work_queue.release_page(req['lease_id'])}
 
 
 if __name__ == '__main__':
     args = parse_args()
+    if args.work_queue:
+        os.environ['DISTBOT_WORK_QUEUE'] = args.work_queue
+    os.environ['DISTBOT_POOL_SIZE'] = str(args.pool_size)
+    os.environ['DISTBOT_POOL_PROFILES'] = args.pool_profiles
+    os.environ['DISTBOT_SUPERVISE_INTERVAL'] = str(args.supervise_interval)
 
     app.run(host=args.address, port=args.port)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Union
+from urllib.parse import urlsplit
+from pathlib import Path
+import ipaddress
+import sqlite3
+import json
+import time
+
+if TYPE_CHECKING:
+    from pyppeteer.page import Page
+
+# fields of a cookie returned by Network.getCookies that Network.setCookies accepts.
+_COOKIE_PARAMS = ('name', 'value', 'domain', 'path', 'secure',
+                  'httpOnly', 'sameSite', 'expires', 'priority')
+
+
+# second-level labels under which country code TLDs register domains, e.g. co.uk, com.au.
+_SECOND_LEVEL_LABELS = {'ac', 'co', 'com', 'edu', 'gov', 'ltd', 'me', 'net', 'or', 'org', 'plc', 'sch'}
+
+
+def site(host: str) -> str:
+    """Site a host or cookie domain belongs to, e.g. www.example.com -> example.com, www.example.co.uk -> example.co.uk.
+       IP addresses are their own site.
+       This approximates the registrable domain without the Public Suffix List: other multi-label public suffixes
+       (e.g. github.io) are treated as sites, so their subdomains share cookies."""
+    host = host.lstrip('.').lower()
+    try:
+        return str(ipaddress.ip_address(host.strip('[]')))
+    except ValueError:
+        pass
+    labels = host.split('.')
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+class SessionStore:
+    """Cookies for each identity (e.g. an account or proxy) and site, persisted in an SQLite database.
+
+    Cookies are captured from pages after navigation and restored to pages in one bulk Network.setCookies call,
+    so sessions survive cookie deletion and browser replacement.
+    """
+
+    def __init__(self, path: Union[str, Path] = ':memory:', commit_every: int = 20):
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""CREATE TABLE IF NOT EXISTS cookies (
+                               identity TEXT NOT NULL,
+                               site TEXT NOT NULL,
+                               domain TEXT NOT NULL,
+                               path TEXT NOT NULL,
+                               name TEXT NOT NULL,
+                               expires REAL NOT NULL,
+                               cookie TEXT NOT NULL,
+                               PRIMARY KEY (identity, site, domain, path, name)
+                           ) WITHOUT ROWID""")
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+    def save(self, identity: str, cookies: List[Dict[str, Any]]) -> None:
+        """Store cookies for identity, replacing stored cookies with the same domain, path and name."""
+        now = time.time()
+        rows, expired = [], []
+        for c in cookies:
+            key = (identity, site(c['domain']), c['domain'], c.get('path', '/'), c['name'])
+            # session cookies have expires -1.
+            expires = c.get('expires', -1)
+            if 0 < expires < now:
+                expired.append(key)
+            else:
+                params = {k: c[k] for k in _COOKIE_PARAMS if k in c}
+                if expires <= 0:
+                    # setting a cookie without expires makes it a session cookie.
+                    params.pop('expires', None)
+                rows.append(key + (expires, json.dumps(params)))
+        self.db.executemany(
+            "INSERT OR REPLACE INTO cookies VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.db.executemany("""DELETE FROM cookies WHERE identity = ? AND site = ? AND domain = ? AND path = ?
+                               AND name = ?""", expired)
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self.commit()
+
+    def cookies(self, identity: str, url: str = None) -> List[Dict[str, Any]]:
+        """Unexpired cookies stored for identity, optionally only those for url's site."""
+        query = "SELECT cookie FROM cookies WHERE identity = ? AND (expires <= 0 OR expires > ?)"
+        params = [identity, time.time()]
+        if url is not None:
+            query += " AND site = ?"
+            params.append(site(urlsplit(url).hostname or ''))
+        return [json.loads(c) for (c,) in self.db.execute(query, params)]
+
+    def clear(self, identity: str) -> None:
+        self.db.execute("DELETE FROM cookies WHERE identity = ?", (identity,))
+
+    async def capture(self, page: Page, identity: str) -> int:
+        """Store the cookies of page's current URL (and its frames). Return number of cookies captured."""
+        cookies = (await page._client.send('Network.getCookies')).get('cookies', [])
+        if cookies:
+            self.save(identity, cookies)
+        return len(cookies)
+
+    async def restore(self, page: Page, identity: str, url: str = None) -> int:
+        """Set identity's cookies (for url's site) in page's browser in one call. Return number of cookies set."""
+        cookies = self.cookies(identity, url)
+        if cookies:
+            await page._client.send('Network.setCookies', {'cookies': cookies})
+        return len(cookies)
+
+    def commit(self) -> None:
+        self.db.commit()
+        self._uncommitted = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.db.close()
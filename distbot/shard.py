@@ -0,0 +1,132 @@
+from distbot.spider import Spider
+from distbot.utils import logger
+
+from typing import Any, Callable, Dict, Iterable, List
+from multiprocessing.connection import Connection, wait
+import multiprocessing
+import asyncio
+
+# sent by a worker that has room for another URL.
+_READY = '__distbot_ready__'
+# sent to a worker when there are no more URLs.
+_DONE = '__distbot_done__'
+
+
+def split_browsers(browsers: List[Dict[str, Any]], shards: int) -> List[List[Dict[str, Any]]]:
+    """Distribute browser configs (add_browser kwargs) round-robin over {shards} workers."""
+    return [browsers[i::shards] for i in range(shards)]
+
+
+async def _run_worker(browsers: List[Dict[str, Any]], handler: Callable, conn: Connection) -> None:
+    spider = Spider()
+    for kwargs in browsers:
+        await spider.add_browser(**kwargs)
+    loop = asyncio.get_running_loop()
+    # one task per page, so every page stays busy.
+    concurrency = max(len(spider.pages), 1)
+    local_q = asyncio.Queue(maxsize=concurrency)
+
+    async def read_urls() -> None:
+        """Request URLs from the coordinator while this worker has room for them."""
+        while True:
+            conn.send(_READY)
+            url = await loop.run_in_executor(None, conn.recv)
+            if url == _DONE:
+                for _ in range(concurrency):
+                    await local_q.put(_DONE)
+                return
+            await local_q.put(url)
+
+    async def process() -> None:
+        while True:
+            url = await local_q.get()
+            if url == _DONE:
+                return
+            try:
+                result = await handler(spider, url)
+            except Exception as e:
+                logger.exception(f"Error processing {url}: {e}")
+                result = None
+            conn.send((url, result))
+
+    try:
+        await asyncio.gather(read_urls(), *[process() for _ in range(concurrency)])
+    finally:
+        await spider.shutdown()
+
+
+def _worker(browsers: List[Dict[str, Any]], handler: Callable, conn: Connection) -> None:
+    asyncio.run(_run_worker(browsers, handler, conn))
+
+
+class ShardedSpider:
+    """Process URLs with one Spider per worker process, so client-side CPU work is spread over all cores.
+
+    Each shard is a list of add_browser kwargs for the browsers one worker owns. Workers request URLs from the
+    coordinator as they have room for them, and call {handler}(spider, url), which must be a picklable (module-level)
+    async function. Each (url, result) is passed to {sink} in the coordinator process.
+    A worker that dies (e.g. is OOM killed) is restarted with the same shard up to {max_restarts} times. URLs it was
+    processing are lost.
+    """
+
+    def __init__(self, shards: List[List[Dict[str, Any]]], handler: Callable,
+                 sink: Callable[[str, Any], None] = None, max_restarts: int = 3):
+        self.shards = shards
+        self.handler = handler
+        self.sink = sink
+        self.max_restarts = max_restarts
+
+    def run(self, urls: Iterable[str]) -> List[Any]:
+        """Process all urls. Return list of (url, result) if no sink was provided.
+           Raise RuntimeError if a worker dies more than max_restarts times."""
+        ctx = multiprocessing.get_context('spawn')
+        urls = iter(urls)
+        # coordinator's end of a worker's pipe -> (worker, shard index).
+        # each worker has its own pipe, so a worker killed mid-message can't leave a lock shared with the others held.
+        workers = {}
+
+        def start(i: int) -> None:
+            conn, worker_conn = ctx.Pipe()
+            w = ctx.Process(target=_worker, args=(self.shards[i], self.handler, worker_conn), daemon=True)
+            w.start()
+            # the worker holds the only other copy, so the pipe reports EOF once the worker exits.
+            worker_conn.close()
+            workers[conn] = (w, i)
+
+        for i in range(len(self.shards)):
+            start(i)
+        results = []
+        restarts = [0] * len(self.shards)
+        while workers:
+            for conn in wait(list(workers)):
+                try:
+                    item = conn.recv()
+                except (EOFError, OSError):
+                    w, i = workers.pop(conn)
+                    conn.close()
+                    w.join()
+                    # workers only exit cleanly after they have been sent _DONE.
+                    if w.exitcode == 0:
+                        continue
+                    if restarts[i] >= self.max_restarts:
+                        for other, _ in workers.values():
+                            other.terminate()
+                        raise RuntimeError(
+                            f"Worker for shard {i} died {restarts[i] + 1} times (exit code {w.exitcode}).")
+                    restarts[i] += 1
+                    logger.error(f"Worker for shard {i} died (exit code {w.exitcode}). "
+                                 f"URLs it was processing are lost. Restarting it.")
+                    start(i)
+                    continue
+                if item == _READY:
+                    try:
+                        conn.send(next(urls, _DONE))
+                    except OSError:
+                        # the worker died. reading its pipe fails on the next wait.
+                        pass
+                elif self.sink is not None:
+                    self.sink(*item)
+                else:
+                    results.append(item)
+        logger.info(f"All {len(self.shards)} workers finished.")
+        return results
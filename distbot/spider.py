@@ -1,21 +1,21 @@
-from distbot.utils import logger, user_agents
+from __future__ import annotations
 
-from pyppeteer.network_manager import Request, Response
-from pyppeteer.browser import Browser
-from pyppeteer.page import Page
-import pyppeteer.connection
-import pyppeteer.launcher
-import pyppeteer.errors
-import requests
+from distbot.utils import logger, user_agents, process_tree_rss
+from distbot.screenshots import ScreenshotWriter
+from distbot.scheduler import PageScheduler
+from distbot.archive import Archive
+from distbot.stealth import EVASIONS, select_evasions, stealth_script
+from distbot.sessions import SessionStore, site
+from distbot.cdp import CDPDispatcher, abort_request, continue_request, respond_request
 
-from typing import Dict, Tuple, List, Union, Any
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Set, Tuple, List, Union, Any
 from collections import defaultdict
 from asyncio.locks import Lock
 from datetime import datetime
-from pathlib import Path
-from pprint import pformat
+from urllib.parse import urlsplit
 from uuid import uuid4
 import platform
+import os
 import logging
 import asyncio
 import random
@@ -24,20 +24,63 @@ import pickle
 import json
 import re
 
+# pyppeteer, requests and the relay are imported when first used, so importing distbot is fast.
+if TYPE_CHECKING:
+    from pyppeteer.network_manager import Request, Response
+    from pyppeteer.browser import Browser
+    from pyppeteer.page import Page
+    from distbot.relay import RelayClient
+    from distbot.cache import ResponseCache
+    from distbot.autoscale import Autoscaler
+
 
 class Spider:
     """Spider that distributes requests among multiple browsers/pages and performs automatic error recovery."""
 
-    def __init__(self):
+    def __init__(self, priority_aging: float = 0.0, max_outstanding: Dict[float, int] = None,
+                 relay: bool = False, cache: ResponseCache = None, drain_timeout: float = 30,
+                 unfinished_path: str = None):
+        """{priority_aging}: priority gained per second a request waits for a page.
+           {max_outstanding}: maximum number of pages held at once by each request priority.
+           {relay}: connect to remote browsers through their server's compressed relay, using one socket per server.
+           {cache}: ResponseCache that fetch serves unchanged pages from.
+           {drain_timeout}: seconds shutdown waits for requests in progress to finish.
+           {unfinished_path}: file requests that were not finished before shutdown are saved to."""
         # runtime storage containers.
         self.browsers: Dict[Browser, Any] = {}
         self.pages: Dict[Page, Any] = {}
-        self.screenshot_dir: Path = None
+        self.screenshot_writer: ScreenshotWriter = None
         self.idle_page_q = asyncio.Queue()
+        # hands idle pages to waiting requests in priority order.
+        self.scheduler = PageScheduler(
+            self.idle_page_q, priority_aging, max_outstanding)
         # use user agents that match current platform.
         self.user_agents = user_agents.get(
             platform.system(), user_agents.get("Linux"))
         self.start_time = datetime.now()
+        self.relay = relay
+        # server address -> RelayClient
+        self.relays: Dict[str, RelayClient] = {}
+        # archive path -> Archive used by record/replay launch options.
+        self.archives: Dict[str, Archive] = {}
+        # session store path -> SessionStore used by the sessions launch option.
+        self.session_stores: Dict[str, SessionStore] = {}
+        self.cache = cache
+        # running totals of navigations, navigation errors and navigation latency (seconds), for throughput monitoring.
+        self.stats: Dict[str, float] = defaultdict(float)
+        self.autoscaler: Autoscaler = None
+        self.drain_timeout = drain_timeout
+        self.unfinished_path = unfinished_path
+        # tasks started by this Spider, cancelled on shutdown.
+        self.tasks: Set[asyncio.Task] = set()
+        # navigation task -> url, priority, kwargs and whether it has a page yet, for each get in progress.
+        self.requests: Dict[asyncio.Task, Dict[str, Any]] = {}
+        # requests not finished before shutdown.
+        self.unfinished: List[Dict[str, Any]] = []
+        # unfinished request files that have been loaded, so they are rewritten (not appended to) on save.
+        self.loaded_unfinished: Set[str] = set()
+        # no new requests are accepted while draining.
+        self.draining = False
 
     async def add_browser(self, pages: int = 1,
                           server: str = None,
@@ -47,7 +90,7 @@ class Spider:
             self.set_launch_args_proxy(launch_options)
         # create screenshot directory if user wants screenshots.
         if launch_options.get('screenshot', False):
-            self._set_screenshot_dir()
+            self._set_screenshot_writer(launch_options)
         # if server address is provided, launch browser on server.
         if server:
             browser = await self._launch_remote_browser(server, launch_options)
@@ -60,12 +103,19 @@ class Spider:
             'launch_options': launch_options,
             'server': server,
             'consec_errors': 0,
+            'navigations': 0,
+            'launch_time': datetime.now(),
+            'draining': False,
             'lock': Lock(),
+            'cdp': CDPDispatcher(launch_options.get('cdpMaxOutstanding', 100)),
             'id': str(uuid4())
         }
         # add callback that will be called in case of disconnection with Chrome Dev Tools.
         browser._connection.setClosedCallback(
             self.__on_connection_close)
+        if any(opt in launch_options for opt in ('maxBrowserAge', 'maxBrowserMemory')):
+            # start task to periodically check if browser should be recycled.
+            self._create_task(self._check_recycle_status(browser))
         # add pages (tabs) to the new browser.
         # a new browser has 1 page by default, so add 1 less than desired page count.
         for _ in range(pages-1):
@@ -73,6 +123,146 @@ class Spider:
         for page in await browser.pages():
             await self._init_page(page)
 
+    async def lease_pages(self, server: str, pages: int = 1, lease_seconds: float = 60,
+                          client: str = None) -> int:
+        """Lease pages in browsers shared through the work queue of server at {server}. Return number of pages leased."""
+        leases = defaultdict(list)
+        for _ in range(pages):
+            lease = await self._server_request(server, '/pages/lease', {
+                'client': client, 'lease_seconds': lease_seconds})
+            if not lease:
+                logger.warning(f"No free shared pages on {server}.")
+                break
+            leases[lease['endpoint']].append(lease['lease_id'])
+        for endpoint, lease_ids in leases.items():
+            browser = await self._connect_remote_browser(server, endpoint)
+            self.browsers[browser] = {
+                'page_count': len(lease_ids),
+                'launch_options': {},
+                'server': server,
+                'consec_errors': 0,
+                'navigations': 0,
+                'launch_time': datetime.now(),
+                'draining': False,
+                'shared': True,
+                'leases': lease_ids,
+                'lock': Lock(),
+                'cdp': CDPDispatcher(),
+                'id': str(uuid4())
+            }
+            browser._connection.setClosedCallback(
+                self.__on_connection_close)
+            for _ in lease_ids:
+                await self._init_page(await browser.newPage())
+            # start task to keep page leases from expiring.
+            self._create_task(
+                self._renew_page_leases(browser, lease_seconds))
+        return sum(len(ids) for ids in leases.values())
+
+    async def _renew_page_leases(self, browser: Browser, lease_seconds: float) -> None:
+        """Periodically extend the leases of a shared browser's pages."""
+        await asyncio.sleep(lease_seconds / 3)
+        if browser not in self.browsers:
+            return
+        browser_data = self.browsers[browser]
+        try:
+            await self._server_request(browser_data['server'], '/queue/heartbeat', {
+                'lease_ids': browser_data['leases'], 'lease_seconds': lease_seconds})
+        except Exception as e:
+            logger.warning(
+                f"Could not renew page leases of browser {browser_data['id']}: {e}")
+        self._create_task(
+            self._renew_page_leases(browser, lease_seconds))
+
+    async def consume(self, server: str, handler, client: str = None,
+                      lease_seconds: float = 60, batch: int = None) -> int:
+        """Process URLs from the work queue of server at {server} until the queue is empty.
+           {handler}(spider, url) is called for each URL and its (JSON serializable) return value is saved as the result.
+           Return number of URLs processed."""
+        client = client or str(uuid4())
+        # lease ids of URLs being processed.
+        leases = set()
+
+        async def heartbeat() -> None:
+            while True:
+                await asyncio.sleep(lease_seconds / 3)
+                if not leases:
+                    continue
+                try:
+                    await self._server_request(server, '/queue/heartbeat', {
+                        'lease_ids': list(leases), 'lease_seconds': lease_seconds})
+                except Exception as e:
+                    # leases expire unless a later heartbeat gets through.
+                    logger.warning(f"Could not renew work queue leases on {server}: {e}")
+
+        async def settle(path: str, lease: Dict[str, Any], **payload) -> bool:
+            """Ack or nack {lease}. Return False if the request to the server failed."""
+            try:
+                await self._server_request(server, path, {'lease_id': lease['lease_id'], **payload})
+                return True
+            except Exception as e:
+                # the lease expires and its URL is queued again.
+                logger.warning("Could not send %s for %s to %s: %s", path, lease['url'], server, e,
+                               extra={'event': 'queue_error', 'url': lease['url']})
+                return False
+
+        async def process(lease: Dict[str, Any]) -> int:
+            try:
+                result = await handler(self, lease['url'])
+            except Exception as e:
+                logger.exception(f"Error processing {lease['url']}: {e}")
+                await settle('/queue/nack', lease)
+                return 0
+            finally:
+                leases.discard(lease['lease_id'])
+            if self.draining and self._take_unfinished(lease['url']):
+                # URL wasn't processed before shutdown. return it to the work queue instead of saving it.
+                await settle('/queue/nack', lease)
+                return 0
+            return int(await settle('/queue/ack', lease, result=result))
+
+        heartbeat_task = asyncio.create_task(heartbeat())
+        tasks, processed = set(), 0
+        try:
+            while True:
+                if heartbeat_task.done():
+                    error = None if heartbeat_task.cancelled() else heartbeat_task.exception()
+                    logger.error(f"Work queue heartbeat stopped ({error!r}). Restarting it.")
+                    heartbeat_task = asyncio.create_task(heartbeat())
+                free = (batch or max(len(self.pages), 1)) - len(tasks)
+                if free > 0 and not self.draining:
+                    for lease in await self._server_request(server, '/queue/lease', {
+                            'client': client, 'count': free, 'lease_seconds': lease_seconds}):
+                        leases.add(lease['lease_id'])
+                        tasks.add(asyncio.create_task(process(lease)))
+                if not tasks:
+                    if self.draining:
+                        break
+                    stats = await self._server_request(server, '/queue/stats', {})
+                    if not stats['queued'] and not stats['leased']:
+                        break
+                    # URLs leased by other clients may be returned to the queue.
+                    await asyncio.sleep(1)
+                    continue
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                processed += sum(t.result() for t in done)
+        finally:
+            heartbeat_task.cancel()
+            # don't leave URLs being processed without an owner. their leases expire and they are queued again.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(heartbeat_task, *tasks, return_exceptions=True)
+        logger.info(f"Processed {processed} URLs from {server} work queue.")
+        return processed
+
+    async def _server_request(self, server: str, path: str, payload: Dict[str, Any], timeout: float = 30) -> Any:
+        """POST JSON payload to browser server and return the JSON response."""
+        import requests
+        resp = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: requests.post(f"http://{server}{path}", json=payload, timeout=timeout))
+        resp.raise_for_status()
+        return resp.json()
+
     def set_launch_args_proxy(self, launch_options: Dict[str, Any]) -> None:
         """Remove any old proxy from args and add a new proxy to args."""
         launch_options['args'] = [
@@ -84,41 +274,91 @@ class Spider:
         if browser in self.browsers:
             return self.browsers[browser]['launch_options'].get('proxy')
 
-    async def _set_cookies(self, page: Page, cookies: Union[List[Dict[str, str]], Dict[str, str]]) -> None:
-        """Add cookies to page."""
+    async def _set_cookies(self, page: Page, cookies: Union[List[Dict[str, str]], Dict[str, str]],
+                           url: str = None) -> None:
+        """Add cookies to page in one call. Cookies without url or domain are set for {url}."""
         if isinstance(cookies, dict):
-            await page.setCookie(cookies)
-        elif isinstance(cookies, (list, tuple, set)):
-            await asyncio.gather(
-                *[page.setCookie(cookie) for cookie in cookies])
+            cookies = [cookies]
+        cookies = [c if url is None or 'url' in c or 'domain' in c else {**c, 'url': url}
+                   for c in cookies]
+        if cookies:
+            await self._send(page, 'Network.setCookies', {'cookies': cookies})
+
+    def _session(self, page: Page) -> Tuple[SessionStore, str]:
+        """Session store and identity of page's browser, or (None, None) if the browser doesn't use sessions."""
+        launch_options = self.browsers[page.browser]['launch_options']
+        if 'sessions' not in launch_options:
+            return None, None
+        if launch_options['sessions'] not in self.session_stores:
+            self.session_stores[launch_options['sessions']] = SessionStore(
+                launch_options['sessions'])
+        return self.session_stores[launch_options['sessions']], \
+            launch_options.get('sessionIdentity', launch_options.get('proxy', 'default'))
+
+    async def _restore_session(self, page: Page, url: str) -> None:
+        """Set the saved session cookies for url's site, if they haven't been set in page's browser yet."""
+        store, identity = self._session(page)
+        if store is None:
+            return
+        restored_sites = self.browsers[page.browser].setdefault(
+            'restored_sites', set())
+        url_site = site(urlsplit(url).hostname or '')
+        if url_site not in restored_sites:
+            await store.restore(page, identity, url)
+            restored_sites.add(url_site)
 
-    async def get(self, url: str, retries: int = 2, **kwargs) -> Tuple[Response, Page]:
-        """Navigate next idle page to url."""
+    async def get(self, url: str, retries: int = 2, priority: float = 0,
+                  deadline: float = None, **kwargs) -> Tuple[Response, Page]:
+        """Navigate next idle page to url.
+           Requests with lower {priority} get pages first. Raise asyncio.TimeoutError if no page is available within {deadline} seconds.
+           Return None if the navigation failed, or if the Spider is shutting down (the request is saved as unfinished)."""
+        if self.draining:
+            self._add_unfinished(url, priority, kwargs)
+            return None
+        task = asyncio.create_task(self._navigate(url, retries, priority, deadline, **kwargs))
+        request = self.requests[task] = {'url': url, 'priority': priority, 'kwargs': dict(kwargs),
+                                         'has_page': False, 'abandoned': False}
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if not request['abandoned']:
+                raise
+            # cancelled by shutdown.
+            self._add_unfinished(url, priority, request['kwargs'])
+            return None
+        finally:
+            del self.requests[task]
+
+    async def _navigate(self, url: str, retries: int, priority: float, deadline: float = None,
+                        **kwargs) -> Tuple[Response, Page]:
+        """Navigate next idle page to url, retrying up to {retries} times."""
         async def _get(url: str, page: Page, **kwargs) -> Response:
             """All page functions that will hang on page crash go here."""
+            await self._restore_session(page, url)
             if 'cookies' in kwargs:
                 # set request cookies if provided.
-                await self._set_cookies(page, kwargs.pop('cookies'))
+                await self._set_cookies(page, kwargs.pop('cookies'), url)
             # all kwargs besides 'cookies' should be for goto
-            resp = await page.goto(url, **kwargs)
-            if self.browsers[page.browser]['launch_options'].get('screenshot', False):
-                # save screenshot of page.
-                await self._take_screenshot(page)
-            return resp
+            return await page.goto(url, **kwargs)
 
         async def _retry_get(url: str, retries: int, **kwargs):
             """Retry navigation if there are remaining retries."""
             retries -= 1
             if retries >= 0:
-                logger.warning(
-                    f"Retrying request to {url}. Retries remaining: {retries}")
-                return await asyncio.create_task(
-                    self.get(url, retries, **kwargs))
-            logger.error(
-                f"Max retries exceeded: {url}. URL can not be navigated.")
+                logger.warning("Retrying request to %s. Retries remaining: %s", url, retries,
+                               extra={'event': 'retry', 'url': url})
+                # the deadline counts from the first attempt.
+                return await self._navigate(url, retries, priority, self._remaining(deadline, start), **kwargs)
+            logger.error("Max retries exceeded: %s. URL can not be navigated.", url,
+                         extra={'event': 'max_retries', 'url': url})
 
+        loop = asyncio.get_running_loop()
+        start = loop.time()
         # get next page from idle queue.
-        page = await self._get_idle_page()
+        page = await self._get_idle_page(priority, deadline)
+        wait = loop.time() - start
+        if asyncio.current_task() in self.requests:
+            self.requests[asyncio.current_task()]['has_page'] = True
         browser_data = self.browsers[page.browser]
         timeout = kwargs.get(
             'timeout', self._default_nav_func_wait(browser_data))
@@ -126,25 +366,99 @@ class Spider:
             resp = await asyncio.wait_for(_get(url, page, **kwargs), timeout=timeout)
         except asyncio.TimeoutError:
             # timeout suggests browser crash.
-            logger.warning(
-                f"Detected browser crash {page.browser} (get timeout exceeded {timeout})")
+            logger.warning("Detected browser crash %s (get timeout exceeded %s)", page.browser, timeout,
+                           extra={'event': 'crash', 'url': url, 'browser': browser_data['id']})
+            self.stats['errors'] += 1
             await self.replace_browser(page.browser)
             return await _retry_get(url, retries, **kwargs)
         except Exception as e:
-            logger.exception(
-                f"Error fetching page {url}: {e}")
+            logger.exception("Error fetching page %s: %s", url, e,
+                             extra={'event': 'get_error', 'url': url, 'browser': browser_data['id']})
+            self.stats['errors'] += 1
             # record that there was an error while navigating page.
             await self._log_browser_error_status(page.browser, True)
             # add the page back to idle page queue.
             await self.set_idle(page)
             return await _retry_get(url, retries, **kwargs)
+        store, identity = self._session(page)
+        if store is not None:
+            # save cookies the site set, so they can be restored in other browsers.
+            # this is outside the crash timeout, so a slow capture doesn't get the browser replaced.
+            try:
+                await asyncio.wait_for(store.capture(page, identity), timeout=5)
+            except Exception as e:
+                logger.warning("Could not save session cookies from %s: %s", page.url, e,
+                               extra={'event': 'session_error', 'url': page.url})
         # record that page was navigated with no error.
         await self._log_browser_error_status(page.browser, False)
+        browser_data['navigations'] += 1
+        if browser_data['launch_options'].get('screenshot', False):
+            # screenshot will be taken when the page is released.
+            self.pages[page]['screenshot_pending'] = True
+        if browser_data['navigations'] >= browser_data['launch_options'].get('maxNavigations', float('inf')):
+            logger.info(
+                f"Browser {browser_data['id']} reached max navigations ({browser_data['navigations']}).")
+            self._create_task(self.recycle_browser(page.browser))
         status = resp.status if resp else None
-        logger.info(
-            f"[{status}] (server - {browser_data['server']}, browser - {browser_data['id']}, page - {self.pages[page]['id']}): {page.url}")
+        latency = loop.time() - start - wait
+        self.stats['navigations'] += 1
+        self.stats['latency'] += latency
+        # lazy formatting, so sampled out records cost little.
+        logger.info("[%s] (server - %s, browser - %s, page - %s): %s",
+                    status, browser_data['server'], browser_data['id'], self.pages[page]['id'], page.url,
+                    extra={'event': 'navigate', 'url': page.url, 'status': status, 'server': browser_data['server'],
+                           'browser': browser_data['id'], 'page': self.pages[page]['id'],
+                           'wait': wait, 'latency': latency})
         return resp, page
 
+    async def crawl(self, seeds: List[str], handler=None, scope=None, seen=None,
+                    concurrency: int = None, dedupe=None, **kwargs) -> int:
+        """Recursively crawl links starting from seeds. See distbot.crawl.Crawler."""
+        from distbot.crawl import Crawler
+        crawler = Crawler(self, scope=scope, seen=seen, handler=handler,
+                          concurrency=concurrency, dedupe=dedupe, **kwargs)
+        return await crawler.run(seeds)
+
+    async def fetch(self, url: str, extract: Callable[[Response, Page], Awaitable[Any]],
+                    revalidate_headers: Dict[str, str] = None, cache_key: str = None, **kwargs) -> Any:
+        """Return await {extract}(response, page) for url. The page is set idle afterwards.
+           With a cache, fresh cached output is returned without navigating, and stale output is returned if a
+           conditional request shows the page is unchanged. Output is cached per URL and {cache_key}, so fetches of
+           one URL with different extract functions need different cache keys. kwargs are passed to get."""
+        entry = self.cache.get(url, cache_key) if self.cache is not None else None
+        if entry is not None:
+            if self.cache.fresh(entry):
+                self.cache.hits += 1
+                return entry['output']
+            if await self.cache.revalidate(entry, revalidate_headers):
+                self.cache.revalidated += 1
+                logger.info("[304] Unchanged, using cached result: %s", url,
+                            extra={'event': 'revalidated', 'url': url, 'status': 304})
+                return entry['output']
+        if self.cache is not None:
+            self.cache.misses += 1
+        result = await self.get(url, **kwargs)
+        if result is None:
+            return None
+        resp, page = result
+        try:
+            output = await extract(resp, page)
+        finally:
+            await self.set_idle(page)
+        if self.cache is not None and resp is not None and resp.ok:
+            self.cache.put(url, resp.status, resp.headers, output, final_url=page.url, key=cache_key)
+        return output
+
+    def autoscale(self, **kwargs) -> Autoscaler:
+        """Start adjusting pages per browser and number of browsers to maximize throughput.
+           See distbot.autoscale.Autoscaler for kwargs."""
+        from distbot.autoscale import Autoscaler
+        if self.autoscaler is not None:
+            return self.autoscaler
+        self.autoscaler = Autoscaler(self, **kwargs)
+        self.autoscaler.start()
+        return self.autoscaler
+
     def _default_nav_func_wait(self, browser_data: Dict[str, Any]) -> int:
         """Default asyncio.wait_for timeout to use for functions that naviage a page."""
         # Pyppeteer's default navigation timeout is 30s. Allow waiting for 25% longer than default navigation timeout.
@@ -154,45 +468,182 @@ class Spider:
         return default_wait_time / 1_000
 
     async def set_idle(self, page: Page) -> None:
-        """Add page to the idle queue."""
+        """Add page to the idle queue.
+           Pages with a pending screenshot or reset are queued once that is done, without making the caller wait."""
+        self._release_page(page)
+        if page in self.pages and (self.pages[page].get('screenshot_pending') or
+                                   self.browsers[page.browser]['launch_options'].get('resetPageOnIdle', False)):
+            # the page can't be queued before then, or the next request could navigate it first.
+            if 'requeue' not in self.pages[page]:
+                self.pages[page]['requeue'] = self._create_task(self._prepare_idle(page))
+            return
+        await self._queue_idle(page)
+
+    async def _prepare_idle(self, page: Page) -> None:
+        """Take page's pending screenshot and reset it, then add it to the idle queue."""
+        try:
+            # page may have been closed before this task ran.
+            if page in self.pages and self.pages[page].get('screenshot_pending'):
+                await self._take_screenshot(page)
+            if page in self.pages and self.browsers[page.browser]['launch_options'].get('resetPageOnIdle', False):
+                await self._reset_page(page)
+        finally:
+            if page in self.pages:
+                self.pages[page].pop('requeue', None)
+        await self._queue_idle(page)
+
+    async def _queue_idle(self, page: Page) -> None:
+        if page in self.pages and self.browsers[page.browser]['draining']:
+            # pages of a draining browser are not handed out again.
+            self.pages[page]['is_idle'] = True
+            return
         # check that page has not been closed and page is not already idle.
         if page in self.pages and page not in self.idle_page_q._queue:
             # add page to queue.
             await self.idle_page_q.put(page)
             # mark that page is idle.
             self.pages[page]['is_idle'] = True
+            # hand page to the highest priority waiting request.
+            self.scheduler.dispatch()
+
+    def _release_page(self, page: Page) -> None:
+        """Record that page is no longer held by a request."""
+        if page in self.pages and 'priority' in self.pages[page]:
+            self.scheduler.release(self.pages[page].pop('priority'))
+
+    def _create_task(self, coro) -> asyncio.Task:
+        """Run coro in a task that is cancelled on shutdown."""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
 
     async def cancel_spider_tasks(self):
         """Cancel all of Spider's tasks."""
-        tasks = [t for t in asyncio.all_tasks(
-        ) if t is not asyncio.current_task() and 'coro=<Spider.' in str(t)]
+        tasks = [t for t in self.tasks if t is not asyncio.current_task()]
         [t.cancel() for t in tasks]
         logger.info(f"Cancelling {len(tasks)} outstanding tasks.")
         return await asyncio.gather(*tasks, return_exceptions=True)
 
-    async def shutdown(self, sig=None) -> None:
-        """Shutdown all browsers."""
+    async def drain(self, timeout: float = 0) -> None:
+        """Stop accepting requests, and wait up to {timeout} seconds for requests that have a page to finish and for
+           pages to be set idle. Requests still waiting for a page, and requests not finished in time, are cancelled
+           and saved as unfinished."""
+        self.draining = True
+        self._abandon_requests([t for t, r in self.requests.items() if not r['has_page']])
+        loop = asyncio.get_running_loop()
+        end = loop.time() + timeout
+        while (self.requests or not all(data['is_idle'] for data in self.pages.values())) and loop.time() < end:
+            await asyncio.sleep(0.1)
+        tasks = list(self.requests)
+        if tasks:
+            logger.warning(f"Cancelling {len(tasks)} requests that did not finish within {timeout}s.")
+            self._abandon_requests(tasks)
+            await asyncio.wait(tasks, timeout=5)
+
+    def _abandon_requests(self, tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            self.requests[task]['abandoned'] = True
+            task.cancel()
+
+    def _add_unfinished(self, url: str, priority: float, kwargs: Dict[str, Any]) -> None:
+        try:
+            json.dumps(kwargs)
+        except TypeError:
+            logger.warning(f"Request options of {url} can not be saved: {kwargs}")
+            kwargs = {}
+        self.unfinished.append({'url': url, 'priority': priority, 'kwargs': kwargs})
+
+    def _take_unfinished(self, url: str) -> bool:
+        """Remove saved unfinished requests for url. Return True if there were any."""
+        count = len(self.unfinished)
+        self.unfinished = [r for r in self.unfinished if r['url'] != url]
+        return len(self.unfinished) < count
+
+    def save_unfinished(self, path: str) -> int:
+        """Save unfinished requests to file at {path} (JSON lines). Return number of requests saved.
+           Requests are appended, unless the file was loaded by load_unfinished. Then the loaded requests have been
+           resubmitted, so the file is replaced (or removed, if no requests are unfinished)."""
+        if path in self.loaded_unfinished:
+            if not self.unfinished:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    for request in self.unfinished:
+                        f.write(json.dumps(request) + '\n')
+                os.replace(tmp_path, path)
+        else:
+            with open(path, 'a') as f:
+                for request in self.unfinished:
+                    f.write(json.dumps(request) + '\n')
+        logger.info(f"Saved {len(self.unfinished)} unfinished requests to {path}.")
+        return len(self.unfinished)
+
+    def load_unfinished(self, path: str = None) -> List[Dict[str, Any]]:
+        """Read the unfinished requests saved at {path} (default: unfinished_path). Each has url, priority and kwargs
+           for get. The file is kept until save_unfinished replaces it, so requests aren't lost if this run stops
+           without a shutdown."""
+        path = path or self.unfinished_path
+        self.loaded_unfinished.add(path)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def shutdown(self, sig=None, drain_timeout: float = None) -> None:
+        """Finish or save requests in progress, then shutdown all browsers.
+           Requests get {drain_timeout} (default: the Spider's drain_timeout) seconds to finish."""
         if sig is not None:
             logger.info(f"Caught signal: {sig.name}")
         logger.info("Shutting down...")
+        if self.autoscaler is not None:
+            await self.autoscaler.stop()
+        await self.drain(self.drain_timeout if drain_timeout is None else drain_timeout)
+        # let pages that were set idle finish their screenshots.
+        requeuing = [data['requeue'] for data in self.pages.values() if 'requeue' in data]
+        if requeuing:
+            await asyncio.wait(requeuing, timeout=10)
         await self.cancel_spider_tasks()
-        # close all browsers on all servers.
-        await asyncio.gather(
-            *[asyncio.create_task(
-                self._shutdown_browser(b))
-                for b in set(self.browsers.keys())])
+        if self.screenshot_writer:
+            # write any queued screenshots.
+            await self.screenshot_writer.close()
+        # close all browsers on all servers at once.
+        browsers = list(self.browsers)
+        results = await asyncio.gather(
+            *[asyncio.wait_for(self._shutdown_browser(b), timeout=10) for b in browsers],
+            return_exceptions=True)
+        for browser, result in zip(browsers, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Browser {browser} could not be properly closed: {result!r}")
+                if browser.process is not None and browser.process.poll() is None:
+                    # don't leave a local browser running.
+                    browser.process.kill()
+                self.browsers.pop(browser, None)
+        await asyncio.gather(*[relay.close() for relay in self.relays.values()])
+        for archive in self.archives.values():
+            archive.close()
+        for store in self.session_stores.values():
+            store.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.unfinished_path and (self.unfinished or self.unfinished_path in self.loaded_unfinished):
+            self.save_unfinished(self.unfinished_path)
 
     async def _launch_local_browser(self, launch_options: Dict[str, Any] = None) -> Browser:
         """Launch a new browser on local machine."""
-        logger.info(
-            f"Launching local browser:\n{pformat(launch_options)}")
+        import pyppeteer.launcher
+        logger.info("Launching local browser: %s", launch_options,
+                    extra={'event': 'launch'})
         return await pyppeteer.launcher.launch(launch_options)
 
     async def _launch_remote_browser(self, server_ip,
                                      launch_options: Dict[str, Any] = None) -> Browser:
         """Initialize a Browser inastance and connect to the DevTools endpoint of a browser running on machine at {server_ip}."""
-        logger.info(
-            f"Launching remote browser on {server_ip}:\n{pformat(launch_options)}")
+        import requests
+        logger.info("Launching remote browser on %s: %s", server_ip, launch_options,
+                    extra={'event': 'launch', 'server': server_ip})
         endpoint = f"http://{server_ip}/new_browser"
         resp = requests.get(endpoint, json=launch_options)
         if resp.status_code != 200:
@@ -201,16 +652,53 @@ class Spider:
             return
         logger.info(
             f"[{resp.status_code}] Added Browser on {server_ip}")
+        return await self._connect_remote_browser(server_ip, resp.json()['dev_tools'])
+
+    async def _connect_remote_browser(self, server: str, endpoint: str) -> Browser:
+        """Connect to the DevTools {endpoint} of a browser running on machine at {server}."""
         # construct DevTools endpoint.
-        dev_tools_endpoint = resp.json()['dev_tools'].replace(
-            '127.0.0.1', server_ip.split(':')[0])
+        dev_tools_endpoint = endpoint.replace(
+            '127.0.0.1', server.split(':')[0])
         logger.info(
-            f"Connecting to {server_ip} browser: {dev_tools_endpoint}")
-        # connect to new browser's DevTools endpoint.
-        browser = await pyppeteer.launcher.connect(browserWSEndpoint=dev_tools_endpoint)
+            f"Connecting to {server} browser: {dev_tools_endpoint}")
+        if self.relay:
+            from distbot.relay import RelayClient
+            if server not in self.relays:
+                self.relays[server] = RelayClient(f"ws://{server}/relay")
+            # the server connects to the browser, so use the endpoint as seen by the server.
+            browser = await self.relays[server].connect_browser(endpoint, dev_tools_endpoint)
+        else:
+            import pyppeteer.launcher
+            # connect to new browser's DevTools endpoint.
+            browser = await pyppeteer.launcher.connect(browserWSEndpoint=dev_tools_endpoint)
         logger.info(f"Connected to browser {dev_tools_endpoint}: {browser}")
         return browser
 
+    async def add_page(self, browser: Browser) -> Page:
+        """Open a new page (tab) in browser."""
+        page = await browser.newPage()
+        self.browsers[browser]['page_count'] += 1
+        await self._init_page(page)
+        return page
+
+    async def remove_page(self, browser: Browser) -> bool:
+        """Close an idle page of browser. Return False if browser has no idle page."""
+        page = next((p for p in self.idle_page_q._queue if p.browser is browser), None)
+        if page is None:
+            return False
+        self.browsers[browser]['page_count'] -= 1
+        await self._close_page(page)
+        return True
+
+    async def remove_browser(self, browser: Browser) -> None:
+        """Close browser once all of its pages are done being used, without replacing it."""
+        browser_data = self.browsers.get(browser)
+        if browser_data is None or browser_data['draining'] or browser_data['lock'].locked():
+            return
+        logger.info(f"Removing browser {browser_data['id']}.")
+        browser_data['draining'] = True
+        await self._drain_browser(browser)
+
     async def _init_page(self, page: Page) -> None:
         """Initialize a new page."""
         self.pages[page] = {
@@ -222,24 +710,33 @@ class Spider:
         # add page to idle queue.
         await self.set_idle(page)
         # start task to periodically check page idle status.
-        asyncio.create_task(
+        self._create_task(
             self._check_idle_status(page))
 
-    async def _get_idle_page(self) -> Page:
+    async def _get_idle_page(self, priority: float = 0, deadline: float = None) -> Page:
         """Get next page from the idle queue and check if the browser this page belongs to has crashed."""
+        import pyppeteer.errors
+        start = asyncio.get_running_loop().time()
         # block until a page is available.
-        page = await self.idle_page_q.get()
+        page = await self.scheduler.acquire(priority, deadline)
         # mark time that we've seen page is idle.
         self.pages[page]['is_idle'] = False
         self.pages[page]['time_last_idle'] = datetime.now()
+        self.pages[page]['priority'] = priority
+        if self.browsers[page.browser]['draining']:
+            # browser is being recycled. hold this page until browser is closed.
+            self._release_page(page)
+            self.pages[page]['is_idle'] = True
+            return await self._get_idle_page(priority, self._remaining(deadline, start))
         # closed pages should not be in queue.
         if page.isClosed():
             logger.warning(
                 f"Found closed page in idle queue. Replacing page {page}")
+            self._release_page(page)
             # launch new page to replace closed page.
             page = await page.browser.newPage()
-            asyncio.create_task(self._init_page(page))
-            return await self._get_idle_page()
+            self._create_task(self._init_page(page))
+            return await self._get_idle_page(priority, self._remaining(deadline, start))
         try:
             # wait for page to set a random custom user-agent string.
             await asyncio.wait_for(page.setUserAgent(
@@ -247,27 +744,46 @@ class Spider:
             if self.browsers[page.browser]['launch_options'].get('deleteCookies', False):
                 # wait for page to clear cookies.
                 await asyncio.wait_for(
-                    page._client.send('Network.clearBrowserCookies'), timeout=3)
+                    self._send(page, 'Network.clearBrowserCookies'), timeout=3)
+                # saved sessions need to be restored again.
+                self.browsers[page.browser].pop('restored_sites', None)
         except (asyncio.TimeoutError, pyppeteer.errors.NetworkError) as e:
             # all page functions will hang and time out if browser has crashed.
             # replace crashed browser.
             logger.warning(f"Detected error with browser {page.browser}: {e}")
             await self.replace_browser(page.browser)
             # try again
-            return await self._get_idle_page()
+            return await self._get_idle_page(priority, self._remaining(deadline, start))
         return page
 
+    @staticmethod
+    def _remaining(deadline: Union[float, None], start: float) -> Union[float, None]:
+        """Seconds left of {deadline} seconds that started at loop time {start}."""
+        if deadline is None:
+            return None
+        return max(deadline - (asyncio.get_running_loop().time() - start), 0)
+
     async def set_ad_block(self, page: Page, enabled: bool = True):
         # Enable Chrome's experimental ad filter on all sites.
-        await page._client.send('Page.setAdBlockingEnabled', {'enabled': True})
+        await self._send(page, 'Page.setAdBlockingEnabled', {'enabled': enabled})
 
     async def set_blocked_urls(self, page: Page, urls: List[str]):
-        await page._client.send('Network.setBlockedURLs', {'urls': urls})
+        await self._send(page, 'Network.setBlockedURLs', {'urls': urls})
 
-    async def set_stealth(self, page: Page):
+    async def set_stealth(self, page: Page, evasions: Tuple[str, ...] = EVASIONS):
         "add JavaScript functions to prevent automation detection."
-        await page.evaluateOnNewDocument(
-            f"() => {{{Path(__file__).parent.joinpath('stealth.min.js').read_text()}}}")
+        script = stealth_script(evasions)
+        if script:
+            # the script is cached, so it's sent as is instead of being wrapped for each page.
+            await self._send(page, 'Page.addScriptToEvaluateOnNewDocument', {'source': script})
+
+    def _send(self, page: Page, method: str, params: Dict[str, Any] = None) -> asyncio.Future:
+        """Send a DevTools protocol command to page through its browser's CDPDispatcher."""
+        return self.browsers[page.browser]['cdp'].send(page._client, method, params)
+
+    def cdp_metrics(self) -> Dict[str, Dict[str, float]]:
+        """DevTools command queue depth and latency of each browser, by browser id."""
+        return {data['id']: data['cdp'].metrics() for data in self.browsers.values()}
 
     async def _add_page_settings(self, page: Page) -> None:
         """Add custom settings to a page."""
@@ -277,7 +793,12 @@ class Spider:
         if 'defaultNavigationTimeout' in launch_options:
             page.setDefaultNavigationTimeout(
                 launch_options['defaultNavigationTimeout'])
-        tasks = [self.set_stealth(page)]
+        # stealth evasions and each script that will be invoked whenever the page is navigated are added separately,
+        # so a syntax error in one script doesn't stop the others (or the evasions) from running.
+        scripts = [stealth_script(select_evasions(launch_options))] + [
+            f"({script})()" for script in launch_options.get('evaluateOnNewDocument', [])]
+        tasks = [self._send(page, 'Page.addScriptToEvaluateOnNewDocument', {'source': source})
+                 for source in scripts if source]
         # blocks URLs from loading.
         if 'blockedURLs' in launch_options:
             tasks.append(self.set_blocked_urls(
@@ -286,26 +807,39 @@ class Spider:
         if 'setCacheEnabled' in launch_options:
             tasks.append(page.setCacheEnabled(
                 launch_options['setCacheEnabled']))
-        # add a JavaScript function(s) that will be invoked whenever the page is navigated.
-        for script in launch_options.get('evaluateOnNewDocument', []):
-            tasks.append(page.evaluateOnNewDocument(script))
+        # store all network exchanges in an archive.
+        if 'record' in launch_options:
+            self._get_archive(launch_options['record']).record(page, self._create_task)
+        # serve responses from an archive instead of the network.
+        replay = self._get_archive(
+            launch_options['replay']) if 'replay' in launch_options else None
         # intercept all request and only allow requests for types not in request_abort_types.
-        request_abort_types = launch_options.get('requestAbortTypes')
-        if request_abort_types:
+        request_abort_types = launch_options.get('requestAbortTypes') or ()
+        if request_abort_types or replay:
             # enable request interception.
             tasks.append(page.setRequestInterception(True))
 
-            async def block_type(request: Request):
+            cdp = self.browsers[page.browser]['cdp']
+
+            def intercept(request: Request) -> None:
+                # handled inline, with the browser's command limit, instead of in a task per request.
                 # condition(s) where requests should be aborted.
                 if request.resourceType in request_abort_types:
-                    await request.abort()
+                    abort_request(cdp, request)
                 elif launch_options.get('blockRedirects', False) and request.isNavigationRequest() and len(request.redirectChain):
-                    await request.abort()
+                    abort_request(cdp, request)
+                elif replay:
+                    response = replay.replay_response(request)
+                    if response is not None:
+                        respond_request(cdp, request, response)
+                    elif launch_options.get('replayPassthrough', False):
+                        continue_request(cdp, request)
+                    else:
+                        abort_request(cdp, request, 'internetdisconnected')
                 else:
-                    await request.continue_()
+                    continue_request(cdp, request)
 
-            page.on('request',
-                    lambda request: asyncio.create_task(block_type(request)))
+            page.on('request', intercept)
         await asyncio.gather(*tasks)
 
     async def _check_idle_status(self, page: Page) -> None:
@@ -328,8 +862,9 @@ class Spider:
                 await self.set_idle(page)
         # check page's idle status again in about another minute.
         await asyncio.sleep(60)
-        asyncio.create_task(
-            self._check_idle_status(page))
+        if page in self.pages:
+            self._create_task(
+                self._check_idle_status(page))
 
     async def replace_browser(self, browser: Browser, launch_options: Dict[str, Any] = None) -> None:
         """Close browser and launch a new one."""
@@ -347,6 +882,10 @@ class Spider:
                 await asyncio.sleep(0.5)
             # return now that browser replacement is complete.
             return
+        if self.browsers[browser]['draining']:
+            # browser is being recycled and its replacement has already been launched.
+            logger.info(f"Closing draining browser: {browser}.")
+            return await self._shutdown_browser(browser)
         # lock this browser so other tasks can not create replacement browsers for this browser.
         async with lock:
             logger.info(f"Replacing browser: {browser}.")
@@ -357,10 +896,97 @@ class Spider:
             # close the old browser.
             await self._shutdown_browser(browser)
             # add a new browser.
+            await self._add_replacement_browser(browser_data)
+        logger.info(f"Browser {browser} replacement complete.")
+
+    async def _add_replacement_browser(self, browser_data: Dict[str, Any]) -> None:
+        """Add a browser with the same settings as the browser described by {browser_data}."""
+        if browser_data.get('shared'):
+            # shared browsers are owned by the server. lease new pages instead.
+            await self.lease_pages(browser_data['server'], browser_data['page_count'])
+        else:
             await self.add_browser(pages=browser_data['page_count'],
                                    server=browser_data['server'],
                                    launch_options=browser_data['launch_options'])
-        logger.info(f"Browser {browser} replacement complete.")
+
+    async def recycle_browser(self, browser: Browser) -> bool:
+        """Launch a replacement browser, then close browser once all of its pages are done being used.
+           Return False if browser was not recycled."""
+        browser_data = self.browsers.get(browser)
+        # check that browser has not been replaced and is not already being recycled.
+        if browser_data is None or browser_data['draining'] or browser_data['lock'].locked():
+            return False
+        logger.info(f"Recycling browser {browser_data['id']}.")
+        # stop handing out this browser's pages.
+        browser_data['draining'] = True
+        # launch the replacement first, so there is no drop in capacity while draining.
+        try:
+            await self._add_replacement_browser(browser_data)
+        except Exception as e:
+            logger.error(
+                f"Could not launch replacement for browser {browser_data['id']}: {e}")
+            # keep using this browser until recycling can be retried.
+            browser_data['draining'] = False
+            for page, data in list(self.pages.items()):
+                if page.browser is browser and data['is_idle'] and page not in self.idle_page_q._queue:
+                    self.idle_page_q.put_nowait(page)
+            self.scheduler.dispatch()
+            return False
+        await self._drain_browser(browser)
+        logger.info(f"Browser {browser_data['id']} recycling complete.")
+        return True
+
+    async def _drain_browser(self, browser: Browser) -> None:
+        """Wait for all in-flight pages of a draining browser to be set idle, then close it."""
+        while browser in self.browsers and any(
+                not data['is_idle'] for page, data in list(self.pages.items()) if page.browser is browser):
+            await asyncio.sleep(0.5)
+        if browser in self.browsers:
+            await self._shutdown_browser(browser)
+
+    async def _check_recycle_status(self, browser: Browser, interval: float = 30) -> None:
+        """Recycle browser if it has exceeded maxBrowserAge (seconds) or maxBrowserMemory (MB)."""
+        # check again in about {interval} seconds.
+        await asyncio.sleep(interval)
+        browser_data = self.browsers.get(browser)
+        if browser_data is None or browser_data['draining']:
+            return
+        launch_options = browser_data['launch_options']
+        age = (datetime.now() - browser_data['launch_time']).total_seconds()
+        if age >= launch_options.get('maxBrowserAge', float('inf')):
+            logger.info(
+                f"Browser {browser_data['id']} exceeded max age ({age:.0f}s).")
+            if await self.recycle_browser(browser):
+                return
+        elif 'maxBrowserMemory' in launch_options:
+            try:
+                rss = await self._browser_memory(browser)
+            except Exception as e:
+                logger.error(
+                    f"Could not check memory of browser {browser_data['id']}: {e}")
+                rss = None
+            if rss is not None and rss / 1e6 >= launch_options['maxBrowserMemory']:
+                logger.info(
+                    f"Browser {browser_data['id']} exceeded max memory ({rss / 1e6:.0f} MB).")
+                if await self.recycle_browser(browser):
+                    return
+        if browser in self.browsers:
+            self._create_task(self._check_recycle_status(browser, interval))
+
+    async def _browser_memory(self, browser: Browser) -> Union[int, None]:
+        """Resident memory (bytes) of browser's process tree."""
+        if browser.process is not None:
+            return process_tree_rss(browser.process.pid)
+        import requests
+        server = self.browsers[browser]['server']
+        try:
+            resp = await asyncio.get_running_loop().run_in_executor(None, lambda: requests.get(
+                f"http://{server}/browser_memory", params={'browser': browser.wsEndpoint}, timeout=10))
+        except requests.RequestException as e:
+            logger.warning(f"Could not get memory of browser {self.browsers[browser]['id']} from {server}: {e}")
+            return None
+        if resp.status_code == 200:
+            return resp.json()['rss']
 
     async def _log_browser_error_status(self, browser: Browser, error: bool) -> None:
         """If error, increment concecutive error count snd replace browser if concecutive error count exceeds limit.
@@ -382,6 +1008,7 @@ class Spider:
         if page in self.idle_page_q._queue:
             # remove page from idle queue.
             self.idle_page_q._queue.remove(page)
+        self._release_page(page)
         del self.pages[page]
         try:
             # wait for page to close.
@@ -393,34 +1020,94 @@ class Spider:
     async def _shutdown_browser(self, browser: Browser) -> None:
         """Close browser and remove all references."""
         logger.info(f"Removing browser: {browser}")
+        browser_data = self.browsers[browser]
+        if browser_data.get('shared'):
+            # only close the pages this Spider opened in the shared browser.
+            pages = [p for p in list(self.pages) if p.browser is browser]
+        else:
+            pages = await browser.pages()
         # remove all pages from the browser.
-        for page in await browser.pages():
-            await self._close_page(page)
+        await asyncio.gather(*[self._close_page(page) for page in pages])
         # disable self.__on_connection_close
         browser._connection._closeCallback = None
-        # attempt to properly close browser.
-        try:
-            await asyncio.wait_for(browser.close(), timeout=2)
-        except asyncio.TimeoutError:
-            pass
+        if browser_data.get('shared'):
+            # free the page slots and leave the browser running for other clients.
+            for lease_id in browser_data['leases']:
+                try:
+                    await self._server_request(browser_data['server'], '/pages/release', {'lease_id': lease_id})
+                except Exception as e:
+                    logger.warning(f"Could not release page lease {lease_id}: {e}")
+            await browser.disconnect()
+        else:
+            # attempt to properly close browser.
+            try:
+                await asyncio.wait_for(browser.close(), timeout=2)
+            except asyncio.TimeoutError:
+                pass
         del self.browsers[browser]
 
-    def _set_screenshot_dir(self) -> None:
-        """create screenshot directory for this Spider."""
-        self.screenshot_dir = Path(
-            f"distbot/screenshots_{self.start_time.strftime('%Y-%m-%d_%H:%M:%S')}")
-        self.screenshot_dir.mkdir(exist_ok=True)
+    def _get_archive(self, path: str) -> Archive:
+        """Archive at path, shared by all browsers that record to or replay from it."""
+        if path not in self.archives:
+            self.archives[path] = Archive(path)
+        return self.archives[path]
+
+    def _set_screenshot_writer(self, launch_options: Dict[str, Any]) -> None:
+        """create screenshot directory and background screenshot writer for this Spider."""
+        if self.screenshot_writer is None:
+            self.screenshot_writer = ScreenshotWriter(
+                f"distbot/screenshots_{self.start_time.strftime('%Y-%m-%d_%H-%M-%S')}",
+                max_files=launch_options.get('screenshotMaxFiles'),
+                max_bytes=launch_options.get('screenshotMaxBytes'))
+
+    async def _reset_page(self, page: Page) -> None:
+        """Free the memory held by page's document (DOM, timers, media, JS objects) while page is idle."""
+        launch_options = self.browsers[page.browser]['launch_options']
+        start = asyncio.get_running_loop().time()
+        parts = urlsplit(page.url)
+        try:
+            # unloading the document stops its timers, media and workers.
+            navigated = asyncio.ensure_future(page.waitForNavigation(timeout=5_000))
+            # let the navigation watcher start before navigating.
+            await asyncio.sleep(0)
+            try:
+                await asyncio.wait_for(self._send(page, 'Page.navigate', {'url': 'about:blank'}), timeout=5)
+                # Page.navigate returns before the frame has navigated.
+                await navigated
+            finally:
+                navigated.cancel()
+            if launch_options.get('resetPageStorage', False) and parts.scheme in ('http', 'https'):
+                # local storage, IndexedDB, cache storage and service workers. cookies are kept.
+                await asyncio.wait_for(self._send(page, 'Storage.clearDataForOrigin', {
+                    'origin': f'{parts.scheme}://{parts.netloc}',
+                    'storageTypes': 'local_storage,indexeddb,websql,cache_storage,service_workers,file_systems'}),
+                    timeout=5)
+            if launch_options.get('resetPageGC', False):
+                await asyncio.wait_for(self._send(page, 'HeapProfiler.collectGarbage'), timeout=5)
+        except Exception as e:
+            # page may have been closed while it was being reset.
+            logger.warning("Could not reset page %s: %s", self.pages.get(page, {}).get('id'), e,
+                           extra={'event': 'reset_error', 'url': page.url})
+        self.stats['resets'] += 1
+        self.stats['reset_time'] += asyncio.get_running_loop().time() - start
 
     async def _take_screenshot(self, page: Page) -> None:
-        """take a screenshot of the current page."""
-        page_id = self.pages[page]['id']
-        # remove this page's old screenshot.
-        for f in self.screenshot_dir.glob(f'*{page_id}.jpeg'):
-            f.unlink()
-        # take new screenshot.
-        # quality=0 uses less CPU and still provides a pretty clear image.
-        await page.screenshot(path=str(self.screenshot_dir.joinpath(
-            f"{datetime.now().strftime('%Y-%m-%d_%H:%M:%S')}_{page}.jpeg")), quality=0)
+        """take a screenshot of the current page and queue it to be saved."""
+        self.pages[page]['screenshot_pending'] = False
+        launch_options = self.browsers[page.browser]['launch_options']
+        fmt = launch_options.get('screenshotFormat', 'jpeg')
+        params = {'format': fmt}
+        if fmt != 'png':
+            # quality=0 uses less CPU and still provides a pretty clear image.
+            params['quality'] = launch_options.get('screenshotQuality', 0)
+        try:
+            result = await asyncio.wait_for(
+                self._send(page, 'Page.captureScreenshot', params), timeout=5)
+        except Exception as e:
+            logger.warning(f"Could not take screenshot of {page.url}: {e}")
+            return
+        self.screenshot_writer.put(
+            page.url, self.pages[page]['id'], result['data'], fmt)
 
     def _set_signal_handler(self) -> None:
         """catch interupt signals and call shutdown."""
@@ -441,5 +1128,5 @@ class Spider:
         for browser in set(self.browsers.keys()):
             if browser._connection.connection is None or not browser._connection.connection.open:
                 logger.warning(f"Found closed connection: {browser}")
-                asyncio.create_task(
+                self._create_task(
                     self.replace_browser(browser))
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Iterable, Tuple
+from functools import lru_cache
+from pathlib import Path
+
+EVASIONS_DIR = Path(__file__).parent.joinpath('evasions')
+
+# all evasions, in the order they are run.
+EVASIONS = ('chrome.app', 'chrome.csi', 'chrome.loadTimes', 'chrome.runtime', 'media.codecs',
+            'navigator.languages', 'navigator.permissions', 'navigator.plugins', 'navigator.webdriver',
+            'webgl.vendor', 'window.outerdimensions', 'iframe.contentWindow')
+
+
+def select_evasions(launch_options: Dict[str, Any]) -> Tuple[str, ...]:
+    """Evasions selected by the 'stealth' (True, False or list of evasion names) and 'stealthExclude' launch options."""
+    stealth = launch_options.get('stealth', True)
+    if stealth is True:
+        selected = set(EVASIONS)
+    elif not stealth:
+        selected = set()
+    else:
+        selected = set(stealth)
+    unknown = selected.difference(EVASIONS)
+    if unknown:
+        raise ValueError(
+            f"Unknown stealth evasions: {unknown}. Valid evasions: {EVASIONS}")
+    selected.difference_update(launch_options.get('stealthExclude', []))
+    return tuple(e for e in EVASIONS if e in selected)
+
+
+@lru_cache(maxsize=None)
+def _read(name: str) -> str:
+    return EVASIONS_DIR.joinpath(f'{name}.js').read_text()
+
+
+@lru_cache(maxsize=None)
+def stealth_script(evasions: Tuple[str, ...] = EVASIONS) -> str:
+    """Script that runs {evasions}. Built once per process for each selection."""
+    if not evasions:
+        return ''
+    sources = [_read(e) for e in evasions]
+    # helpers are only included if a selected evasion uses them.
+    utils = _read('_utils') if any('(utils' in s for s in sources) else ''
+    # an error in one evasion doesn't stop the others.
+    body = '\n'.join(f"try {{\n{s}}} catch (e) {{}}" for s in sources)
+    return f"(() => {{\n{utils}{body}\n}})()"
+
+
+def script_size(evasions: Iterable[str] = EVASIONS) -> int:
+    """Size (bytes) of the script for evasions."""
+    return len(stealth_script(tuple(evasions)).encode())
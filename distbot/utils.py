@@ -1,43 +1,75 @@
-from pyppeteer.page import Page
-import pyppeteer.errors
-import html_text
+from __future__ import annotations
 
-from typing import Optional, Union
-from collections import defaultdict
-from itertools import product
+from distbot.interact import hover_all, explore_selects, expand_js_links as _expand_js_links
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 from pathlib import Path
-from time import time
 import logging.handlers
 import logging
+import warnings
 import asyncio
+import atexit
+import random
+import queue
+import json
+import time
 import sys
 import re
 
+if TYPE_CHECKING:
+    from pyppeteer.page import Page
+
+
+# scroll to the bottom of the page until page height stops changing.
+# DOM mutations and resizes reset the idle timer, so content that is still loading isn't cut off.
+_scroll_js = """async (idleTime, maxHeight, maxDuration) => {
+    const height = () => (document.scrollingElement || document.body).scrollHeight;
+    const start = performance.now();
+    let lastChange = start;
+    let lastHeight = height();
+    const onChange = () => { lastChange = performance.now(); };
+    const mutationObserver = new MutationObserver(onChange);
+    mutationObserver.observe(document.documentElement, {childList: true, subtree: true});
+    const resizeObserver = window.ResizeObserver ? new ResizeObserver(onChange) : null;
+    if (resizeObserver) resizeObserver.observe(document.body);
+    try {
+        while (true) {
+            window.scrollTo(0, height());
+            await new Promise(resolve => setTimeout(resolve, 50));
+            const currentHeight = height();
+            const now = performance.now();
+            if (currentHeight !== lastHeight) {
+                lastHeight = currentHeight;
+                lastChange = now;
+            }
+            if ((maxHeight && currentHeight >= maxHeight) || now - start >= maxDuration || now - lastChange >= idleTime) {
+                return currentHeight;
+            }
+        }
+    } finally {
+        mutationObserver.disconnect();
+        if (resizeObserver) resizeObserver.disconnect();
+    }
+}"""
 
-async def scroll(page: Page, timeout: int = 5):
-    "Scroll to the bottom of page."
+
+async def scroll(page: Page, idle_time: float = 1, max_height: int = None, max_duration: float = 30,
+                 timeout: float = None) -> Optional[int]:
+    """Scroll to the bottom of page. Stop once page height/DOM has not changed for {idle_time} seconds,
+       page height reaches {max_height} pixels, or {max_duration} seconds have passed. Return final page height.
+       {timeout} is a deprecated alias of {idle_time}."""
+    if timeout is not None:
+        warnings.warn("scroll's timeout argument is deprecated. Use idle_time.", DeprecationWarning, stacklevel=2)
+        idle_time = timeout
     logging.info(f"Scrolling page: {page.url}")
-    # page height before scroll command.
-    last_height = await page.evaluate("() => document.body.scrollHeight")
-    # time last change in page height was detected.
-    t_last_scroll = time()
     try:
-        # loop for {timeout} seconds.
-        while time()-t_last_scroll < timeout:
-            # command page to scroll.
-            await page.evaluate(
-                f"window.scrollTo(0, document.body.scrollHeight);")
-            # sleep to allow page to scroll/load.
-            await asyncio.sleep(1)
-            # height will have increased if page actually scrolled.
-            current_height = await page.evaluate(
-                "() => document.body.scrollHeight")
-            if current_height != last_height:
-                logging.info(
-                    f"Scrolled page from {last_height} to {current_height} ({page.url})")
-                t_last_scroll = time()
-                last_height = current_height
-        logging.info(f"Page scroll finished: {page.url}")
+        # the whole scroll runs in the page, so it's only one round-trip.
+        height = await asyncio.wait_for(
+            page.evaluate(_scroll_js, idle_time * 1000,
+                          max_height or 0, max_duration * 1000),
+            timeout=max_duration + 5)
+        logging.info(f"Page scroll finished at height {height}: {page.url}")
+        return height
     except Exception as e:
         logging.exception(
             f"Page ({page.url}) not scrollable. Error: {e}")
@@ -45,122 +77,235 @@ async def scroll(page: Page, timeout: int = 5):
 
 async def hover(page: Page, ele_xpath: str):
     """Hover over all elements at ele_xpath."""
+    import pyppeteer.errors
     try:
         await page.waitForXPath(ele_xpath, timeout=45_000)
     except pyppeteer.errors.TimeoutError as e:
         logging.exception(
             f"Hover failed. No elements found at XPath {ele_xpath}. Error: {e}")
         return
-    last_ele_count = 0
-    while True:
-        eles = await page.xpath(ele_xpath)
-        ele_count = len(eles)
-        if ele_count <= last_ele_count:
-            logging.info(f"No more elements to hover at {ele_xpath}.")
-            return
-        for i in range(last_ele_count, ele_count):
-            logging.info(f"Hovering element {i} ({ele_xpath})")
-            await eles[i].hover()
-            # perform short sleep to allow hover-triggered content to load.
-            await asyncio.sleep(0.66)
-        last_ele_count = ele_count
-
-
-async def expand_js_links(spider, page):
-    page_html = defaultdict(list)
-    start_url = page.url
-    for path in ("//a[@href='#']", "//a[@href='javascript:void(0);']"):
-        cur_idx = 0
-        while True:
-            eles = await page.xpath(path)
-            if cur_idx <= len(eles):
-                ele = eles[cur_idx]
-                nav_wait_task = asyncio.create_task(page.waitForNavigation())
-                await ele.click()
-                if page.url != start_url:
-                    try:
-                        await nav_wait_task  # wait for navigation to complete.
-                    except pyppeteer.errors.TimeoutError:
-                        logging.warning(f"Timeout navigating to {page.url}")
-                    html = await page.content()
-                    page_html[page.url] = html
-                    page = await spider.get(start_url)
-                else:
-                    nav_wait_task.cancel()
-                    page_html[page.url] = html
-                cur_idx += 1
-                break
-            else:
-                break
+    return await hover_all(page, ele_xpath)
+
+
+async def expand_js_links(spider, page, workers: int = 4):
+    """Click all JavaScript links on page, distributing clicks over up to {workers} Spider pages.
+       page takes the first share of clicks and is navigated back to its URL afterwards. The caller keeps holding it,
+       so the other workers only use the Spider's other pages.
+       Return map of destination URL to list of distinct HTML found there."""
+    return await _expand_js_links(spider, page.url, workers=workers, page=page)
 
 
 async def choose_all_select(page):
-    section_option_values, htmls = [], []
-    for select_ele in await page.xpath('//select'):
-        section_option_values.append([
-            await page.evaluate("(ele) => ele.getAttribute('value')", ele)
-            for ele in await select_ele.xpath('./option[@value]')
-        ])
-    for i, option_values in enumerate(section_option_values, start=1):
-        for opt_val in option_values:
-            await page.select(f'select:nth-child({i})', opt_val)
-            await asyncio.sleep(0.5)
-            html = await page.content()
-            htmls.append(html)
-    return htmls
+    """Choose each option of each select. Return HTML of each distinct resulting DOM state."""
+    return await explore_selects(page)
 
 
 async def choose_all_select_combinations(page):
-    sec_id_vals = []
-    select_sections = await page.xpath('//select')
-    for i, select_ele in enumerate(select_sections, start=1):
-        opt_vals = []
-        for ele in await select_ele.xpath('./option[@value]'):
-            opt_val = await page.evaluate("(ele) => ele.getAttribute('value')", ele)
-            opt_vals.append((i, opt_val))
-        sec_id_vals.append(opt_vals)
-    htmls = []
-    for comb in product(*sec_id_vals):
-        for i, opt_val in comb:
-            await page.select(f'select:nth-child({i})', opt_val)
-            await asyncio.sleep(0.5)
-            html = await page.content()
-            htmls.append(html)
-    return htmls
-
-
-def get_logger(logger_name: str, log_save_path: Optional[Union[str, Path]] = None, log_level: int = logging.INFO) -> logging.Logger:
-    """Create a logger with an optional log file."""
-    formatter = logging.Formatter(
+    """Choose every combination of select options. Return HTML of each distinct resulting DOM state."""
+    return await explore_selects(page, combinations=True)
+
+
+# fields that structured log records may have. Pass them with extra={...}
+LOG_FIELDS = ('event', 'url', 'status', 'server', 'browser', 'page', 'latency', 'wait', 'suppressed')
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line with stable field names."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {'time': record.created, 'level': record.levelname, 'logger': record.name,
+                 'message': record.getMessage()}
+        for field in LOG_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records for each event. {rates} maps event name to the fraction of records to keep."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, 'event', None), 1)
+        return rate >= 1 or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Limit records at or above {level} to {per_second} (with bursts of {burst}) for each event or call site.
+       The next record that is let through has the number of suppressed records in its 'suppressed' field."""
+
+    def __init__(self, per_second: float = 1, burst: int = 10, level: int = logging.WARNING):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.level = level
+        # key -> [tokens, last update time, suppressed count]
+        self.buckets = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level:
+            return True
+        key = getattr(record, 'event', None) or (record.pathname, record.lineno)
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(key, [self.burst, now, 0])
+        bucket[0] = min(self.burst, bucket[0] +
+                        (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the listener is a thread in this process, so only the message needs to be resolved now.
+        # formatting (and exception formatting) happens in the listener.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# logger name -> QueueListener writing that logger's records in a background thread.
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
+
+def _make_handlers(log_save_path: Optional[Union[str, Path]], log_level: int,
+                   structured: bool) -> Tuple[List[logging.Handler], Optional[str]]:
+    """Stream handler and optional rotating file handler. Return handlers and error creating the log file, if any."""
+    formatter = JSONFormatter() if structured else logging.Formatter(
         '[%(name)s][%(levelname)s]%(asctime)s: %(message)s')
     sh = logging.StreamHandler()  # sys.stdout
     sh.setLevel(log_level)
     sh.setFormatter(formatter)
-    # logging.basicConfig(stream=sh)
-    logger = logging.getLogger(logger_name)
-    logger.setLevel(log_level)
-    logger.addHandler(sh)
+    handlers = [sh]
+    error = None
     if log_save_path is not None:
         log_save_path = Path(log_save_path)
-        if not log_save_path.is_file():
-            try:
-                log_save_path.parent.mkdir(exist_ok=True, parents=True)
-            except (FileNotFoundError, PermissionError) as e:
-                logger.error(
-                    f"Error creating log directory '{log_save_path.parent}'. No log will be saved. Error: {e}"
-                )
-                return logger
-        fh = logging.handlers.RotatingFileHandler(log_save_path,
-                                                  maxBytes=10_000_000,
-                                                  backupCount=2)
-        fh.setLevel(log_level)
-        fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        try:
+            log_save_path.parent.mkdir(exist_ok=True, parents=True)
+            fh = logging.handlers.RotatingFileHandler(log_save_path,
+                                                      maxBytes=10_000_000,
+                                                      backupCount=2)
+            fh.setLevel(log_level)
+            fh.setFormatter(formatter)
+            handlers.append(fh)
+        except (FileNotFoundError, PermissionError) as e:
+            error = f"Error creating log directory '{log_save_path.parent}'. No log will be saved. Error: {e}"
+    return handlers, error
+
+
+class _DefaultHandler(logging.Handler):
+    """Creates distbot's default stream and file handlers when the first record is logged, then passes records to them.
+       Importing distbot doesn't open (or create) the log file."""
+
+    def __init__(self, log_save_path: Union[str, Path]):
+        super().__init__()
+        self.log_save_path = log_save_path
+        self.handlers = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Handler.handle holds self.lock, so handlers are only created once.
+        if self.handlers is None:
+            self.handlers, error = _make_handlers(
+                self.log_save_path, logging.INFO, False)
+            if error:
+                self.handlers[0].handle(logging.makeLogRecord(
+                    {'name': record.name, 'levelno': logging.ERROR, 'levelname': 'ERROR', 'msg': error}))
+        for h in self.handlers:
+            if record.levelno >= h.level:
+                h.handle(record)
+
+
+def get_logger(logger_name: str, log_save_path: Optional[Union[str, Path]] = None, log_level: int = logging.INFO,
+               background: bool = False, structured: bool = False, sample_rates: Dict[str, float] = None,
+               rate_limit: float = None, queue_size: int = 100_000) -> logging.Logger:
+    """Create a logger with an optional log file.
+       {background}: hand records to a background thread through a queue, so logging never blocks the event loop.
+       Records are dropped if more than {queue_size} are waiting.
+       {structured}: write JSON lines with the fields in LOG_FIELDS.
+       {sample_rates}: fraction of records to keep for each event.
+       {rate_limit}: maximum warnings per second for each event or call site."""
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(log_level)
+    # remove handlers and filters from previous configuration.
+    if logger_name in _listeners:
+        _listeners.pop(logger_name).stop()
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+    for f in list(logger.filters):
+        logger.removeFilter(f)
+    # filters run before records are formatted or queued.
+    if sample_rates:
+        logger.addFilter(SamplingFilter(sample_rates))
+    if rate_limit:
+        logger.addFilter(RateLimitFilter(rate_limit))
+    handlers, error = _make_handlers(log_save_path, log_level, structured)
+    if background:
+        listener = logging.handlers.QueueListener(
+            queue.Queue(queue_size), *handlers, respect_handler_level=True)
+        logger.addHandler(_DroppingQueueHandler(listener.queue))
+        listener.start()
+        _listeners[logger_name] = listener
+    else:
+        for h in handlers:
+            logger.addHandler(h)
+    if error:
+        logger.error(error)
     return logger
 
 
-logger = get_logger(
-    "distbot", log_save_path=Path('distbot_logs/distbot.log'))
+def configure_logging(**kwargs) -> logging.Logger:
+    """Reconfigure distbot's logger. See get_logger for options."""
+    kwargs.setdefault('log_save_path', Path('distbot_logs/distbot.log'))
+    return get_logger("distbot", **kwargs)
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Write all queued log records and stop background log writers."""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
+
+
+def process_tree_rss(pid: int) -> int:
+    """Total resident memory (bytes) of process {pid} and all of its children."""
+    import psutil
+    proc = psutil.Process(pid)
+    rss = 0
+    for p in [proc] + proc.children(recursive=True):
+        try:
+            rss += p.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return rss
+
+
+logger = logging.getLogger("distbot")
+logger.setLevel(logging.INFO)
+logger.addHandler(_DefaultHandler(Path('distbot_logs/distbot.log')))
 
 
 user_agents = {
@@ -251,6 +396,7 @@ error_regs = [
 
 
 async def security_check(page, response):
+    import html_text
     html = await page.content()
     text = html_text.extract_text(html)
     error_level = len([r for r in error_regs if r.search(text)])
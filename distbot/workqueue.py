@@ -0,0 +1,137 @@
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+import sqlite3
+import json
+import time
+
+
+class WorkQueue:
+    """SQLite-backed URL queue and browser page pool shared by multiple Spiders.
+
+    URLs and browser pages are handed out as leases. A lease must be renewed with heartbeat before it expires,
+    otherwise its URL is queued again (or its page slot is freed) for another client.
+    """
+
+    def __init__(self, path: str = ':memory:', max_attempts: int = 3):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.max_attempts = max_attempts
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                priority REAL NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_id TEXT,
+                client TEXT,
+                expires REAL,
+                result TEXT
+            );
+            CREATE INDEX IF NOT EXISTS items_queued ON items (state, priority, id);
+            CREATE UNIQUE INDEX IF NOT EXISTS items_lease ON items (lease_id);
+            CREATE TABLE IF NOT EXISTS browsers (
+                endpoint TEXT PRIMARY KEY,
+                pages INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS page_leases (
+                lease_id TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                client TEXT,
+                expires REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def _expire(self) -> None:
+        """Queue URLs (or mark them failed, if they have reached max attempts) and free page slots
+           whose leases have expired."""
+        now = time.time()
+        self.db.execute("""UPDATE items SET
+                           state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                           lease_id = NULL, client = NULL, expires = NULL
+                           WHERE state = 'leased' AND expires < ?""", (self.max_attempts, now))
+        self.db.execute("DELETE FROM page_leases WHERE expires < ?", (now,))
+
+    def push(self, urls: List[str], priority: float = 0) -> int:
+        """Add urls to the queue. Lower priority values are leased first."""
+        with self.db:
+            self.db.executemany("INSERT INTO items (url, priority) VALUES (?, ?)",
+                                [(url, priority) for url in urls])
+        return len(urls)
+
+    def lease(self, client: str = None, count: int = 1, lease_seconds: float = 60) -> List[Dict[str, Any]]:
+        """Lease up to {count} queued URLs."""
+        with self.db:
+            self._expire()
+            rows = self.db.execute("""SELECT id, url FROM items WHERE state = 'queued'
+                                      ORDER BY priority, id LIMIT ?""", (count,)).fetchall()
+            leases = [{'lease_id': str(uuid4()), 'id': id, 'url': url} for id, url in rows]
+            self.db.executemany("""UPDATE items SET state = 'leased', lease_id = ?, client = ?, expires = ?,
+                                   attempts = attempts + 1 WHERE id = ?""",
+                                [(l['lease_id'], client, time.time() + lease_seconds, l['id']) for l in leases])
+        return leases
+
+    def heartbeat(self, lease_ids: List[str], lease_seconds: float = 60) -> int:
+        """Extend URL and page leases. Return number of leases extended."""
+        expires = time.time() + lease_seconds
+        with self.db:
+            extended = 0
+            for lease_id in lease_ids:
+                extended += self.db.execute("""UPDATE items SET expires = ? WHERE lease_id = ? AND state = 'leased'""",
+                                            (expires, lease_id)).rowcount
+                extended += self.db.execute("UPDATE page_leases SET expires = ? WHERE lease_id = ?",
+                                            (expires, lease_id)).rowcount
+        return extended
+
+    def ack(self, lease_id: str, result: Any = None) -> bool:
+        """Mark leased URL as done."""
+        with self.db:
+            return bool(self.db.execute("""UPDATE items SET state = 'done', expires = NULL, result = ?
+                                           WHERE lease_id = ? AND state = 'leased'""",
+                                        (json.dumps(result), lease_id)).rowcount)
+
+    def nack(self, lease_id: str) -> bool:
+        """Return leased URL to the queue, or mark it failed if it has reached max attempts."""
+        with self.db:
+            return bool(self.db.execute("""UPDATE items SET
+                                           state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                                           lease_id = NULL, client = NULL, expires = NULL
+                                           WHERE lease_id = ? AND state = 'leased'""",
+                                        (self.max_attempts, lease_id)).rowcount)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of URLs in each state."""
+        with self.db:
+            self._expire()
+            counts = dict(self.db.execute(
+                "SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in ('queued', 'leased', 'done', 'failed')}
+
+    def register_browser(self, endpoint: str, pages: int) -> None:
+        """Share {pages} pages of browser at DevTools {endpoint} with all clients."""
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO browsers VALUES (?, ?)", (endpoint, pages))
+
+    def unregister_browser(self, endpoint: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM browsers WHERE endpoint = ?", (endpoint,))
+            self.db.execute("DELETE FROM page_leases WHERE endpoint = ?", (endpoint,))
+
+    def lease_page(self, client: str = None, lease_seconds: float = 60) -> Optional[Dict[str, str]]:
+        """Lease a page slot in the shared browser with the most free slots. Return None if all slots are leased."""
+        with self.db:
+            self._expire()
+            row = self.db.execute("""SELECT b.endpoint, b.pages - COUNT(l.lease_id) AS free FROM browsers b
+                                     LEFT JOIN page_leases l ON l.endpoint = b.endpoint
+                                     GROUP BY b.endpoint HAVING free > 0 ORDER BY free DESC LIMIT 1""").fetchone()
+            if row is None:
+                return None
+            lease = {'lease_id': str(uuid4()), 'endpoint': row[0]}
+            self.db.execute("INSERT INTO page_leases VALUES (?, ?, ?, ?)",
+                            (lease['lease_id'], row[0], client, time.time() + lease_seconds))
+        return lease
+
+    def release_page(self, lease_id: str) -> bool:
+        with self.db:
+            return bool(self.db.execute("DELETE FROM page_leases WHERE lease_id = ?", (lease_id,)).rowcount)
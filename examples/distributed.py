@@ -36,7 +36,7 @@ async def fetch(url, spider):
     await spider.set_idle(page)
 
 
-async def main(browsers=2, pages=2):
+async def main(browsers=None, pages=None):
     urls = load_urls()
     launch_options = {
         "headless": False,
@@ -52,15 +52,20 @@ async def main(browsers=2, pages=2):
         ]
     }
     spider = Spider()
-    for _ in range(browsers):
-        await spider.add_browser(pages=pages, launch_options=launch_options)
+    if browsers is None:
+        # start small and let the autoscaler find the page and browser counts with the highest throughput.
+        await spider.add_browser(launch_options=launch_options)
+        spider.autoscale(max_pages=8, max_browsers=4, launch_options=launch_options)
+    else:
+        for _ in range(browsers):
+            await spider.add_browser(pages=pages, launch_options=launch_options)
     await asyncio.gather(
         *[asyncio.create_task(fetch(url, spider)) for url in urls])
     await spider.shutdown()
     print('Finished.')
 
 if __name__ == "__main__":
-    # check for command line arguments: number of browsers, number of pages per browser.
+    # check for command line arguments: number of browsers, number of pages per browser. autoscale if not given.
     if len(sys.argv) == 3:
         asyncio.run(
             main(int(sys.argv[1]), int(sys.argv[2])))
@@ -29,4 +29,5 @@ setuptools.setup(
         'requests',
         'html_text'
     ],
+    extras_require={'memory': ['psutil']},
     test_requires=['pytest', 'pytest_asyncio'])
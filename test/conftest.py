@@ -0,0 +1,23 @@
+from distbot.utils import logger, _DefaultHandler
+from pathlib import Path
+import pyppeteer.launcher
+import pytest
+
+requires_chromium = pytest.mark.skipif(
+    not Path(pyppeteer.launcher.executablePath()).exists(), reason='Chromium is not installed.')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def log_to_tmp_path(tmp_path_factory):
+    """Write distbot's default log under a temporary directory instead of the repository."""
+    log_dir = tmp_path_factory.mktemp('logs')
+    for handler in logger.handlers:
+        if isinstance(handler, _DefaultHandler):
+            for h in handler.handlers or []:
+                h.close()
+            handler.handlers = None
+            handler.log_save_path = log_dir / 'distbot_logs' / 'distbot.log'
+    # worker processes (e.g. ShardedSpider's) create their default log relative to the working directory.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(log_dir)
+        yield log_dir
@@ -0,0 +1,53 @@
+from distbot.archive import Archive, _replay_headers
+from distbot.cdp import raw_response
+from types import SimpleNamespace
+import base64
+
+
+def test_add_and_find(tmp_path):
+    archive = Archive(tmp_path / 'archive.db')
+    body = b'<html>' + b'x' * 10_000 + b'</html>'
+    archive.add('GET', 'http://a.com/', 200, {'content-type': 'text/html'}, body, resource_type='document')
+    archive.add('GET', 'http://a.com/copy', 200, {'content-type': 'text/html'}, body)
+    archive.add('POST', 'http://a.com/', 201, {}, b'created', post_data='q=1')
+    archive.add('GET', 'http://a.com/old', 301, {'location': 'http://a.com/'})
+    archive.close()
+
+    archive = Archive(tmp_path / 'archive.db')
+    assert len(archive) == 4
+    assert archive.find('GET', 'http://a.com/') == {
+        'status': 200, 'headers': {'content-type': 'text/html'}, 'body': body}
+    assert archive.find('POST', 'http://a.com/', 'q=1')['body'] == b'created'
+    assert archive.find('POST', 'http://a.com/', 'q=2') is None
+    assert archive.find('GET', 'http://a.com/old')['body'] == b''
+    # identical bodies are stored once, compressed.
+    assert archive.db.execute('SELECT COUNT(*), SUM(LENGTH(data)) FROM bodies').fetchone()[0] == 2
+    assert archive.db.execute('SELECT LENGTH(data) FROM bodies WHERE size = ?', (len(body),)).fetchone()[0] < 100
+    # the latest recording of a request is replayed.
+    archive.add('GET', 'http://a.com/', 200, {}, b'new')
+    assert archive.find('GET', 'http://a.com/')['body'] == b'new'
+    assert [e['url'] for e in archive.exchanges()][0] == 'http://a.com/'
+
+
+def test_replay_headers():
+    assert _replay_headers({'content-encoding': 'gzip', 'Content-Length': '10', 'vary': 'a\nb',
+                            'content-type': 'text/html'}) == {'vary': 'a, b', 'content-type': 'text/html'}
+    # cookies are kept separate.
+    cookies = 'a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT\nb=2'
+    assert _replay_headers({'Set-Cookie': cookies}) == {'Set-Cookie': cookies}
+    assert base64.b64decode(raw_response({'headers': {'Set-Cookie': cookies}})) == \
+        b'HTTP/1.1 200 OK\r\nset-cookie: a=1; Expires=Wed, 21 Oct 2026 07:28:00 GMT\r\nset-cookie: b=2\r\n\r\n'
+
+
+def test_record_uses_create_task(tmp_path):
+    listeners, started = {}, []
+    page = SimpleNamespace(on=lambda event, f: listeners.setdefault(event, f))
+
+    def create_task(coro):
+        # the Spider tracks recording tasks so shutdown can cancel them.
+        started.append(coro)
+        coro.close()
+
+    Archive(tmp_path / 'archive.db').record(page, create_task)
+    listeners['response'](SimpleNamespace(url='http://a.com/'))
+    assert len(started) == 1
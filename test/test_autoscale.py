@@ -0,0 +1,46 @@
+from distbot.autoscale import Autoscaler
+from distbot.spider import Spider
+from conftest import requires_chromium
+import pytest
+
+
+def _sample(throughput, latency=1.0, waiting=5, error_rate=0.0, cpu=50.0):
+    return {'throughput': throughput, 'latency': latency, 'error_rate': error_rate, 'cpu': cpu, 'memory': 50.0,
+            'waiting': waiting, 'browsers': 1, 'pages_per_browser': 1}
+
+
+def test_decide():
+    scaler = Autoscaler(Spider())
+    # grow while throughput improves.
+    assert scaler.decide(_sample(1)) == 1
+    assert scaler.decide(_sample(2)) == 1
+    assert scaler.decide(_sample(3)) == 1
+    # throughput dropped: step back, and keep going down while that improves.
+    assert scaler.decide(_sample(2.5)) == -1
+    assert scaler.decide(_sample(3)) == -1
+    # flat throughput holds.
+    assert scaler.decide(_sample(3.05)) == 0
+    # latency rose without a throughput gain: reverse.
+    assert scaler.decide(_sample(3.05, latency=2)) == 1
+    # no demand holds, overload shrinks.
+    assert scaler.decide(_sample(10, waiting=0)) == 0
+    assert scaler.decide(_sample(10, error_rate=0.5)) == -1
+    assert scaler.decide(_sample(10, cpu=99)) == -1
+
+
+@requires_chromium
+@pytest.mark.asyncio
+async def test_scale():
+    spider = Spider()
+    await spider.add_browser(launch_options={'headless': True, 'args': ['--no-sandbox']})
+    scaler = Autoscaler(spider, max_pages=2, max_browsers=1)
+    try:
+        assert await scaler.scale(1)
+        assert scaler.pages_per_browser == 2 and len(spider.pages) == 2
+        # at max pages and browsers.
+        assert not await scaler.scale(1)
+        assert await scaler.scale(-1)
+        assert scaler.pages_per_browser == 1 and len(spider.pages) == 1
+        assert not await scaler.scale(-1)
+    finally:
+        await spider.shutdown()
@@ -0,0 +1,49 @@
+from benchmarks.site import SyntheticSite, PAGE_KINDS
+from benchmarks.spider_bench import percentile
+from distbot.utils import error_regs
+import requests
+import pytest
+
+
+@pytest.fixture(scope='module')
+def site():
+    with SyntheticSite() as site:
+        yield site
+
+
+@pytest.mark.parametrize('kind', [k for k in PAGE_KINDS if k != 'hang'])
+def test_page_kinds(site, kind):
+    resp = requests.get(site.url(kind, 1, delay=0.1), timeout=5)
+    assert resp.status_code == 200
+    assert f"{kind} page 1" in resp.text
+
+
+def test_captcha_text(site):
+    text = requests.get(site.url('captcha'), timeout=5).text
+    assert any(r.search(text) for r in error_regs)
+
+
+def test_hang(site):
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        requests.get(site.url('hang'), timeout=0.5)
+
+
+def test_stall(site):
+    site.stall()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        requests.get(site.url('fast'), timeout=0.5)
+    site.stall(False)
+    assert requests.get(site.url('fast'), timeout=5).status_code == 200
+
+
+def test_urls(site):
+    urls = site.urls(['fast', 'heavy'], 4, {'heavy': {'assets': 3}})
+    assert len(urls) == 4
+    assert urls[1].endswith('/heavy/1?assets=3')
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 90) == 3.0
@@ -0,0 +1,82 @@
+from distbot.cache import ResponseCache, freshness_lifetime
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import asyncio
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({}, 60) == 60
+    assert freshness_lifetime({'Cache-Control': 'public, max-age=10'}, 60) == 10
+    assert freshness_lifetime({'cache-control': 'max-age=600'}, 60) == 60
+    assert freshness_lifetime({'cache-control': 'no-cache'}, 60) == 0
+    assert freshness_lifetime({'cache-control': 'private, no-store'}, 60) is None
+
+
+def test_put_get_evict(tmp_path):
+    cache = ResponseCache(tmp_path / 'cache.db', ttl=60)
+    assert cache.put('http://A.com/page?utm_source=x#top', 200, {'etag': '"v1"'}, {'title': 'A'},
+                     final_url='http://a.com/page/')
+    assert not cache.put('http://a.com/private', 200, {'cache-control': 'no-store'}, {})
+    cache.put('http://a.com/stale', 200, {'cache-control': 'no-cache'}, [1, 2])
+    cache.close()
+
+    cache = ResponseCache(tmp_path / 'cache.db', ttl=60, max_entries=2)
+    assert len(cache) == 2
+    entry = cache.get('http://a.com/page')
+    assert entry['output'] == {'title': 'A'} and entry['etag'] == '"v1"' and entry['final_url'] == 'http://a.com/page/'
+    assert cache.fresh(entry)
+    assert not cache.fresh(cache.get('http://a.com/stale'))
+    assert cache.get('http://a.com/private') is None
+    # least recently used entry is evicted.
+    cache.get('http://a.com/page')
+    cache.put('http://b.com/', 200, {}, 'b')
+    assert cache.get('http://a.com/stale') is None
+    assert len(cache) == 2
+    cache.max_bytes = 8
+    cache.put('http://c.com/', 200, {}, 'c')
+    assert len(cache) == 1 and cache.get('http://c.com/')['output'] == 'c'
+
+
+def test_cache_key():
+    cache = ResponseCache()
+    cache.put('http://a.com/', 200, {}, 'title', key='title')
+    cache.put('http://a.com/', 200, {}, ['link'], key='links')
+    assert cache.get('http://a.com/', 'title')['output'] == 'title'
+    assert cache.get('http://a.com/', 'links')['output'] == ['link']
+    assert cache.get('http://a.com/') is None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('Cache-Control', 'max-age=30')
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header('ETag', '"v2"')
+            self.end_headers()
+            self.wfile.write(b'changed')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_revalidate():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{httpd.server_port}/'
+    try:
+        cache = ResponseCache(ttl=60)
+        cache.put(url, 200, {'ETag': '"v1"', 'Cache-Control': 'no-cache'}, 'same')
+        cache.put(url + 'changed', 200, {'ETag': '"v0"', 'Cache-Control': 'no-cache'}, 'old')
+        cache.put(url + 'no-validator', 200, {'Cache-Control': 'no-cache'}, 'old')
+        entry = cache.get(url)
+        assert asyncio.run(cache.revalidate(entry))
+        assert cache.fresh(cache.get(url))
+        assert cache.get(url)['expires'] - entry['expires'] < 1
+        assert not asyncio.run(cache.revalidate(cache.get(url + 'changed')))
+        assert not asyncio.run(cache.revalidate(cache.get(url + 'no-validator')))
+    finally:
+        httpd.shutdown()
@@ -0,0 +1,59 @@
+from distbot.cdp import CDPDispatcher, continue_request, respond_request
+from types import SimpleNamespace
+import asyncio
+import base64
+import pytest
+
+
+class Session:
+    """Records sent commands. Results are resolved by the test."""
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, method, params=None):
+        fut = asyncio.get_running_loop().create_future()
+        self.sent.append((method, params, fut))
+        return fut
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_bounds_outstanding():
+    dispatcher = CDPDispatcher(max_outstanding=2)
+    session = Session()
+    results = [dispatcher.send(session, 'M', {'i': i}) for i in range(5)]
+    assert [p['i'] for _, p, _ in session.sent] == [0, 1]
+    assert dispatcher.metrics()['queued'] == 3 and dispatcher.metrics()['outstanding'] == 2
+    # a caller that stops waiting gives up its place in the queue.
+    results[2].cancel()
+    session.sent[0][2].set_result({'ok': 0})
+    session.sent[1][2].set_exception(RuntimeError('closed'))
+    assert await results[0] == {'ok': 0}
+    with pytest.raises(RuntimeError):
+        await results[1]
+    await asyncio.sleep(0)
+    assert [p['i'] for _, p, _ in session.sent] == [0, 1, 3, 4]
+    for _, _, fut in session.sent[2:]:
+        fut.set_result(None)
+    await asyncio.gather(*results[3:])
+    metrics = dispatcher.metrics()
+    assert metrics['queued'] == 0 and metrics['outstanding'] == 0
+    assert metrics['sent'] == 4 and metrics['peak_queued'] == 3
+
+
+@pytest.mark.asyncio
+async def test_inline_interception():
+    dispatcher = CDPDispatcher()
+    session = Session()
+    request = SimpleNamespace(_client=session, _interceptionId='1', _interceptionHandled=False, url='http://a.com/')
+    respond_request(dispatcher, request, {'status': 404, 'headers': {'Content-Type': 'text/plain'}, 'body': 'gone'})
+    # a request is only handled once.
+    continue_request(dispatcher, request)
+    assert len(session.sent) == 1
+    method, params, fut = session.sent[0]
+    assert method == 'Network.continueInterceptedRequest' and params['interceptionId'] == '1'
+    assert base64.b64decode(params['rawResponse']) == \
+        b'HTTP/1.1 404 Not Found\r\ncontent-type: text/plain\r\ncontent-length: 4\r\n\r\ngone'
+    # errors of commands nobody waits for are logged, not raised.
+    fut.set_exception(RuntimeError('closed'))
+    await asyncio.sleep(0)
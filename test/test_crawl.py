@@ -0,0 +1,57 @@
+from distbot.crawl import normalize_url, CrawlScope, BloomFilter, SeenSet, Crawler
+from distbot.spider import Spider
+import pytest
+
+
+@pytest.mark.parametrize('url,expected', [
+    ('HTTP://Example.COM', 'http://example.com/'),
+    ('https://example.com:443/a/./b/../c?b=2&a=1#frag', 'https://example.com/a/c?a=1&b=2'),
+    ('http://example.com:8080/x/?utm_source=foo&id=3', 'http://example.com:8080/x/?id=3'),
+    ('mailto:someone@example.com', None),
+    ('javascript:void(0)', None),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_scope():
+    scope = CrawlScope(domains=['example.com'], max_depth=2,
+                       allow=[r'/products/'], deny=[r'\.pdf$'])
+    assert scope.in_scope('https://shop.example.com/products/1', 1)
+    assert not scope.in_scope('https://example.com/products/1', 3)
+    assert not scope.in_scope('https://notexample.com/products/1')
+    assert not scope.in_scope('https://example.com/about')
+    assert not scope.in_scope('https://example.com/products/manual.pdf')
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f'http://example.com/{i}')
+    assert all(f'http://example.com/{i}' in bloom for i in range(10_000))
+    false_positives = sum(f'http://other.com/{i}' in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_seen_set(tmp_path):
+    path = tmp_path.joinpath('seen.db')
+    seen = SeenSet(path, capacity=1_000)
+    assert seen.add('http://example.com/')
+    assert not seen.add('http://example.com/')
+    assert 'http://example.com/' in seen
+    assert 'http://example.com/other' not in seen
+    seen.close()
+    # seen URLs persist between runs.
+    seen = SeenSet(path, capacity=1_000)
+    assert not seen.add('http://example.com/')
+    assert len(seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_temporary_seen_set():
+    crawler = Crawler(Spider())
+    path = crawler.seen.path
+    assert path.exists()
+    # the crawl has no pages to fetch, and the temporary database is removed when it finishes.
+    assert await crawler.run([]) == 0
+    assert not path.parent.exists()
@@ -0,0 +1,28 @@
+from distbot.dedupe import simhash, hamming_distance, url_pattern, DuplicateIndex
+
+text = ' '.join(f'word{i} filler text about products and prices' for i in range(200))
+
+
+def test_simhash():
+    near = text.replace('word150 ', 'changed ')
+    assert hamming_distance(simhash(text), simhash(near)) <= 3
+    other = ' '.join(f'entirely different page number {i} content' for i in range(200))
+    assert hamming_distance(simhash(text), simhash(other)) > 10
+
+
+def test_url_pattern():
+    assert url_pattern('https://example.com/item/12345?session=abc&ref=1') == \
+        'example.com/item/{id}?ref&session'
+    assert url_pattern('https://example.com/page2') == 'example.com/page{n}'
+
+
+def test_duplicate_index():
+    index = DuplicateIndex(min_pattern_samples=2)
+    fp = simhash(text)
+    assert index.check('https://example.com/a/1', fp) is None
+    assert index.check('https://example.com/a/2', fp ^ 0b101) == 'https://example.com/a/1'
+    assert index.check('https://example.com/b', simhash('something else entirely')) is None
+    assert index.duplicates == 1
+    assert index.penalty('https://example.com/a/3') == 0.5
+    # not enough samples.
+    assert index.penalty('https://example.com/b') == 0
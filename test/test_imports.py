@@ -0,0 +1,20 @@
+from pathlib import Path
+import subprocess
+import sys
+import os
+
+_check = """
+import sys, os
+import distbot.spider, distbot.crawl
+print(sorted(m for m in ('pyppeteer', 'requests', 'html_text', 'websockets') if m in sys.modules))
+print(os.path.exists('distbot_logs'))
+"""
+
+
+def test_lazy_imports(tmp_path):
+    root = Path(__file__).resolve().parents[1]
+    proc = subprocess.run([sys.executable, '-c', _check], cwd=tmp_path, capture_output=True, text=True, check=True,
+                          env={**os.environ, 'PYTHONPATH': str(root)})
+    heavy_modules, log_dir_created = proc.stdout.splitlines()
+    assert heavy_modules == '[]'
+    assert log_dir_created == 'False'
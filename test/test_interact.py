@@ -0,0 +1,108 @@
+from distbot.interact import hover_all, explore_selects_parallel, click_js_link, expand_js_links
+from distbot.utils import expand_js_links as expand_page_js_links
+from distbot.spider import Spider
+from benchmarks.site import SyntheticSite
+from conftest import requires_chromium
+import asyncio
+import pyppeteer.launcher
+import pytest
+import pytest_asyncio
+
+pytestmark = pytest.mark.asyncio
+
+# a menu shown only by CSS :hover, and one shown by a mouseover listener.
+MENUS = """<style>.css ul {display: none} .css:hover > ul {display: block}</style>
+<ul>
+  <li class="css">CSS menu<ul><li>CSS item</li></ul></li>
+  <li id="js" onmouseover="this.querySelector('ul').style.display = 'block'">JS menu
+    <ul style="display: none"><li>JS item</li></ul></li>
+</ul>"""
+
+
+class FailingSpider:
+    async def get(self, url, **kwargs):
+        return None
+
+
+@pytest_asyncio.fixture
+async def spider():
+    spider = Spider()
+    try:
+        yield spider
+    finally:
+        await spider.shutdown()
+
+
+@pytest.fixture(scope='module')
+def site():
+    with SyntheticSite() as site:
+        yield site
+
+
+@pytest_asyncio.fixture
+async def page():
+    browser = await pyppeteer.launcher.launch({'headless': True, 'args': ['--no-sandbox']})
+    try:
+        yield await browser.newPage()
+    finally:
+        await browser.close()
+
+
+async def test_explore_selects_parallel_get_failed():
+    assert await explore_selects_parallel(FailingSpider(), 'http://example.com') == []
+
+
+async def test_expand_js_links_get_failed():
+    assert await expand_js_links(FailingSpider(), 'http://example.com') == {}
+
+
+@requires_chromium
+async def test_hover_all(page):
+    await page.setContent(MENUS)
+    assert await hover_all(page, '//li[@class="css"] | //li[@id="js"]', idle_time=0.1) == 2
+    assert await page.evaluate("() => getComputedStyle(document.querySelector('#js > ul')).display") == 'block'
+    # the CSS menu was hovered with mouse input.
+    await hover_all(page, '//li[@class="css"]', idle_time=0.1)
+    assert await page.evaluate("() => getComputedStyle(document.querySelector('.css > ul')).display") == 'block'
+
+
+def _pending_navigation_waits():
+    return [t for t in asyncio.all_tasks() if 'waitForNavigation' in repr(t.get_coro())]
+
+
+@requires_chromium
+async def test_click_js_link(page, site):
+    await page.goto(site.url('jslinks'))
+    assert await click_js_link(page, 0, idle_time=0.1) == (True, None)
+    assert page.url == site.url('fast', 1)
+    await page.goto(site.url('jslinks'))
+    navigated, fp = await click_js_link(page, 1, idle_time=0.1)
+    assert not navigated and fp
+    assert await page.evaluate("() => document.getElementById('out').textContent") == 'clicked'
+    # no element at this index.
+    assert await click_js_link(page, 10) == (False, None)
+    await asyncio.sleep(0)
+    assert not _pending_navigation_waits()
+
+
+@requires_chromium
+async def test_expand_js_links(spider, site):
+    await spider.add_browser(pages=2, launch_options={'headless': True, 'args': ['--no-sandbox']})
+    found = await expand_js_links(spider, site.url('jslinks'), idle_time=0.1)
+    assert set(found) == {site.url('fast', 1), site.url('jslinks')}
+    assert 'clicked' in found[site.url('jslinks')][0]
+    # every page was returned.
+    assert spider.idle_page_q.qsize() == 2
+
+
+@requires_chromium
+async def test_expand_page_js_links(spider, site):
+    # the caller holds the only page, which is used for all clicks.
+    await spider.add_browser(launch_options={'headless': True, 'args': ['--no-sandbox']})
+    resp, page = await spider.get(site.url('jslinks'))
+    found = await asyncio.wait_for(expand_page_js_links(spider, page), timeout=60)
+    assert set(found) == {site.url('fast', 1), site.url('jslinks')}
+    # the page is back at its URL and still held by the caller.
+    assert page.url == site.url('jslinks')
+    assert spider.idle_page_q.empty()
+    await spider.set_idle(page)
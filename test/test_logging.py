@@ -0,0 +1,54 @@
+from distbot.utils import get_logger, stop_logging, JSONFormatter, RateLimitFilter, SamplingFilter
+import logging
+import json
+
+
+def make_record(message='msg', level=logging.WARNING, **fields):
+    record = logging.LogRecord('test', level, __file__, 1, message, None, None)
+    record.__dict__.update(fields)
+    return record
+
+
+def test_json_formatter():
+    entry = json.loads(JSONFormatter().format(make_record(
+        'done', event='navigate', url='http://a.com', status=200, latency=0.5, other='ignored')))
+    assert entry['message'] == 'done'
+    assert {k: entry[k] for k in ('event', 'url', 'status', 'latency')} == {
+        'event': 'navigate', 'url': 'http://a.com', 'status': 200, 'latency': 0.5}
+    assert 'other' not in entry
+
+
+def test_sampling_filter():
+    f = SamplingFilter({'navigate': 0.1, 'never': 0})
+    kept = sum(f.filter(make_record(event='navigate')) for _ in range(10_000))
+    assert 700 < kept < 1300
+    assert not any(f.filter(make_record(event='never')) for _ in range(100))
+    assert all(f.filter(make_record()) for _ in range(100))
+
+
+def test_rate_limit_filter():
+    f = RateLimitFilter(per_second=0.001, burst=3)
+    results = [f.filter(make_record(event='retry')) for _ in range(10)]
+    assert results == [True] * 3 + [False] * 7
+    # other events and lower levels have their own limits.
+    assert f.filter(make_record(event='crash'))
+    assert f.filter(make_record(event='retry', level=logging.INFO))
+    f.buckets['retry'][0] = 1
+    record = make_record(event='retry')
+    assert f.filter(record) and record.suppressed == 7
+
+
+def test_background_structured_logger(tmp_path):
+    path = tmp_path / 'logs' / 'test.log'
+    logger = get_logger('distbot_test', log_save_path=path, background=True, structured=True,
+                        sample_rates={'noisy': 0})
+    for i in range(100):
+        logger.info("page %s", i, extra={'event': 'navigate', 'page': i})
+        logger.info("noisy", extra={'event': 'noisy'})
+    stop_logging()
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e['page'] for e in entries] == list(range(100))
+    assert entries[5]['message'] == 'page 5'
+    # reconfiguring replaces handlers instead of adding more.
+    logger = get_logger('distbot_test')
+    assert len(logger.handlers) == 1 and not logger.filters
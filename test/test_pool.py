@@ -0,0 +1,23 @@
+from distbot.pool import profile_key, reap_zombies
+import subprocess
+import time
+import os
+
+
+def test_profile_key_ignores_spider_options():
+    assert profile_key({'headless': True, 'pages': 4, 'screenshot': True}) == profile_key({'headless': True})
+    assert profile_key({'headless': True}) != profile_key({'headless': False})
+    assert profile_key({'args': ['--a'], 'headless': True}) == profile_key({'headless': True, 'args': ['--a']})
+
+
+def test_reap_zombies():
+    browser = subprocess.Popen(['true'])
+    other = subprocess.Popen(['true'])
+    processes = {browser}
+    # let the children exit without reaping them.
+    time.sleep(0.2)
+    assert reap_zombies(processes) == 1
+    assert not processes
+    assert reap_zombies(processes) == 0
+    # children the pool didn't launch are left alone.
+    assert os.waitpid(other.pid, os.WNOHANG)[0] == other.pid
@@ -0,0 +1,33 @@
+from benchmarks.faults import run_fault_benchmark, throughput, RecoveryRecorder, FAULTS
+from benchmarks.site import SyntheticSite
+from conftest import requires_chromium
+import pytest
+
+launch_options = {'headless': True, 'args': ['--no-sandbox'],
+                  'defaultNavigationTimeout': 3_000}
+
+
+def test_throughput():
+    assert throughput([0.5, 1.5, 2.5, 3.5], 1, 3) == 1
+    assert throughput([1, 2], 2, 2) == 0
+
+
+def test_time_to_recover():
+    recorder = RecoveryRecorder()
+    recorder.completions = [(1, 'a'), (2, 'b'), (6, 'a'), (8, 'c')]
+    recorder.fault_start, recorder.fault_end = 3, 4
+    recorder.browsers_at_fault = {'a', 'b'}
+    assert recorder.time_to_recover(new_browser=True) == 5
+    assert recorder.time_to_recover(new_browser=False) == 3
+
+
+@requires_chromium
+@pytest.mark.asyncio
+@pytest.mark.parametrize('fault', FAULTS)
+async def test_fault_recovery(fault):
+    with SyntheticSite() as site:
+        urls = site.urls(['slow'], 60, {'slow': {'delay': 0.2}})
+        result = await run_fault_benchmark(urls, fault, site, fault_after=1, browsers=2,
+                                           pages=2, launch_options=launch_options)
+    assert result['lost_urls'] == 0
+    assert result['time_to_recover_s'] is not None
@@ -0,0 +1,119 @@
+from distbot.spider import Spider
+from benchmarks.site import SyntheticSite
+from conftest import requires_chromium
+from datetime import datetime, timedelta
+import asyncio
+import pytest
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+
+def _add_fake_browser(spider, launch_options=None, pages=2):
+    browser = object()
+    spider.browsers[browser] = {'id': len(spider.browsers), 'page_count': pages, 'server': None,
+                                'launch_options': launch_options or {}, 'launch_time': datetime.now(),
+                                'draining': False, 'lock': asyncio.Lock(), 'navigations': 0}
+    for _ in range(pages):
+        page = FakePage(browser)
+        spider.pages[page] = {'is_idle': True}
+        spider.idle_page_q.put_nowait(page)
+    return browser
+
+
+@pytest.mark.asyncio
+async def test_recycle_browser():
+    spider = Spider()
+    browser = _add_fake_browser(spider)
+    busy = spider.idle_page_q.get_nowait()
+    spider.pages[busy]['is_idle'] = False
+    launched, closed = [], []
+
+    async def add_replacement(browser_data):
+        launched.append(browser_data['id'])
+
+    async def shutdown_browser(b):
+        closed.append(b)
+        del spider.browsers[b]
+
+    spider._add_replacement_browser = add_replacement
+    spider._shutdown_browser = shutdown_browser
+    task = asyncio.create_task(spider.recycle_browser(browser))
+    await asyncio.sleep(0.1)
+    # the replacement is launched right away, but the browser waits for its busy page.
+    assert launched == [0] and not closed
+    assert spider.browsers[browser]['draining']
+    spider.pages[busy]['is_idle'] = True
+    assert await task
+    assert closed == [browser]
+
+
+@pytest.mark.asyncio
+async def test_recycle_browser_replacement_error():
+    spider = Spider()
+    browser = _add_fake_browser(spider)
+    busy = spider.idle_page_q.get_nowait()
+    # a page set idle while the browser was draining, so it is not queued.
+    idle = spider.idle_page_q.get_nowait()
+
+    async def add_replacement(browser_data):
+        raise RuntimeError('no capacity')
+
+    spider._add_replacement_browser = add_replacement
+    spider.pages[busy]['is_idle'] = False
+    assert not await spider.recycle_browser(browser)
+    # the browser keeps serving pages.
+    assert not spider.browsers[browser]['draining']
+    assert list(spider.idle_page_q._queue) == [idle]
+
+
+@pytest.mark.asyncio
+async def test_check_recycle_status():
+    spider = Spider()
+    old = _add_fake_browser(spider, {'maxBrowserAge': 60})
+    spider.browsers[old]['launch_time'] = datetime.now() - timedelta(seconds=61)
+    young = _add_fake_browser(spider, {'maxBrowserAge': 60})
+    big = _add_fake_browser(spider, {'maxBrowserMemory': 100})
+    recycled = []
+
+    async def recycle_browser(browser):
+        recycled.append(browser)
+        return True
+
+    async def browser_memory(browser):
+        return 200e6
+
+    spider.recycle_browser = recycle_browser
+    spider._browser_memory = browser_memory
+    for browser in (old, young, big):
+        await spider._check_recycle_status(browser, interval=0)
+    assert recycled == [old, big]
+    # browsers that are within their limits are checked again.
+    assert len(spider.tasks) == 1
+    for task in spider.tasks:
+        task.cancel()
+
+
+@requires_chromium
+@pytest.mark.asyncio
+async def test_max_navigations():
+    spider = Spider()
+    first = await spider.add_browser(launch_options={'headless': True, 'args': ['--no-sandbox'],
+                                                     'maxNavigations': 2})
+    try:
+        with SyntheticSite() as site:
+            for i in range(3):
+                resp, page = await spider.get(site.url('fast', i))
+                assert resp.ok
+                await spider.set_idle(page)
+            # wait for the recycled browser to close.
+            for _ in range(20):
+                if first not in spider.browsers:
+                    break
+                await asyncio.sleep(0.5)
+            assert first not in spider.browsers
+            assert len(spider.browsers) == 1
+    finally:
+        await spider.shutdown()
@@ -0,0 +1,61 @@
+from distbot.relay import RelayClient, serve_relay
+import pytest
+import pytest_asyncio
+import websockets
+import json
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def servers():
+    """Fake DevTools endpoint that echoes messages, and a relay server that only allows that endpoint."""
+    async def echo(ws, path=None):
+        async for message in ws:
+            if message == 'close':
+                return await ws.close()
+            await ws.send(json.dumps({'path': ws.path, 'echo': message}))
+
+    browser = await websockets.serve(echo, '127.0.0.1', 0)
+    endpoint = f"ws://127.0.0.1:{browser.sockets[0].getsockname()[1]}/devtools/browser/1"
+    relay = await websockets.serve(lambda ws, path=None: serve_relay(ws, allowed=lambda e: e.startswith(endpoint[:-1])),
+                                   '127.0.0.1', 0)
+    yield f"ws://127.0.0.1:{relay.sockets[0].getsockname()[1]}", endpoint
+    relay.close()
+    browser.close()
+
+
+async def test_multiplexed_channels(servers):
+    relay_url, endpoint = servers
+    client = RelayClient(relay_url)
+    first = await client.open_channel(endpoint)
+    second = await client.open_channel(endpoint[:-1] + '2')
+    message = json.dumps({'id': 1, 'method': 'Page.getContent', 'params': {}})
+    for _ in range(20):
+        await first.send(message)
+        await second.send(message)
+    for _ in range(20):
+        assert json.loads(await first.recv()) == {'path': '/devtools/browser/1', 'echo': message}
+        assert json.loads(await second.recv()) == {'path': '/devtools/browser/2', 'echo': message}
+    # repeated messages compress across the shared stream.
+    assert client.codec.wire_bytes < client.codec.raw_bytes / 4
+    await client.close()
+
+
+async def test_channel_close(servers):
+    relay_url, endpoint = servers
+    client = RelayClient(relay_url)
+    with pytest.raises(ConnectionError):
+        await client.open_channel('ws://127.0.0.1:1/devtools/browser/other')
+    channel = await client.open_channel(endpoint)
+    # browser closes its connection.
+    await channel.send('close')
+    with pytest.raises(websockets.ConnectionClosed):
+        await channel.recv()
+    assert not channel.open
+    # other channels still work.
+    channel = await client.open_channel(endpoint)
+    await channel.send('ping')
+    assert json.loads(await channel.recv())['echo'] == 'ping'
+    await channel.close()
+    await client.close()
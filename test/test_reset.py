@@ -0,0 +1,96 @@
+from distbot.spider import Spider
+from distbot.cdp import CDPDispatcher
+from benchmarks.site import SyntheticSite
+from conftest import requires_chromium
+import asyncio
+import pytest
+
+
+class Session:
+    """Records sent commands and resolves them right away."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def send(self, method, params=None):
+        self.events.append((method, params))
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result({})
+        return fut
+
+
+class FakePage:
+    def __init__(self, browser, url):
+        self.browser = browser
+        self.url = url
+        self.events = []
+        self._client = Session(self.events)
+
+    async def waitForNavigation(self, timeout=None):
+        self.events.append('wait')
+        await asyncio.sleep(0.05)
+        self.url = 'about:blank'
+        self.events.append('navigated')
+
+
+@pytest.mark.asyncio
+async def test_reset_page():
+    spider = Spider()
+    browser = object()
+    spider.browsers[browser] = {'cdp': CDPDispatcher(), 'launch_options': {
+        'resetPageOnIdle': True, 'resetPageGC': True, 'resetPageStorage': True}}
+    page = FakePage(browser, 'https://a.com/page')
+    spider.pages[page] = {'id': 0}
+    await spider._reset_page(page)
+    # the navigation is awaited before the origin's storage is cleared.
+    assert page.events == [
+        'wait', ('Page.navigate', {'url': 'about:blank'}), 'navigated',
+        ('Storage.clearDataForOrigin', {
+            'origin': 'https://a.com',
+            'storageTypes': 'local_storage,indexeddb,websql,cache_storage,service_workers,file_systems'}),
+        ('HeapProfiler.collectGarbage', None)]
+    assert page.url == 'about:blank'
+    assert spider.stats['resets'] == 1 and spider.stats['reset_time'] > 0
+
+
+@pytest.mark.asyncio
+async def test_reset_closed_page():
+    spider = Spider()
+    browser = object()
+    spider.browsers[browser] = {'cdp': CDPDispatcher(), 'launch_options': {'resetPageOnIdle': True}}
+    page = FakePage(browser, 'https://a.com/page')
+
+    async def closed(timeout=None):
+        raise ConnectionError('page closed')
+
+    # the page is no longer tracked when its reset fails.
+    page.waitForNavigation = closed
+    await spider._reset_page(page)
+    assert spider.stats['resets'] == 1
+
+
+@requires_chromium
+@pytest.mark.asyncio
+async def test_reset_page_on_idle():
+    spider = Spider()
+    await spider.add_browser(launch_options={'headless': True, 'args': ['--no-sandbox'], 'resetPageOnIdle': True,
+                                             'resetPageGC': True, 'resetPageStorage': True})
+    try:
+        with SyntheticSite() as site:
+            resp, page = await spider.get(site.url('scroll'))
+            await page.evaluate("() => localStorage.setItem('a', '1')")
+            await spider.set_idle(page)
+            # the page is reset in the background, and queued once it's done.
+            for _ in range(50):
+                if spider.pages[page]['is_idle']:
+                    break
+                await asyncio.sleep(0.1)
+            assert page.url == 'about:blank'
+            assert spider.stats['resets'] == 1
+            # the next navigation works normally, and origin storage was cleared.
+            resp, page = await spider.get(site.url('fast'))
+            assert resp.ok
+            assert await page.evaluate("() => localStorage.getItem('a')") is None
+            await spider.set_idle(page)
+    finally:
+        await spider.shutdown()
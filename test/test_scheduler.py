@@ -0,0 +1,91 @@
+from distbot.scheduler import PageScheduler
+import pytest
+import asyncio
+
+pytestmark = pytest.mark.asyncio
+
+
+async def wait_order(scheduler, requests):
+    """Start acquire for each (name, priority) and return names in the order pages were acquired."""
+    order = []
+
+    async def acquire(name, priority):
+        await scheduler.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(acquire(*r)) for r in requests]
+    await asyncio.sleep(0)
+    for i in range(len(requests)):
+        scheduler.idle_page_q.put_nowait(f'page{i}')
+        scheduler.dispatch()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return order
+
+
+async def test_priority_order():
+    scheduler = PageScheduler(asyncio.Queue())
+    order = await wait_order(scheduler, [('low', 5), ('high', 0), ('mid', 1), ('mid2', 1)])
+    assert order == ['high', 'mid', 'mid2', 'low']
+
+
+async def test_aging():
+    scheduler = PageScheduler(asyncio.Queue(), aging=100)
+    old = asyncio.create_task(scheduler.acquire(5))
+    await asyncio.sleep(0.1)
+    new = asyncio.create_task(scheduler.acquire(0))
+    await asyncio.sleep(0)
+    scheduler.idle_page_q.put_nowait('page')
+    scheduler.dispatch()
+    # the old request has waited long enough to overtake the new one.
+    assert await old == 'page'
+    new.cancel()
+
+
+async def test_deadline():
+    scheduler = PageScheduler(asyncio.Queue())
+    with pytest.raises(asyncio.TimeoutError):
+        await scheduler.acquire(0, deadline=0.05)
+    assert scheduler.qsize() == 0
+    scheduler.idle_page_q.put_nowait('page')
+    assert await scheduler.acquire(0, deadline=0.05) == 'page'
+
+
+async def test_max_outstanding():
+    scheduler = PageScheduler(asyncio.Queue(), max_outstanding={0: 1})
+    for page in ('page1', 'page2'):
+        scheduler.idle_page_q.put_nowait(page)
+    assert await scheduler.acquire(0) == 'page1'
+    second = asyncio.create_task(scheduler.acquire(0))
+    other = asyncio.create_task(scheduler.acquire(1))
+    await asyncio.sleep(0)
+    # priority 0 is at its limit, so the lower priority request gets the page.
+    assert await other == 'page2'
+    assert not second.done()
+    scheduler.idle_page_q.put_nowait('page1')
+    scheduler.release(0)
+    assert await second == 'page1'
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def isClosed(self):
+        return False
+
+
+async def test_deadline_skipping_draining_pages():
+    from distbot.spider import Spider
+    spider = Spider()
+    browser = object()
+    spider.browsers[browser] = {'draining': True, 'launch_options': {}}
+    page = FakePage(browser)
+    spider.pages[page] = {'is_idle': True}
+    spider.idle_page_q.put_nowait(page)
+    # the draining browser's page is skipped, and the next wait is limited to what's left of the deadline.
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(spider._get_idle_page(deadline=0.2), timeout=2)
+    assert loop.time() - start < 1
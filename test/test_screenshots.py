@@ -0,0 +1,72 @@
+from distbot.screenshots import ScreenshotWriter
+import pytest
+import asyncio
+import base64
+
+pytestmark = pytest.mark.asyncio
+
+data = base64.b64encode(b'x' * 100).decode()
+
+
+async def test_retention_by_count(tmp_path):
+    writer = ScreenshotWriter(tmp_path, max_files=2)
+    for i in range(5):
+        writer.put(f'http://example.com/{i}', 'page', data)
+    await writer.close()
+    assert len(list(tmp_path.glob('*.jpeg'))) == 2
+    # index records every screenshot that was taken.
+    lines = tmp_path.joinpath('index.tsv').read_text().splitlines()
+    assert [l.split('\t')[1] for l in lines] == [
+        f'http://example.com/{i}' for i in range(5)]
+
+
+async def test_retention_by_size(tmp_path):
+    writer = ScreenshotWriter(tmp_path, max_bytes=250)
+    for i in range(4):
+        writer.put(f'http://example.com/{i}', 'page', data, 'png')
+    await writer.close()
+    assert len(list(tmp_path.glob('*.png'))) == 2
+    assert writer.total_bytes == 200
+
+
+async def test_full_queue(tmp_path):
+    writer = ScreenshotWriter(tmp_path, queue_size=1)
+    assert writer.put('http://example.com/1', 'page', data)
+    assert not writer.put('http://example.com/2', 'page', data)
+    await writer.close()
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+
+async def test_set_idle_does_not_wait_for_screenshot():
+    from distbot.spider import Spider
+    spider = Spider()
+    browser = object()
+    spider.browsers[browser] = {'launch_options': {'screenshot': True}, 'draining': False}
+    page = FakePage(browser)
+    spider.pages[page] = {'is_idle': False, 'screenshot_pending': True}
+    captured = asyncio.Event()
+
+    async def take_screenshot(page):
+        spider.pages[page]['screenshot_pending'] = False
+        await captured.wait()
+
+    spider._take_screenshot = take_screenshot
+    await asyncio.wait_for(spider.set_idle(page), timeout=1)
+    # the page is queued once the screenshot has been taken.
+    assert spider.idle_page_q.empty() and not spider.pages[page]['is_idle']
+    captured.set()
+    assert await asyncio.wait_for(spider.idle_page_q.get(), timeout=1) is page
+    assert spider.pages[page]['is_idle'] and 'requeue' not in spider.pages[page]
+
+
+async def test_prepare_idle_closed_page():
+    from distbot.spider import Spider
+    spider = Spider()
+    page = FakePage(object())
+    # the page was closed before it could be prepared. it is not queued.
+    await spider._prepare_idle(page)
+    assert spider.idle_page_q.empty()
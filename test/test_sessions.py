@@ -0,0 +1,42 @@
+from distbot.sessions import SessionStore, site
+
+import time
+
+
+def test_site():
+    assert site('www.example.com') == 'example.com'
+    assert site('.Example.com') == 'example.com'
+    assert site('localhost') == 'localhost'
+    assert site('www.example.co.uk') == 'example.co.uk'
+    assert site('shop.example.com.au') == 'example.com.au'
+    assert site('example.co') == 'example.co'
+    assert site('192.168.1.1') == '192.168.1.1'
+    assert site('[::1]') == site('::1') == '::1'
+
+
+def test_save_and_cookies(tmp_path):
+    store = SessionStore(tmp_path / 'sessions.db')
+    store.save('a', [
+        {'name': 'sid', 'value': '1', 'domain': '.example.com', 'path': '/', 'expires': -1, 'size': 4,
+         'session': True},
+        {'name': 'pref', 'value': 'x', 'domain': 'www.example.com', 'path': '/', 'expires': time.time() + 60},
+        {'name': 'sid', 'value': '2', 'domain': 'other.org', 'path': '/', 'expires': -1}])
+    store.save('b', [{'name': 'sid', 'value': '3', 'domain': 'example.com', 'path': '/', 'expires': -1}])
+    store.close()
+
+    store = SessionStore(tmp_path / 'sessions.db')
+    cookies = store.cookies('a', 'https://shop.example.com/cart')
+    assert sorted(c['name'] for c in cookies) == ['pref', 'sid']
+    # session cookies are restored without expires, and fields setCookies doesn't accept are dropped.
+    sid = next(c for c in cookies if c['name'] == 'sid')
+    assert sid == {'name': 'sid', 'value': '1', 'domain': '.example.com', 'path': '/'}
+    assert len(store.cookies('a')) == 3
+    assert [c['value'] for c in store.cookies('b')] == ['3']
+
+    # newer values replace older ones, expired cookies are removed.
+    store.save('a', [{'name': 'sid', 'value': '4', 'domain': '.example.com', 'path': '/', 'expires': -1},
+                     {'name': 'pref', 'value': 'x', 'domain': 'www.example.com', 'path': '/', 'expires': 1}])
+    assert [c['value'] for c in store.cookies('a', 'http://example.com')] == ['4']
+    store.clear('a')
+    assert store.cookies('a') == []
+    assert len(store.cookies('b')) == 1
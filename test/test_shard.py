@@ -0,0 +1,51 @@
+from distbot.shard import ShardedSpider, split_browsers
+import pytest
+import signal
+import os
+
+
+async def handler(spider, url):
+    return url.upper()
+
+
+def test_split_browsers():
+    browsers = [{'pages': i} for i in range(5)]
+    assert split_browsers(browsers, 2) == [
+        [{'pages': 0}, {'pages': 2}, {'pages': 4}], [{'pages': 1}, {'pages': 3}]]
+
+
+def test_sharded_spider():
+    urls = [f'http://example.com/{i}' for i in range(50)]
+    # workers without browsers, so the handler doesn't need Chromium.
+    results = ShardedSpider([[], []], handler).run(urls)
+    assert sorted(results) == sorted((url, url.upper()) for url in urls)
+
+
+def test_sink():
+    received = []
+    ShardedSpider([[]], handler, sink=lambda url, result: received.append(result)).run(['a', 'b'])
+    assert sorted(received) == ['A', 'B']
+
+
+async def crashing_handler(spider, url):
+    if url == 'crash':
+        # simulate the worker being OOM killed.
+        os.kill(os.getpid(), signal.SIGKILL)
+    return url.upper()
+
+
+async def always_crashing_handler(spider, url):
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def test_dead_worker_restarted():
+    urls = [f'http://example.com/{i}' for i in range(20)]
+    results = ShardedSpider([[], []], crashing_handler).run(urls[:10] + ['crash'] + urls[10:])
+    # the crashed worker's URL, and up to two URLs it had read ahead, are lost. the rest are processed.
+    assert len(results) >= len(urls) - 2
+    assert set(results) <= {(url, url.upper()) for url in urls}
+
+
+def test_dead_worker_fails():
+    with pytest.raises(RuntimeError, match='shard 0'):
+        ShardedSpider([[]], always_crashing_handler, max_restarts=1).run(['a', 'b', 'c'])
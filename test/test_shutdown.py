@@ -0,0 +1,42 @@
+from distbot.spider import Spider
+import asyncio
+import pytest
+import os
+
+
+@pytest.mark.asyncio
+async def test_drain_saves_unfinished(tmp_path):
+    path = str(tmp_path / 'unfinished.jsonl')
+    spider = Spider(unfinished_path=path)
+    # no browsers, so requests wait for a page until shutdown.
+    gets = [asyncio.create_task(spider.get(f'http://a.com/{i}', priority=i, waitUntil='domcontentloaded'))
+            for i in range(3)]
+    spider_task = spider._create_task(asyncio.sleep(60))
+    user_task = asyncio.create_task(asyncio.sleep(60))
+    await asyncio.sleep(0.1)
+    assert len(spider.requests) == 3
+    await spider.shutdown(drain_timeout=1)
+    assert await asyncio.gather(*gets) == [None] * 3
+    assert not spider.requests
+    # Spider's tasks are cancelled, others are not.
+    assert spider_task.cancelled() and not user_task.done()
+    user_task.cancel()
+    # new requests are refused.
+    assert await spider.get('http://a.com/late') is None
+
+    spider = Spider(unfinished_path=path)
+    requests = spider.load_unfinished()
+    assert requests == [{'url': f'http://a.com/{i}', 'priority': i, 'kwargs': {'waitUntil': 'domcontentloaded'}}
+                        for i in range(3)]
+    # the file is kept until the next shutdown replaces it with the requests that are still unfinished.
+    assert spider.load_unfinished() == requests
+    gets = [asyncio.create_task(spider.get(r['url'], priority=r['priority'], **r['kwargs'])) for r in requests[:1]]
+    await asyncio.sleep(0.1)
+    await spider.shutdown(drain_timeout=0)
+    await asyncio.gather(*gets)
+    assert Spider(unfinished_path=path).load_unfinished() == requests[:1]
+    # nothing unfinished removes the file.
+    spider = Spider(unfinished_path=path)
+    spider.load_unfinished()
+    await spider.shutdown()
+    assert not os.path.exists(path)
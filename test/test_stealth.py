@@ -0,0 +1,53 @@
+from distbot.stealth import EVASIONS, select_evasions, stealth_script
+from types import SimpleNamespace
+import asyncio
+import pytest
+
+
+def test_select_evasions():
+    assert select_evasions({}) == EVASIONS
+    assert select_evasions({'stealth': False}) == ()
+    assert select_evasions({'stealth': ['navigator.webdriver', 'chrome.app']}) == (
+        'chrome.app', 'navigator.webdriver')
+    assert 'webgl.vendor' not in select_evasions(
+        {'stealthExclude': ['webgl.vendor']})
+    with pytest.raises(ValueError):
+        select_evasions({'stealth': ['navigator.unknown']})
+
+
+def test_stealth_script():
+    script = stealth_script(EVASIONS)
+    # cached.
+    assert stealth_script(EVASIONS) is script
+    # helpers are included once.
+    assert script.count('const utils = {') == 1
+    assert all(f"// {e} evasion" in script for e in EVASIONS)
+    assert stealth_script(()) == ''
+    assert 'const utils' not in stealth_script(('navigator.webdriver',))
+    assert len(stealth_script(('navigator.webdriver',))) < 500
+
+
+class Session:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, method, params=None):
+        self.sent.append((method, params))
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result({})
+        return fut
+
+
+@pytest.mark.asyncio
+async def test_scripts_added_separately():
+    from distbot.spider import Spider
+    from distbot.cdp import CDPDispatcher
+    spider = Spider()
+    browser = object()
+    page = SimpleNamespace(browser=browser, _client=Session())
+    spider.browsers[browser] = {'cdp': CDPDispatcher(), 'launch_options': {
+        'stealth': ['navigator.webdriver'], 'evaluateOnNewDocument': ['() => {', '() => { window.a = 1; }']}}
+    await spider._add_page_settings(page)
+    # a syntax error in one script can't stop the evasions or the other scripts.
+    assert [params['source'] for _, params in page._client.sent] == [
+        stealth_script(('navigator.webdriver',)), '(() => {)()', '(() => { window.a = 1; })()']
@@ -0,0 +1,23 @@
+from distbot.utils import scroll
+import pytest
+
+
+class FakePage:
+    url = 'http://example.com'
+
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, script, *args):
+        self.calls.append(args)
+        return 1000
+
+
+@pytest.mark.asyncio
+async def test_scroll_timeout_alias():
+    page = FakePage()
+    assert await scroll(page, max_duration=10) == 1000
+    with pytest.warns(DeprecationWarning):
+        assert await scroll(page, timeout=5) == 1000
+    # idle time, max height and max duration (milliseconds). timeout was the idle window.
+    assert page.calls == [(1000, 0, 10_000), (5_000, 0, 30_000)]
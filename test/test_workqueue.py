@@ -0,0 +1,87 @@
+from distbot.workqueue import WorkQueue
+from distbot.spider import Spider
+import pytest
+import time
+
+
+def test_lease_order_and_ack():
+    queue = WorkQueue()
+    queue.push(['http://a.com', 'http://b.com'], priority=1)
+    queue.push(['http://urgent.com'], priority=0)
+    leases = queue.lease('client1', count=2)
+    assert [l['url'] for l in leases] == ['http://urgent.com', 'http://a.com']
+    assert queue.ack(leases[0]['lease_id'], {'title': 'Urgent'})
+    assert queue.nack(leases[1]['lease_id'])
+    assert queue.stats() == {'queued': 2, 'leased': 0, 'done': 1, 'failed': 0}
+
+
+def test_lease_expiry_and_heartbeat():
+    queue = WorkQueue()
+    queue.push(['http://a.com', 'http://b.com'])
+    expiring, renewed = queue.lease('client1', count=2, lease_seconds=0.1)
+    assert queue.heartbeat([renewed['lease_id']], lease_seconds=60) == 1
+    time.sleep(0.2)
+    # the expired URL can be leased by another client.
+    assert [l['url'] for l in queue.lease('client2', count=2)] == [expiring['url']]
+    assert not queue.ack(expiring['lease_id'])
+
+
+def test_max_attempts():
+    queue = WorkQueue(max_attempts=2)
+    queue.push(['http://a.com'])
+    for _ in range(2):
+        queue.nack(queue.lease()[0]['lease_id'])
+    assert queue.stats()['failed'] == 1
+    assert queue.lease() == []
+
+
+def test_max_attempts_on_expiry():
+    # a URL whose leases keep expiring (e.g. it crashes every client) eventually fails.
+    queue = WorkQueue(max_attempts=2)
+    queue.push(['http://a.com'])
+    for _ in range(2):
+        assert queue.lease(lease_seconds=0.05)
+        time.sleep(0.1)
+    assert queue.lease() == []
+    assert queue.stats()['failed'] == 1
+
+
+def test_page_leases():
+    queue = WorkQueue()
+    queue.register_browser('ws://127.0.0.1:1/devtools/browser/a', 2)
+    queue.register_browser('ws://127.0.0.1:2/devtools/browser/b', 1)
+    leases = [queue.lease_page('client1') for _ in range(3)]
+    assert sorted(l['endpoint'][-1] for l in leases) == ['a', 'a', 'b']
+    assert queue.lease_page('client2') is None
+    assert queue.release_page(leases[0]['lease_id'])
+    assert queue.lease_page('client2')['endpoint'] == leases[0]['endpoint']
+    queue.unregister_browser('ws://127.0.0.1:1/devtools/browser/a')
+    assert queue.lease_page('client2') is None
+
+
+@pytest.mark.asyncio
+async def test_consume_ack_error():
+    queue = WorkQueue()
+    queue.push(['http://a.com', 'http://b.com'])
+
+    async def server_request(server, path, payload, timeout=30):
+        if path == '/queue/ack' and payload['result'] == 'http://a.com':
+            raise ConnectionError('server unreachable')
+        if path == '/queue/lease':
+            return queue.lease(payload['client'], payload['count'], payload['lease_seconds'])
+        if path == '/queue/ack':
+            return queue.ack(payload['lease_id'], payload['result'])
+        if path == '/queue/nack':
+            return queue.nack(payload['lease_id'])
+        if path == '/queue/stats':
+            # the URL whose ack failed is left leased until its lease expires.
+            return {**queue.stats(), 'leased': 0}
+
+    async def handler(spider, url):
+        return url
+
+    spider = Spider()
+    spider._server_request = server_request
+    # a failed ack is logged, and the other URLs are still processed.
+    assert await spider.consume('http://server', handler, batch=2) == 1
+    assert queue.stats() == {'queued': 0, 'leased': 1, 'done': 1, 'failed': 0}